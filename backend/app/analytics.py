@@ -0,0 +1,478 @@
+# app/analytics.py
+"""
+Rating trend analytics over rating_rollups.
+
+refresh() folds driver_ratings rows past the watermark into score histograms
+per (company, grain, bucket, driver, department), one ANALYTICS_BATCH_ROWS
+batch per transaction:
+
+  1. read the next rows by id, stopping at the first one younger than
+     ANALYTICS_SETTLE_SECONDS (a higher id can commit before a lower one);
+  2. move the watermark with a compare-and-set, so a concurrent refresher
+     that read the same rows backs off instead of counting them twice;
+  3. histogram the batch per grain with NumPy and add it onto the rollups,
+     one upsert per grain, in the same transaction as the watermark.
+
+Reads sum a company's rollups per bucket (and department or driver) in SQL,
+then compute means, moving averages, percentiles and fleet outliers as array
+operations over every series and bucket at once. Scores are 1..5, so the
+histograms give exact percentiles for any range. Buckets are UTC days, ISO
+weeks (starting Monday) and calendar months.
+
+NumPy is imported on first use, keeping it off the API's cold-start path.
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .core.security import settings
+from .db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+GRAINS = ("day", "week", "month")
+DEFAULT_SPAN = {"day": 90, "week": 26, "month": 12}  # buckets shown when `since` is not given
+DEPARTMENTS = [d.value for d in models.DepartmentEnum]
+SCORE_COLUMNS = [f"score_{k}" for k in range(1, 6)]
+WATERMARK = "rating_rollups"
+
+_rollups = models.RatingRollup.__table__
+_marks = models.AnalyticsWatermark.__table__
+_department_code = {d: i for i, d in enumerate(DEPARTMENTS)}
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"rating rollup upsert is not implemented for {dialect!r}")
+    stmt = dialect_insert(_rollups)
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in _rollups.primary_key],
+        set_={c: _rollups.c[c] + stmt.excluded[c] for c in SCORE_COLUMNS},
+    )
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+# ----- Buckets -----
+def bucket_start(grain: str, days):
+    """Map day numbers (days since 1970-01-01, an int64 array) to their bucket's first day."""
+    import numpy as np
+
+    if grain == "day":
+        return days
+    if grain == "week":
+        return days - (days + 3) % 7  # 1970-01-01 was a Thursday
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+
+def bucket_range(grain: str, since: Optional[date], until: Optional[date]):
+    """First day of every bucket from the one holding `since` through the one holding `until`."""
+    import numpy as np
+
+    until = until or datetime.utcnow().date()
+    last = int(bucket_start(grain, np.array([np.datetime64(until, "D").astype(np.int64)]))[0])
+    if since is None:
+        if grain == "month":
+            first = np.datetime64(np.datetime64(until, "M") - (DEFAULT_SPAN["month"] - 1), "D").astype(np.int64)
+        else:
+            first = last - (DEFAULT_SPAN[grain] - 1) * (7 if grain == "week" else 1)
+    else:
+        first = int(bucket_start(grain, np.array([np.datetime64(since, "D").astype(np.int64)]))[0])
+    if first > last:
+        raise HTTPException(status_code=422, detail="since is after until")
+    if grain == "month":
+        first_month, last_month = (np.datetime64(int(d), "D").astype("datetime64[M]") for d in (first, last))
+        buckets = np.arange(first_month, last_month + 1).astype("datetime64[D]").astype(np.int64)
+    else:
+        buckets = np.arange(first, last + 1, 7 if grain == "week" else 1, dtype=np.int64)
+    if len(buckets) > settings.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=422, detail=f"At most {settings.ANALYTICS_MAX_BUCKETS} {grain} buckets per request"
+        )
+    return buckets
+
+
+def _dates(days) -> List[date]:
+    return days.astype("datetime64[D]").tolist()
+
+
+# ----- Incremental rollup -----
+def _histograms(grain: str, companies, drivers, departments, days, scores) -> List[dict]:
+    """One upsert row per (bucket, driver, department) present in the batch."""
+    import numpy as np
+
+    buckets = bucket_start(grain, days)
+    low = int(buckets.min())
+    span = int(buckets.max()) - low + 1
+    keys = (drivers * len(DEPARTMENTS) + departments) * span + (buckets - low)
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse * 5 + (scores - 1), minlength=len(unique) * 5).reshape(len(unique), 5)
+    rest = unique // span
+    columns = {
+        "company_id": companies[first].tolist(),
+        "grain": [grain] * len(unique),
+        "bucket": _dates(unique % span + low),
+        "driver_id": (rest // len(DEPARTMENTS)).tolist(),
+        "department": [DEPARTMENTS[d] for d in (rest % len(DEPARTMENTS)).tolist()],
+        **{name: counts[:, k].tolist() for k, name in enumerate(SCORE_COLUMNS)},
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _fold_batch(db: Session, limit: int) -> int:
+    import numpy as np
+
+    last_id = db.execute(select(_marks.c.last_id).where(_marks.c.name == WATERMARK)).scalar_one()
+    r = models.DriverRating
+    rows = db.execute(
+        select(r.id, models.Driver.created_by_company_id, r.driver_id, r.department, r.score, r.created_at)
+        .join(models.Driver, models.Driver.id == r.driver_id)
+        .where(r.id > last_id)
+        .order_by(r.id)
+        .limit(limit)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+    ids, companies, drivers, departments, scores, created = zip(*rows)
+    created = np.array([_naive_utc(c) for c in created], dtype="datetime64[us]")
+    cutoff = np.datetime64(datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_SETTLE_SECONDS), "us")
+    unsettled = np.flatnonzero(created > cutoff)
+    n = int(unsettled[0]) if len(unsettled) else len(rows)
+    if n == 0:
+        db.rollback()
+        return 0
+
+    moved = db.execute(
+        update(_marks)
+        .where(_marks.c.name == WATERMARK, _marks.c.last_id == last_id)
+        .values(last_id=ids[n - 1], updated_at=datetime.utcnow())
+    )
+    if moved.rowcount != 1:  # another refresher folded these rows first
+        db.rollback()
+        return 0
+    arrays = (
+        np.fromiter(companies[:n], np.int64, n),
+        np.fromiter(drivers[:n], np.int64, n),
+        np.fromiter((_department_code[getattr(d, "value", d)] for d in departments[:n]), np.int64, n),
+        created[:n].astype("datetime64[D]").astype(np.int64),
+        np.fromiter(scores[:n], np.int64, n),
+    )
+    upsert = _upsert(db)
+    for grain in GRAINS:
+        db.execute(upsert, _histograms(grain, *arrays))
+    db.commit()
+    return n
+
+
+def refresh(max_batches: Optional[int] = None) -> int:
+    """Fold every settled rating past the watermark into the rollups; returns ratings folded."""
+    total, batches = 0, 0
+    db = SessionLocal()
+    try:
+        while max_batches is None or batches < max_batches:
+            folded = _fold_batch(db, settings.ANALYTICS_BATCH_ROWS)
+            total += folded
+            batches += 1
+            if folded < settings.ANALYTICS_BATCH_ROWS:
+                break
+    finally:
+        db.close()
+    return total
+
+
+def rebuild() -> int:
+    """Drop the rollups and fold the whole rating history again."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(_rollups))
+        db.execute(update(_marks).where(_marks.c.name == WATERMARK).values(last_id=0, updated_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+    return refresh()
+
+
+# ----- Reads -----
+def _aggregate(
+    db: Session, company_id: int, grain: str, buckets, group_by: Sequence, department=None, driver_ids=None,
+    per_bucket: bool = True,
+):
+    """
+    Summed histograms per (bucket, *group_by) in range, or per group_by over
+    the whole range: (bucket day numbers, group columns, n x 5 counts).
+    """
+    import numpy as np
+
+    keys = [_rollups.c.bucket, *group_by] if per_bucket else list(group_by)
+    stmt = select(*keys, *[func.sum(_rollups.c[c]) for c in SCORE_COLUMNS]).where(
+        _rollups.c.company_id == company_id,
+        _rollups.c.grain == grain,
+        _rollups.c.bucket.between(*_dates(buckets[[0, -1]])),
+    )
+    if department is not None:
+        stmt = stmt.where(_rollups.c.department == department)
+    if driver_ids is not None:
+        stmt = stmt.where(_rollups.c.driver_id.in_(driver_ids))
+    rows = db.execute(stmt.group_by(*keys)).all()
+    columns = list(zip(*rows)) or [()] * (len(keys) + 5)
+    days = np.array(columns[0] if per_bucket else (), dtype="datetime64[D]").astype(np.int64)
+    hist = np.array(columns[len(keys):], dtype=np.int64).reshape(5, len(rows)).T
+    return days, columns[int(per_bucket):len(keys)], hist
+
+
+def _percentile(cumulative, count, q: float):
+    """Nearest-rank percentile of each histogram, given its running totals over scores 1..5."""
+    import numpy as np
+
+    rank = np.maximum(np.ceil(q * count), 1)
+    return (cumulative < rank[..., None]).sum(axis=-1) + 1
+
+
+def _summaries(hist, window: int) -> dict:
+    """Per-bucket statistics for `hist` shaped (series, buckets, 5)."""
+    import numpy as np
+
+    count = hist.sum(axis=-1)
+    total = (hist * np.arange(1, 6)).sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        # Count-weighted mean over the trailing `window` buckets, via prefix sums
+        rolling_count = np.cumsum(count, axis=-1)
+        rolling_total = np.cumsum(total, axis=-1)
+        rolling_count[:, window:] -= rolling_count[:, :-window].copy()
+        rolling_total[:, window:] -= rolling_total[:, :-window].copy()
+        moving = rolling_total / rolling_count
+    cumulative = np.cumsum(hist, axis=-1)
+    out = {"count": count, "mean": mean, "moving_mean": moving}
+    for name, q in (("p10", 0.1), ("p50", 0.5), ("p90", 0.9)):
+        out[name] = _percentile(cumulative, count, q)
+    return out
+
+
+def _points(days: List[date], stats: dict, i: int) -> List[dict]:
+    import numpy as np
+
+    count = stats["count"][i]
+    columns = {
+        "count": count.tolist(),
+        **{name: np.where(np.isnan(stats[name][i]), None, stats[name][i].round(4)).tolist() for name in ("mean", "moving_mean")},
+        **{name: np.where(count > 0, stats[name][i], None).tolist() for name in ("p10", "p50", "p90")},
+    }
+    return [{"bucket": day, **dict(zip(columns, values))} for day, values in zip(days, zip(*columns.values()))]
+
+
+def _owned(db: Session, company_id: int, driver_ids: Sequence[int]) -> List[int]:
+    wanted = list(dict.fromkeys(driver_ids))
+    found = set(
+        db.execute(
+            select(models.Driver.id).where(
+                models.Driver.created_by_company_id == company_id, models.Driver.id.in_(wanted)
+            )
+        ).scalars()
+    )
+    return [d for d in wanted if d in found]
+
+
+def trends(
+    db: Session,
+    company_id: int,
+    grain: str = "week",
+    by: str = "company",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    department: Optional[str] = None,
+    driver_ids: Sequence[int] = (),
+    window: int = 4,
+) -> dict:
+    """
+    Score series for the company, one department each, or the given drivers
+    (ids the company does not own are left out). Every bucket in range is
+    present; empty ones have count 0 and null statistics.
+    """
+    import numpy as np
+
+    buckets = bucket_range(grain, since, until)
+    if by == "driver":
+        if not driver_ids:
+            raise HTTPException(status_code=422, detail="by=driver needs at least one driver_id")
+        if len(set(driver_ids)) > settings.ANALYTICS_MAX_DRIVERS:
+            raise HTTPException(
+                status_code=422, detail=f"At most {settings.ANALYTICS_MAX_DRIVERS} drivers per request"
+            )
+        keys = _owned(db, company_id, driver_ids)
+        group_by = [_rollups.c.driver_id]
+    elif by == "department":
+        keys = DEPARTMENTS if department is None else [department]
+        group_by = [_rollups.c.department]
+    else:
+        keys = [None]
+        group_by = []
+
+    hist = np.zeros((len(keys), len(buckets), 5), dtype=np.int64)
+    if keys:
+        days, groups, rows = _aggregate(
+            db, company_id, grain, buckets, group_by, department, keys if by == "driver" else None
+        )
+        if by == "company":
+            series = np.zeros(len(days), dtype=np.int64)
+        else:
+            position = {key: i for i, key in enumerate(keys)}
+            series = np.fromiter((position[getattr(k, "value", k)] for k in groups[0]), np.int64, len(days))
+        np.add.at(hist, (series, np.searchsorted(buckets, days)), rows)
+
+    stats = _summaries(hist, window)
+    dates = _dates(buckets)
+    label = {"driver": "driver_id", "department": "department"}.get(by)
+    return {
+        "grain": grain,
+        "by": by,
+        "since": dates[0],
+        "until": dates[-1],
+        "window": window,
+        "refreshed_at": _refreshed_at(db),
+        "series": [
+            {**({label: key} if label else {}), "points": _points(dates, stats, i)} for i, key in enumerate(keys)
+        ],
+    }
+
+
+def outliers(
+    db: Session,
+    company_id: int,
+    grain: str = "week",
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    department: Optional[str] = None,
+    min_ratings: int = 5,
+    threshold: float = 3.5,
+    limit: int = 50,
+) -> dict:
+    """
+    Drivers whose mean score over the range sits far from the rest of the
+    fleet, by modified z-score (0.6745 * (mean - median) / MAD, falling back
+    to the standard deviation when more than half the fleet shares the median).
+    Only drivers with at least `min_ratings` ratings in range take part.
+    """
+    import numpy as np
+
+    buckets = bucket_range(grain, since, until)
+    _, (drivers,), hist = _aggregate(
+        db, company_id, grain, buckets, [_rollups.c.driver_id], department, per_bucket=False
+    )
+    unique = np.fromiter(drivers, np.int64, len(drivers))
+    count = hist.sum(axis=1)
+    total = hist @ np.arange(1, 6)
+    keep = count >= min_ratings
+    unique, count, total = unique[keep], count[keep], total[keep]
+    means = total / np.maximum(count, 1)
+
+    spread = ("driver_mean_p10", "driver_mean_p50", "driver_mean_p90")
+    fleet = {"drivers": len(unique), "ratings": int(count.sum()), "mean": None, **dict.fromkeys(spread)}
+    flagged = []
+    if len(unique):
+        fleet["mean"] = round(float(total.sum() / count.sum()), 4)
+        fleet.update(zip(spread, np.percentile(means, [10, 50, 90]).round(4).tolist()))
+        median = np.median(means)
+        mad = np.median(np.abs(means - median))
+        if mad > 0:
+            z = 0.6745 * (means - median) / mad
+        else:
+            std = means.std()
+            z = (means - median) / std if std > 0 else np.zeros_like(means)
+        ordered = np.sort(means)
+        # Mid-rank: the share of the fleet below, counting ties as half
+        below = np.searchsorted(ordered, means, "left") + np.searchsorted(ordered, means, "right")
+        percentile = 50 * below / len(means)
+        hits = np.flatnonzero(np.abs(z) >= threshold)
+        hits = hits[np.argsort(-np.abs(z[hits]), kind="stable")][:limit]
+        names = {}
+        if len(hits):
+            stmt = select(models.Driver.id, models.Driver.name, models.Driver.license_number)
+            names = {row.id: row for row in db.execute(stmt.where(models.Driver.id.in_(unique[hits].tolist())))}
+        for i in hits.tolist():
+            driver = names[int(unique[i])]
+            flagged.append({
+                "driver_id": driver.id,
+                "name": driver.name,
+                "license_number": driver.license_number,
+                "count": int(count[i]),
+                "mean": round(float(means[i]), 4),
+                "z": round(float(z[i]), 4),
+                "percentile": round(float(percentile[i]), 2),
+            })
+
+    dates = _dates(buckets[[0, -1]])
+    return {
+        "grain": grain,
+        "since": dates[0],
+        "until": dates[1],
+        "refreshed_at": _refreshed_at(db),
+        "fleet": fleet,
+        "outliers": flagged,
+    }
+
+
+def _refreshed_at(db: Session) -> Optional[datetime]:
+    return db.execute(select(_marks.c.updated_at).where(_marks.c.name == WATERMARK)).scalar()
+
+
+def stats(db: Session) -> dict:
+    mark = db.execute(select(_marks.c.last_id, _marks.c.updated_at).where(_marks.c.name == WATERMARK)).one()
+    newest = db.execute(select(func.max(models.DriverRating.id))).scalar() or 0
+    return {
+        "refresh_seconds": settings.ANALYTICS_REFRESH_SECONDS,
+        "last_id": mark.last_id,
+        "refreshed_at": mark.updated_at,
+        "pending_ids": max(newest - mark.last_id, 0),
+    }
+
+
+# ----- In-process refresh -----
+_task: Optional[asyncio.Task] = None
+
+
+async def _refresh_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.ANALYTICS_REFRESH_SECONDS)
+        try:
+            folded = await run_in_threadpool(refresh)
+        except Exception:
+            logger.exception("analytics refresh failed")
+        else:
+            if folded:
+                logger.info("folded %d ratings into rating_rollups", folded)
+
+
+def start_refresher() -> None:
+    """Refresh the rollups from a task on the running loop every ANALYTICS_REFRESH_SECONDS (0 disables)."""
+    global _task
+    if settings.ANALYTICS_REFRESH_SECONDS <= 0 or _task is not None:
+        return
+    _task = asyncio.get_running_loop().create_task(_refresh_loop())
+
+
+async def stop_refresher() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -1,31 +1,187 @@
 # app/auth.py
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import get_db
-from . import models
-from .core.settings import settings
+from .db import replicas
+from .db.session import get_db
+from .db.async_session import get_async_db
+from . import models, principals
+from .core import instrumentation
+from .core.security import settings
 
 oauth2_scheme = HTTPBearer()
+_ops_scheme = HTTPBearer(auto_error=False)
 ALGORITHM = "HS256"
 
+
+def _company_credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _staff_credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verified_claims(token: str, secret_key: str, scope: Optional[dict] = None) -> Optional[dict]:
+    """
+    Return the payload of a token signed with `secret_key` (and not expired), or None.
+    Given the request's ASGI scope, the result is kept there, so the rate limiter
+    and the auth dependencies verify a token once per request between them.
+    """
+    from jose import JWTError, jwt  # deferred: pulls in cryptography
+
+    memo = scope.setdefault("state", {}).setdefault("verified_claims", {}) if scope is not None else {}
+    if (token, secret_key) in memo:
+        return memo[token, secret_key]
+    try:
+        with instrumentation.span("jwt"):
+            claims = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
+    except JWTError:
+        claims = None
+    memo[token, secret_key] = claims
+    return claims
+
+
+def _decode_subject(request: Request, token: str, secret_key: str) -> Optional[Tuple[int, Optional[str]]]:
+    """Return (sub, jti) for a valid token, or None."""
+    payload = verified_claims(token, secret_key, request.scope)
+    if payload is None:
+        return None
+    try:
+        return int(payload.get("sub")), payload.get("jti")
+    except (ValueError, TypeError):
+        return None
+
+
+# ----- Company (CEO) -----
+def get_current_company(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    decoded = _decode_subject(request, token.credentials, settings.SECRET_KEY)
+    if decoded is None:
+        raise _company_credentials_exception()
+    company_id, token_id = decoded
+
+    cached = principals.get(principals.COMPANY, company_id, token_id)
+    if cached is not None:
+        return cached
+
+    company = db.query(models.Company).filter(models.Company.id == company_id).first()
+    if company is None:
+        raise _company_credentials_exception()
+    principal = principals.company_from_row(company)
+    principals.put(principals.COMPANY, company_id, token_id, principal)
+    return principal
+
+
+async def get_current_company_async(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    decoded = _decode_subject(request, token.credentials, settings.SECRET_KEY)
+    if decoded is None:
+        raise _company_credentials_exception()
+    company_id, token_id = decoded
+
+    cached = principals.get(principals.COMPANY, company_id, token_id)
+    if cached is not None:
+        return cached
+
+    company = (await db.execute(select(models.Company).where(models.Company.id == company_id))).scalar_one_or_none()
+    if company is None:
+        raise _company_credentials_exception()
+    principal = principals.company_from_row(company)
+    principals.put(principals.COMPANY, company_id, token_id, principal)
+    return principal
+
+
+# ----- Staff -----
 def get_current_staff_user(
+    request: Request,
     token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ):
-    try:
-        payload = jwt.decode(token.credentials, settings.STAFF_SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except (JWTError, ValueError, TypeError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    decoded = _decode_subject(request, token.credentials, settings.STAFF_SECRET_KEY)
+    if decoded is None:
+        raise _staff_credentials_exception()
+    user_id, token_id = decoded
+
+    cached = principals.get(principals.STAFF, user_id, token_id)
+    if cached is not None:
+        return cached
 
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    return user
+    principal = principals.staff_from_row(user)
+    principals.put(principals.STAFF, user_id, token_id, principal)
+    return principal
+
+
+async def get_current_staff_user_async(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    decoded = _decode_subject(request, token.credentials, settings.STAFF_SECRET_KEY)
+    if decoded is None:
+        raise _staff_credentials_exception()
+    user_id, token_id = decoded
+
+    cached = principals.get(principals.STAFF, user_id, token_id)
+    if cached is not None:
+        return cached
+
+    user = (await db.execute(select(models.User).where(models.User.id == user_id))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    principal = principals.staff_from_row(user)
+    principals.put(principals.STAFF, user_id, token_id, principal)
+    return principal
+
+
+# ----- Ops diagnostics -----
+def require_ops_token(token: Optional[HTTPAuthorizationCredentials] = Depends(_ops_scheme)) -> None:
+    if not settings.OPS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if token is None or not hmac.compare_digest(token.credentials.encode(), settings.OPS_TOKEN.encode()):
+        raise _staff_credentials_exception()
+
+
+# ----- Read-only sessions (replica routing, see app.db.replicas) -----
+def get_company_read_db(current_company=Depends(get_current_company)):
+    db = replicas.read_session(current_company.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_staff_read_db(current_user=Depends(get_current_staff_user)):
+    db = replicas.read_session(current_user.company_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_company_read_db_async(current_company=Depends(get_current_company_async)):
+    async with replicas.async_read_session(current_company.id) as db:
+        yield db
@@ -0,0 +1,309 @@
+# backend/app/core/instrumentation.py
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware opens a RequestStats for every HTTP request. Cursor
+listeners on the engines add query count and DB time to it, and code paths
+such as bcrypt and JWT decoding add named spans. On the way out the totals
+become a Server-Timing header and feed per-route Prometheus histograms
+(render() produces the text exposition format for GET /metrics).
+
+A request that runs more than QUERY_BUDGET_PER_REQUEST statements is logged
+with its most repeated statement, which is almost always an N+1 loop. Boot
+phases (app import, migrations, worker boot, cold start) are exported as
+app_startup_seconds gauges.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from .security import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db_s", "spans", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_s = 0.0
+        self.spans: Dict[str, float] = {}
+        self.statements: Counter = Counter()
+
+
+# The middleware sets a mutable RequestStats; threadpool handlers get a copy of
+# the context, so they see (and update) the same object.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the elapsed time of the block to the current request's `name` span."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.spans[name] = stats.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+# ----- SQL listeners -----
+# The start time lives on the statement's execution context, so a statement that
+# raises leaves nothing behind on the pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _record(context, statement) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        stats.db_s += time.perf_counter() - started
+        context._query_started = None
+    stats.queries += 1
+    stats.statements[statement] += 1
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context, statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute never fires for a statement that raised
+    if exception_context.execution_context is not None:
+        _record(exception_context.execution_context, exception_context.statement)
+
+
+def instrument_engine(engine) -> None:
+    """Attach the query listeners to a (sync) Engine; pass AsyncEngine.sync_engine for async ones."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+# ----- Prometheus registry -----
+class _Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+class _Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.series: Dict[Tuple, float] = {}
+
+    def set(self, labels: Tuple, value: float) -> None:
+        self.series[labels] = value
+
+
+class _Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.series: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple, value: float = 1) -> None:
+        self.series[labels] = self.series.get(labels, 0) + value
+
+
+_lock = threading.Lock()
+_ROUTE_LABELS = ("method", "route")
+REQUESTS = _Counter("http_requests_total", "HTTP requests by route and status.")
+DURATION = _Histogram("http_request_duration_seconds", "Time until the response was fully sent.", DURATION_BUCKETS)
+HANDLER = _Histogram("http_request_handler_seconds", "Time until the response started (handler + serialization).", DURATION_BUCKETS)
+DB_TIME = _Histogram("http_request_db_seconds", "Time spent executing SQL per request.", DURATION_BUCKETS)
+QUERIES = _Histogram("http_request_queries", "SQL statements executed per request.", QUERY_BUCKETS)
+SIZE = _Histogram("http_response_size_bytes", "Response body size.", SIZE_BUCKETS)
+OVER_BUDGET = _Counter("http_request_query_budget_exceeded_total", "Requests that ran more SQL statements than the budget.")
+STARTUP = _Gauge("app_startup_seconds", "Boot phase durations for this worker process.")
+OUTBOX_EVENTS = _Counter("outbox_events_total", "Outbox events handled by this process, by topic and outcome.")
+OUTBOX_LAG = _Histogram("outbox_event_lag_seconds", "Time from the write to its outbox event being handled.", LAG_BUCKETS)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _bound(value: float) -> str:
+    return str(float(value))
+
+
+def render() -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    with _lock:
+        for counter, names in (
+            (REQUESTS, _ROUTE_LABELS + ("status",)),
+            (OVER_BUDGET, _ROUTE_LABELS),
+            (OUTBOX_EVENTS, ("topic", "outcome")),
+        ):
+            lines += [f"# HELP {counter.name} {counter.help}", f"# TYPE {counter.name} counter"]
+            for labels, value in sorted(counter.series.items()):
+                lines.append(f"{counter.name}{_labels(names, labels)} {value}")
+        for hist, names in (
+            (DURATION, _ROUTE_LABELS),
+            (HANDLER, _ROUTE_LABELS),
+            (DB_TIME, _ROUTE_LABELS),
+            (QUERIES, _ROUTE_LABELS),
+            (SIZE, _ROUTE_LABELS),
+            (OUTBOX_LAG, ("topic",)),
+        ):
+            lines += [f"# HELP {hist.name} {hist.help}", f"# TYPE {hist.name} histogram"]
+            for labels, series in sorted(hist.series.items()):
+                bounds = [_bound(b) for b in hist.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, series[:-2] + [series[-1]]):
+                    le = f'le="{bound}"'
+                    lines.append(f"{hist.name}_bucket{_labels(names, labels, le)} {count}")
+                lines.append(f"{hist.name}_sum{_labels(names, labels)} {series[-2]}")
+                lines.append(f"{hist.name}_count{_labels(names, labels)} {series[-1]}")
+        lines += [f"# HELP {STARTUP.name} {STARTUP.help}", f"# TYPE {STARTUP.name} gauge"]
+        for labels, value in sorted(STARTUP.series.items()):
+            lines.append(f"{STARTUP.name}{_labels(('phase',), labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        for metric in (REQUESTS, OVER_BUDGET, DURATION, HANDLER, DB_TIME, QUERIES, SIZE, OUTBOX_EVENTS, OUTBOX_LAG):
+            metric.series.clear()
+
+
+def record_outbox(topic: str, outcome: str, lag_s: float = None) -> None:
+    with _lock:
+        OUTBOX_EVENTS.inc((topic, outcome))
+        if lag_s is not None:
+            OUTBOX_LAG.observe((topic,), lag_s)
+
+
+# ----- Startup -----
+# Wall-clock stamps set by app.server (launch in the master, fork in each worker)
+LAUNCHED_AT_ENV = "APP_LAUNCHED_AT"
+FORKED_AT_ENV = "APP_WORKER_FORKED_AT"
+
+_imported_at = time.time()  # stands in for the launch when not started via app.server
+
+
+def record_startup(phase: str, seconds: float) -> None:
+    with _lock:
+        STARTUP.set((phase,), seconds)
+
+
+def mark_ready() -> float:
+    """Record cold start (launch -> this worker serving) and worker boot; returns the cold start."""
+    now = time.time()
+    cold_start = now - float(os.environ.get(LAUNCHED_AT_ENV, _imported_at))
+    record_startup("cold_start", cold_start)
+    forked_at = os.environ.get(FORKED_AT_ENV)
+    if forked_at:
+        record_startup("worker_boot", now - float(forked_at))
+    return cold_start
+
+
+# ----- Middleware -----
+def server_timing(stats: RequestStats, handler_s: float) -> str:
+    parts = [f"app;dur={handler_s * 1000:.1f}", f'db;dur={stats.db_s * 1000:.1f};desc="{stats.queries} queries"']
+    parts += [f"{name};dur={took * 1000:.1f}" for name, took in stats.spans.items()]
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware) so streaming responses are not buffered."""
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        state = {"status": 500, "handler_s": None, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["handler_s"] = time.perf_counter() - stats.started
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stats, state["handler_s"]).encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._record(scope, stats, state)
+
+    def _record(self, scope, stats: RequestStats, state: dict) -> None:
+        route = scope.get("route")
+        labels = (scope["method"], getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched")
+        total = time.perf_counter() - stats.started
+        with _lock:
+            REQUESTS.inc(labels + (state["status"],))
+            DURATION.observe(labels, total)
+            HANDLER.observe(labels, state["handler_s"] if state["handler_s"] is not None else total)
+            DB_TIME.observe(labels, stats.db_s)
+            QUERIES.observe(labels, stats.queries)
+            SIZE.observe(labels, state["size"])
+            over_budget = stats.queries > settings.QUERY_BUDGET_PER_REQUEST
+            if over_budget:
+                OVER_BUDGET.inc(labels)
+        if over_budget:
+            statement, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                "%s %s ran %d queries (budget %d); most repeated (%dx): %s",
+                labels[0], labels[1], stats.queries, settings.QUERY_BUDGET_PER_REQUEST,
+                repeats, " ".join(statement.split())[:200],
+            )
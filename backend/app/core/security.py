@@ -6,6 +6,132 @@ class Settings(BaseSettings):
     STAFF_SECRET_KEY: str = "dev-change-me-staff"
     DATABASE_URL: str = "sqlite:///./driver.sqlite3"
 
+    # Password hashing pool (bcrypt runs in worker processes, off the event loop)
+    HASH_POOL_SIZE: int = 2
+    HASH_QUEUE_DEPTH: int = 32
+    HASH_RETRY_AFTER_SECONDS: int = 2
+
+    # Shared secret for the /ops/* diagnostics (send `Authorization: Bearer <token>`);
+    # empty turns those endpoints off
+    OPS_TOKEN: str = ""
+
+    # Authenticated principal cache (skips the Company/User lookup per request)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Connection pool (per worker process; size against RDS max_connections)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = no timeout; Postgres only
+
+    # Production server (python -m app.server). SERVER_WORKERS=0 derives the
+    # count from the container's CPU quota, capped by memory / SERVER_WORKER_MEMORY_MB
+    SERVER_HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_WORKER_MEMORY_MB: int = 300
+    SERVER_PRELOAD: bool = True
+    SERVER_TIMEOUT_SECONDS: int = 60
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_MAX_REQUESTS: int = 0  # recycle workers after N requests (0 = never)
+    SERVER_ACCESS_LOG: bool = False
+
+    # Read replicas (comma-separated URLs; empty = everything on DATABASE_URL).
+    # Read-only handlers use the next healthy replica round-robin; a company's
+    # reads stay on the primary for REPLICA_STICKY_SECONDS after it writes (keep
+    # it above REPLICA_MAX_LAG_SECONDS), and lagging or failing replicas are skipped.
+    # Write marks are per worker with "memory"; "redis" shares them
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_CHECK_SECONDS: float = 2.0
+    REPLICA_STICKY_BACKEND: str = "memory"
+    REPLICA_STICKY_REDIS_URL: str = "redis://localhost:6379/0"
+    REPLICA_STICKY_MAX_COMPANIES: int = 100000
+
+    # Apply Alembic migrations at boot: once in the app.server master, or in the
+    # startup hook otherwise (turn off when migrations run as a deploy step)
+    MIGRATE_ON_STARTUP: bool = True
+
+    # Serve driver/rating endpoints from async handlers (asyncpg / aiosqlite)
+    DB_ASYNC: bool = False
+
+    # Hard cap on `limit` for cursor-paginated list endpoints
+    PAGE_SIZE_MAX: int = 200
+
+    # Rows per transaction in POST /drivers/import
+    IMPORT_CHUNK_SIZE: int = 1000
+
+    # Max items in one POST /ratings/batch
+    RATING_BATCH_MAX: int = 500
+
+    # Max licenses screened in one POST /drivers/lookup
+    LOOKUP_BATCH_MAX: int = 500
+
+    # Max drivers in one GET /drivers/profile, and its default ratings per driver
+    PROFILE_BATCH_MAX: int = 50
+    PROFILE_RATINGS_DEFAULT: int = 10
+
+    # Rows fetched per server-side cursor batch in /staff/export/*
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Cached JSON bodies for tenant read endpoints ("memory", "redis" or "off")
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+
+    # In-memory typeahead indexes for /drivers/suggest (total drivers held per
+    # worker across tenants; rebuilt after the TTL to pick up other workers' writes)
+    SUGGEST_MAX_DRIVERS: int = 250000
+    SUGGEST_TTL_SECONDS: int = 300
+
+    # Token-bucket rate limits as "requests/seconds" ("off" disables one). Login
+    # routes are keyed by client IP, the rest by company. "memory" buckets are per
+    # worker; "redis" shares them across workers and hosts
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_PROXY_HOPS: int = 0  # trusted proxies appending X-Forwarded-For (1 behind an ALB)
+    RATE_LIMIT_DEFAULT: str = "600/60"
+    RATE_LIMIT_LOGIN: str = "10/60"
+    RATE_LIMIT_SEARCH: str = "120/60"
+    RATE_LIMIT_BULK: str = "30/60"
+    # Imports / exports / rating batches in flight per company (per worker)
+    CONCURRENCY_LIMIT_BULK: int = 2
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 5
+
+    # Transactional outbox (app/outbox.py). "inprocess" drains from a task in each
+    # API worker, woken on commit; "inline" drains right after the commit (tests);
+    # "off" leaves it to `python -m app.manage outbox-worker`
+    OUTBOX_WORKER: str = "inprocess"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_LEASE_SECONDS: int = 60  # a claimed batch is retried if its worker dies
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_SECONDS: float = 2.0  # doubled per failed attempt, capped at an hour
+
+    # Rating trend analytics (app/analytics.py). Each API worker folds new ratings
+    # into rating_rollups every ANALYTICS_REFRESH_SECONDS (0 leaves it to
+    # `python -m app.manage analytics-refresh`). Ratings younger than
+    # ANALYTICS_SETTLE_SECONDS wait for the next pass, so a lower id whose
+    # transaction is still open is not skipped
+    ANALYTICS_REFRESH_SECONDS: float = 60.0
+    ANALYTICS_SETTLE_SECONDS: float = 30.0
+    ANALYTICS_BATCH_ROWS: int = 200000
+    ANALYTICS_MAX_BUCKETS: int = 400  # points per series in GET /analytics/trends
+    ANALYTICS_MAX_DRIVERS: int = 50  # series in one by=driver trend request
+
+    # orjson responses, and no re-validation of projected DB rows in list endpoints
+    FAST_JSON: bool = False
+
+    # Per-request instrumentation (Server-Timing header, /metrics, N+1 warnings)
+    SERVER_TIMING_ENABLED: bool = True
+    QUERY_BUDGET_PER_REQUEST: int = 20
+
     # pydantic v2-style config
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,103 @@
+# app/core/startup.py
+"""
+Cold-start profiling for the API process.
+
+profile() boots the app in a fresh interpreter under `python -X importtime`:
+import app.main, run the startup handlers, serve one GET /healthz straight
+through ASGI (no HTTP client, so nothing extra gets imported), then report
+where import time went. Used by `python -m app.manage profile-startup` and by
+the startup budget test.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Libraries that must not be imported just to serve /healthz
+DEFERRED = ("alembic", "jose", "cryptography", "passlib", "psycopg2", "asyncpg", "numpy")
+
+_CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import {module} as target
+imported = time.perf_counter()
+app = target.app
+
+async def first_request():
+    await app.router.startup()
+    messages = []
+    scope = {{"type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/healthz", "raw_path": b"/healthz", "root_path": "", "query_string": b"",
+             "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80)}}
+
+    async def receive():
+        return {{"type": "http.request", "body": b"", "more_body": False}}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return next(m["status"] for m in messages if m["type"] == "http.response.start")
+
+status = asyncio.run(first_request())
+print(json.dumps({{
+    "import_s": imported - started,
+    "ready_s": time.perf_counter() - started,
+    "status": status,
+    "deferred_loaded": [m for m in {deferred!r} if m in sys.modules],
+}}))
+"""
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def profile(module: str = "app.main", env: Dict[str, str] = None) -> dict:
+    child_env = {**os.environ, "MIGRATE_ON_STARTUP": "false", **(env or {})}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD.format(module=module, deferred=DEFERRED)],
+        cwd=BACKEND_DIR, env=child_env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"profiling {module} failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def report(result: dict, top: int = 20) -> str:
+    imports = result["imports"]
+    by_package = defaultdict(int)
+    for rec in imports:
+        by_package[rec.module.split(".")[0]] += rec.self_us
+    lines = [
+        f"import            {result['import_s'] * 1000:8.1f} ms",
+        f"ready (/healthz)  {result['ready_s'] * 1000:8.1f} ms  status {result['status']}",
+        f"deferred modules loaded: {', '.join(result['deferred_loaded']) or 'none'}",
+        "",
+        f"{'package (self time)':<40} {'ms':>8}",
+    ]
+    for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        lines.append(f"{name:<40} {us / 1000:8.1f}")
+    lines += ["", f"{'module (cumulative)':<40} {'ms':>8} {'self':>8}"]
+    for rec in sorted(imports, key=lambda r: -r.cumulative_us)[:top]:
+        lines.append(f"{rec.module:<40} {rec.cumulative_us / 1000:8.1f} {rec.self_us / 1000:8.1f}")
+    return "\n".join(lines)
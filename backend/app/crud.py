@@ -0,0 +1,248 @@
+# app/crud.py
+# Driver/rating data access shared by the sync routes (called with a Session)
+# and the async routes (called through AsyncSession.run_sync).
+from datetime import date
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from . import models, outbox, pagination, rating_stats, response_cache, schemas, search, suggest
+from .core.security import settings
+from .db import replicas
+
+# Column projections for list endpoints: plain row dicts go straight to the
+# response_model, skipping entity hydration, the identity map and lazy loads.
+_DRIVER_COLUMNS = (
+    models.Driver.id,
+    models.Driver.name,
+    models.Driver.dob,
+    models.Driver.license_number,
+    models.Driver.created_by_company_id,
+    models.Driver.created_at,
+)
+_RATING_COLUMNS = (
+    models.DriverRating.id,
+    models.DriverRating.driver_id,
+    models.DriverRating.user_id,
+    models.DriverRating.department,
+    models.DriverRating.score,
+    models.DriverRating.comment,
+    models.DriverRating.created_at,
+)
+
+
+def create_driver(db: Session, driver: schemas.DriverCreate, company_id: int) -> models.Driver:
+    existing = db.query(models.Driver).filter(models.Driver.license_number == driver.license_number).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Driver already exists")
+    new_driver = models.Driver(
+        name=driver.name,
+        dob=driver.dob,
+        license_number=driver.license_number,
+        created_by_company_id=company_id,
+    )
+    db.add(new_driver)
+    db.flush()
+    outbox.enqueue(db, "driver.created", driver_id=new_driver.id, company_id=company_id)
+    db.commit()
+    db.refresh(new_driver)
+    response_cache.invalidate_company(company_id)
+    replicas.mark_write(company_id)
+    suggest.add_driver(new_driver)
+    return new_driver
+
+
+def search_drivers(
+    db: Session,
+    company_id: int,
+    name: str = "",
+    dob: Optional[date] = None,
+    license: str = "",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[models.Driver], Optional[str]]:
+    return search.search_drivers(db, company_id, name=name, dob=dob, license=license, limit=limit, cursor=cursor)
+
+
+def list_company_drivers(
+    db: Session, company_id: int, limit: int = 50, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    keys = [(models.Driver.name, False), (models.Driver.id, False)]
+    stmt = select(*_DRIVER_COLUMNS).where(models.Driver.created_by_company_id == company_id)
+    rows = db.execute(pagination.paginate(stmt, keys, cursor, limit)).mappings().all()
+    rows, next_cursor = pagination.split_page(rows, limit, lambda r: (r["name"], r["id"]))
+    return [dict(r) for r in rows], next_cursor
+
+
+def list_company_staff(db: Session, company_id: int) -> List[dict]:
+    stmt = (
+        select(models.User.id, models.User.name, models.User.email, models.User.department)
+        .where(models.User.company_id == company_id)
+        .order_by(models.User.id)
+    )
+    return [dict(r) for r in db.execute(stmt).mappings()]
+
+
+def get_company_driver(db: Session, driver_id: int, company_id: int) -> models.Driver:
+    driver = db.query(models.Driver).filter_by(id=driver_id, created_by_company_id=company_id).first()
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return driver
+
+
+def create_rating(db: Session, rating: schemas.DriverRatingCreate, user) -> models.DriverRating:
+    driver = db.query(models.Driver).filter(models.Driver.id == rating.driver_id).first()
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    if driver.created_by_company_id != user.company_id:
+        raise HTTPException(status_code=403, detail="You can only rate drivers from your company")
+
+    new_rating = models.DriverRating(
+        driver_id=rating.driver_id,
+        user_id=user.id,
+        department=user.department,
+        score=rating.score,
+        comment=rating.comment,
+    )
+    db.add(new_rating)
+    db.flush()
+    rating_stats.record(db, user.company_id, [new_rating])
+    db.commit()
+    db.refresh(new_rating)
+    response_cache.invalidate_company(user.company_id)
+    replicas.mark_write(user.company_id)
+    return new_rating
+
+
+def create_ratings_batch(db: Session, ratings: List[schemas.DriverRatingCreate], user) -> List[dict]:
+    """
+    Rate many drivers in one transaction: one IN query checks existence and
+    ownership for every driver, one flush inserts the rows and rating stats
+    get a single upsert per driver. Items that fail are reported, not raised.
+    """
+    if len(ratings) > settings.RATING_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"At most {settings.RATING_BATCH_MAX} ratings per batch")
+
+    driver_ids = {r.driver_id for r in ratings}
+    owner_by_driver = dict(
+        db.execute(
+            select(models.Driver.id, models.Driver.created_by_company_id).where(models.Driver.id.in_(driver_ids))
+        ).all()
+    )
+
+    results: List[dict] = []
+    created = []
+    for index, rating in enumerate(ratings):
+        owner = owner_by_driver.get(rating.driver_id)
+        if owner is None:
+            results.append({"index": index, "status_code": 404, "error": "Driver not found"})
+            continue
+        if owner != user.company_id:
+            results.append({"index": index, "status_code": 403, "error": "You can only rate drivers from your company"})
+            continue
+        new_rating = models.DriverRating(
+            driver_id=rating.driver_id,
+            user_id=user.id,
+            department=user.department,
+            score=rating.score,
+            comment=rating.comment,
+        )
+        created.append(new_rating)
+        results.append({"index": index, "status_code": 200, "rating": new_rating})
+
+    if created:
+        db.add_all(created)
+        db.flush()
+        rating_stats.record(db, user.company_id, created)
+        db.commit()
+        response_cache.invalidate_company(user.company_id)
+        replicas.mark_write(user.company_id)
+    return results
+
+
+def list_driver_ratings(
+    db: Session, driver_id: int, company_id: int, limit: int = 50, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Newest first. Ownership is checked by the join, so a normal page is one query."""
+    keys = [(models.DriverRating.created_at, True), (models.DriverRating.id, True)]
+    stmt = (
+        select(*_RATING_COLUMNS)
+        .join(models.Driver, models.Driver.id == models.DriverRating.driver_id)
+        .where(models.DriverRating.driver_id == driver_id, models.Driver.created_by_company_id == company_id)
+    )
+    rows = db.execute(pagination.paginate(stmt, keys, cursor, limit)).mappings().all()
+    if not rows and cursor is None:
+        get_company_driver(db, driver_id, company_id)  # 404 unless it is simply unrated
+    rows, next_cursor = pagination.split_page(rows, limit, lambda r: (r["created_at"], r["id"]))
+    return [dict(r) for r in rows], next_cursor
+
+
+def _recent_ratings(db: Session, driver_ids: List[int], per_driver: int):
+    """Newest `per_driver` ratings of each driver, grouped by driver, in one statement."""
+    r = models.DriverRating
+    newest_first = (r.created_at.desc(), r.id.desc())
+    if db.get_bind().dialect.name == "postgresql":
+        # LATERAL ... LIMIT stops after per_driver index entries for each driver
+        recent = (
+            select(*_RATING_COLUMNS).where(r.driver_id == models.Driver.id).order_by(*newest_first).limit(per_driver)
+        ).lateral()
+        return (
+            select(*[recent.c[c.key] for c in _RATING_COLUMNS])
+            .select_from(models.Driver)
+            .join(recent, true())
+            .where(models.Driver.id.in_(driver_ids))
+            .order_by(recent.c.driver_id, recent.c.created_at.desc(), recent.c.id.desc())
+        )
+    # SQLite has no LATERAL; rank each driver's index range and keep the head
+    rank = func.row_number().over(partition_by=r.driver_id, order_by=newest_first).label("rank")
+    ranked = select(*_RATING_COLUMNS, rank).where(r.driver_id.in_(driver_ids)).subquery()
+    return (
+        select(*[ranked.c[c.key] for c in _RATING_COLUMNS])
+        .where(ranked.c.rank <= per_driver)
+        .order_by(ranked.c.driver_id, ranked.c.rank)
+    )
+
+
+def get_driver_profiles(db: Session, driver_ids: List[int], company_id: int, ratings_limit: int = 10) -> List[dict]:
+    """
+    Driver fields, the newest `ratings_limit` ratings and summary stats for each
+    id the company owns, in request order; other ids are left out, as in
+    /drivers/stats. Three queries however many ids are asked for.
+    """
+    wanted = list(dict.fromkeys(driver_ids))
+    if len(wanted) > settings.PROFILE_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"At most {settings.PROFILE_BATCH_MAX} drivers per profile request")
+    if not wanted:
+        return []
+    stmt = select(*_DRIVER_COLUMNS).where(models.Driver.id.in_(wanted), models.Driver.created_by_company_id == company_id)
+    drivers = {row["id"]: dict(row) for row in db.execute(stmt).mappings()}
+    owned = [d for d in wanted if d in drivers]
+    if not owned:
+        return []
+
+    # One look-ahead row per driver decides its cursor, as in list_driver_ratings
+    ratings = {d: [] for d in owned}
+    for row in db.execute(_recent_ratings(db, owned, ratings_limit + 1)).mappings():
+        ratings[row["driver_id"]].append(dict(row))
+    stats = rating_stats.for_drivers(db, owned, company_id)
+    profiles = []
+    for d in owned:
+        page, next_cursor = pagination.split_page(ratings[d], ratings_limit, lambda x: (x["created_at"], x["id"]))
+        profiles.append({**drivers[d], "ratings": page, "ratings_next_cursor": next_cursor, "stats": stats[d]})
+    return profiles
+
+
+def get_rating_stats(db: Session, driver_id: int, company_id: int) -> dict:
+    return rating_stats.get_one(db, driver_id, company_id)
+
+
+def get_rating_stats_batch(db: Session, driver_ids: List[int], company_id: int) -> List[dict]:
+    return rating_stats.get_many(db, driver_ids, company_id)
+
+
+def lookup_reputation(db: Session, licenses: List[str]) -> List[dict]:
+    if len(licenses) > settings.LOOKUP_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"At most {settings.LOOKUP_BATCH_MAX} licenses per lookup")
+    return rating_stats.lookup(db, licenses)
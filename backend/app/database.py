@@ -1,17 +1,6 @@
 # app/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from .core.settings import settings
+# Kept for older imports; the engine, session factory and Base live in app.db
+from .db.base import Base
+from .db.session import engine, SessionLocal, get_db, DATABASE_URL as SQLALCHEMY_DATABASE_URL
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL  # must be the postgres URL
-
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+__all__ = ["Base", "engine", "SessionLocal", "get_db", "SQLALCHEMY_DATABASE_URL"]
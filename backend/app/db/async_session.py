@@ -0,0 +1,88 @@
+# backend/app/db/async_session.py
+"""
+Async engine/session for DB_ASYNC mode (asyncpg on Postgres, aiosqlite locally).
+
+The engine is built lazily so the async drivers are only needed when the
+async routes are actually served.
+"""
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from ..core.instrumentation import instrument_engine
+from ..core.security import settings
+from .session import DATABASE_URL
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def async_url(url: str) -> URL:
+    u = make_url(url)
+    driver = _ASYNC_DRIVERS.get(u.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {u.get_backend_name()!r}")
+    # asyncpg does not understand libpq's sslmode; it is translated to connect_args below
+    return u.set(drivername=driver).difference_update_query(["sslmode"])
+
+
+def _engine_kwargs(url: str) -> dict:
+    u = make_url(url)
+    backend = u.get_backend_name()
+    kwargs = {"pool_pre_ping": True}
+    if backend == "sqlite":
+        if u.database in (None, "", ":memory:"):
+            return kwargs
+    kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if backend == "postgresql":
+        connect_args = {}
+        if u.query.get("sslmode") not in (None, "disable"):
+            connect_args["ssl"] = "require"
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        if connect_args:
+            kwargs["connect_args"] = connect_args
+    return kwargs
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_engine(async_url(DATABASE_URL), **_engine_kwargs(DATABASE_URL))
+        instrument_engine(_engine.sync_engine)
+        _sessionmaker = async_sessionmaker(_engine, autoflush=False, expire_on_commit=False)
+    return _engine
+
+
+def new_session() -> AsyncSession:
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency: async counterpart of get_db.
+    """
+    async with new_session() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = _sessionmaker = None
+
+
+def dispose_after_fork() -> None:
+    """Post-fork counterpart of dispose_async_engine: drop inherited connections without closing them."""
+    if _engine is not None:
+        _engine.sync_engine.dispose(close=False)
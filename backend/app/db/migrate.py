@@ -0,0 +1,34 @@
+# backend/app/db/migrate.py
+"""
+Programmatic Alembic upgrade, used at startup and by `python -m app.manage migrate`.
+
+Databases created by the old Base.metadata.create_all startup hook have the
+tables but no alembic_version; they are stamped at the initial revision first
+so upgrading only applies what is new.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from .session import engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+INITIAL_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+    cfg.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def upgrade(revision: str = "head") -> None:
+    with engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+    cfg = alembic_config()
+    if "alembic_version" not in tables and "drivers" in tables:
+        command.stamp(cfg, INITIAL_REVISION)
+    command.upgrade(cfg, revision)
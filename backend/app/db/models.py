@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import (
-    Column, Integer, String, Date, DateTime, ForeignKey, Enum as SAEnum, UniqueConstraint
+    DDL, JSON, Column, Integer, String, Date, DateTime, ForeignKey, Enum as SAEnum, Index, UniqueConstraint, event
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .base import Base
@@ -62,6 +62,9 @@ class Driver(Base):
     __tablename__ = "drivers"
     __table_args__ = (
         UniqueConstraint("license_number", name="uq_driver_license"),
+        # Tenant-scoped query shapes: listing ordered by (name, id) and dob filters
+        Index("ix_drivers_company_name", "created_by_company_id", "name", "id"),
+        Index("ix_drivers_company_dob", "created_by_company_id", "dob"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -82,6 +85,10 @@ class Driver(Base):
 # -------- Driver Rating --------
 class DriverRating(Base):
     __tablename__ = "driver_ratings"
+    __table_args__ = (
+        # Rating history: WHERE driver_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_driver_ratings_driver_created", "driver_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id", ondelete="CASCADE"), index=True)
@@ -97,3 +104,131 @@ class DriverRating(Base):
 
     driver = relationship("Driver", back_populates="ratings")
     user = relationship("User", back_populates="ratings")
+
+
+# -------- Driver name search --------
+# Postgres searches driver_search_name(name) (app.search.normalize in SQL)
+# through a pg_trgm GIN index and license prefixes through a text_pattern_ops
+# index. Other backends (SQLite locally) use this portable trigram table, kept
+# in sync by app.search.
+class DriverNameGram(Base):
+    __tablename__ = "driver_name_ngrams"
+    # Postings are clustered by (company, gram) so a lookup is one range read, and
+    # within a gram by (name length, driver) so they come out in search rank order
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    company_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    gram: Mapped[str] = mapped_column(String(3), primary_key=True)
+    name_len: Mapped[int] = mapped_column(Integer, primary_key=True)
+    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+# Immutable (unaccent() alone is only stable), so it can back an expression index
+DRIVER_SEARCH_NAME_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION driver_search_name(text) RETURNS text"
+    " LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS"
+    " $$ SELECT btrim(regexp_replace(lower(public.unaccent('public.unaccent'::regdictionary, $1)),"
+    " '[^0-9a-z]+', ' ', 'g')) $$"
+)
+
+event.listen(
+    Driver.__table__,
+    "after_create",
+    DDL(
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+        " CREATE EXTENSION IF NOT EXISTS unaccent;"
+        f" {DRIVER_SEARCH_NAME_FUNCTION};"
+        " CREATE INDEX IF NOT EXISTS ix_drivers_name_trgm ON drivers USING gin (driver_search_name(name) gin_trgm_ops);"
+        " CREATE INDEX IF NOT EXISTS ix_drivers_license_prefix ON drivers (license_number text_pattern_ops);"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+# -------- Driver rating stats --------
+# Running totals per driver, maintained in the same transaction as each rating
+# (app.rating_stats) so summaries are one row read instead of a ratings scan.
+# Licenses are globally unique, so the same rows double as the cross-company
+# reputation read model, looked up by license_number.
+class DriverRatingStats(Base):
+    __tablename__ = "driver_rating_stats"
+
+    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True)
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), index=True)
+    license_number: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    dispatch_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    dispatch_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hr_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hr_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    safety_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    safety_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    accountant_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    accountant_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fleet_manager_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fleet_manager_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    last_rated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+# -------- Outbox --------
+# Side effects of a write, recorded in the same transaction and handled later
+# by app.outbox. available_at NULL marks an event that ran out of attempts.
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Drain order: WHERE available_at <= now ORDER BY available_at, id
+        Index("ix_outbox_events_due", "available_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    topic: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(String(500))
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    available_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+# -------- Rating rollups --------
+# Score histograms per (company, grain, bucket, driver, department), folded in
+# incrementally by app.analytics from driver_ratings rows past the watermark.
+# Scores are 1..5, so merged histograms give exact means and percentiles for
+# any range of buckets. Buckets are UTC days, ISO weeks (Monday) and months.
+class RatingRollup(Base):
+    __tablename__ = "rating_rollups"
+    # Clustered by company, grain and bucket so a trend read is one range scan
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    grain: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket: Mapped[Date] = mapped_column(Date, primary_key=True)
+    driver_id: Mapped[int] = mapped_column(ForeignKey("drivers.id", ondelete="CASCADE"), primary_key=True, index=True)
+    department: Mapped[DepartmentEnum] = mapped_column(
+        SAEnum(DepartmentEnum, name="department_enum", native_enum=False), primary_key=True
+    )
+
+    score_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# How far each incremental job has read: the last driver_ratings.id folded in
+class AnalyticsWatermark(Base):
+    __tablename__ = "analytics_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+event.listen(
+    AnalyticsWatermark.__table__,
+    "after_create",
+    DDL("INSERT INTO analytics_watermarks (name, last_id) VALUES ('rating_rollups', 0)"),
+)
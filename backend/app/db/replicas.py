@@ -0,0 +1,255 @@
+# backend/app/db/replicas.py
+"""
+Read-replica routing with read-your-writes per company.
+
+DATABASE_REPLICA_URLS lists read replicas. Read-only handlers take their
+session from read_session(company_id) (via the auth read-DB dependencies)
+instead of get_db:
+
+  - the company wrote within REPLICA_STICKY_SECONDS -> primary, so a client
+    sees its own writes;
+  - otherwise the next healthy replica, round-robin;
+  - no healthy replica (unreachable, or replaying more than
+    REPLICA_MAX_LAG_SECONDS behind) -> primary.
+
+A daemon thread per worker checks every replica each REPLICA_CHECK_SECONDS
+(SELECT 1 on SQLite, WAL replay lag on Postgres), so requests never wait on
+a health check; replicas count as unhealthy until their first check passes.
+Writers call mark_write(company_id) once the write commits. The "memory" mark
+backend is per worker; with several workers use "redis", or a company's next
+read may land on another worker that has not seen the write.
+
+Locally, point DATABASE_REPLICA_URLS at a second SQLite file (or Postgres
+instance) to exercise the routing; nothing replicates into it, which makes
+routing mistakes easy to spot.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.cache import TTLCache
+from ..core.instrumentation import instrument_engine
+from ..core.security import settings
+from .session import SessionLocal, _engine_kwargs, with_ssl
+
+logger = logging.getLogger(__name__)
+
+# 0 when caught up (or idle: nothing left to replay), else seconds since the last replayed commit
+_PG_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = with_ssl(url)
+        self.name = make_url(self.url).render_as_string(hide_password=True)
+        self.engine = create_engine(self.url, **_engine_kwargs(self.url))
+        instrument_engine(self.engine)
+        self.sessionmaker = sessionmaker(bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False)
+        self.healthy = False
+        self.lag_s: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._async_sessionmaker = None
+
+    def check(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = float(conn.execute(_PG_LAG).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as exc:
+            healthy, lag, self.error = False, None, f"{type(exc).__name__}: {exc}"[:300]
+        else:
+            healthy, self.error = lag <= settings.REPLICA_MAX_LAG_SECONDS, None
+        if healthy != self.healthy:
+            logger.warning("replica %s is now %s (lag %s)", self.name, "healthy" if healthy else "unhealthy", lag)
+        self.healthy, self.lag_s, self.checked_at = healthy, lag, time.time()
+
+    def async_sessionmaker(self):
+        if self._async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            from . import async_session
+
+            engine = create_async_engine(async_session.async_url(self.url), **async_session._engine_kwargs(self.url))
+            instrument_engine(engine.sync_engine)
+            self._async_sessionmaker = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        return self._async_sessionmaker
+
+    def stats(self) -> dict:
+        return {"url": self.name, "healthy": self.healthy, "lag_s": self.lag_s, "error": self.error, "checked_at": self.checked_at}
+
+
+# ----- Write marks -----
+class MemoryMarks:
+    def __init__(self, maxsize: int, ttl: float):
+        self._marks = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def mark(self, company_id: int) -> None:
+        self._marks.set(company_id, True)
+
+    def recent(self, company_id: int) -> bool:
+        return self._marks.get(company_id) is not None
+
+    def clear(self) -> None:
+        self._marks.clear()
+
+
+class RedisMarks:
+    def __init__(self, client, ttl: float, prefix: str = "wrote"):
+        self.client = client
+        self.ttl_ms = max(1, int(ttl * 1000))
+        self.prefix = prefix
+
+    def mark(self, company_id: int) -> None:
+        self.client.set(f"{self.prefix}:{company_id}", b"1", px=self.ttl_ms)
+
+    def recent(self, company_id: int) -> bool:
+        return self.client.get(f"{self.prefix}:{company_id}") is not None
+
+    def clear(self) -> None:
+        pass  # shared state; marks expire on their own
+
+
+def _build_marks():
+    kind = settings.REPLICA_STICKY_BACKEND.lower()
+    if kind == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisMarks(redis.Redis.from_url(settings.REPLICA_STICKY_REDIS_URL), settings.REPLICA_STICKY_SECONDS)
+    if kind == "memory":
+        return MemoryMarks(settings.REPLICA_STICKY_MAX_COMPANIES, settings.REPLICA_STICKY_SECONDS)
+    raise ValueError(f"Unknown REPLICA_STICKY_BACKEND {settings.REPLICA_STICKY_BACKEND!r}")
+
+
+# ----- Replica set -----
+_lock = threading.Lock()
+_replicas: Optional[List[Replica]] = None
+_marks = None
+_round_robin = itertools.count()
+_checker_pid: Optional[int] = None
+_stop = threading.Event()
+_counters = {"primary": 0, "replica": 0, "sticky": 0, "fallback": 0}
+
+
+def _urls() -> List[str]:
+    return [u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip()]
+
+
+def _check_loop(replicas: List[Replica], stop: threading.Event) -> None:
+    while not stop.is_set():
+        for replica in replicas:
+            replica.check()
+        stop.wait(settings.REPLICA_CHECK_SECONDS)
+
+
+def get_replicas() -> List[Replica]:
+    """Build the replica engines (and this process's checker thread) on first use."""
+    global _replicas, _marks, _checker_pid
+    if _replicas is None:
+        with _lock:
+            if _replicas is None:
+                _marks = _build_marks()
+                _replicas = [Replica(url) for url in _urls()]
+    if _replicas and _checker_pid != os.getpid():
+        with _lock:
+            if _checker_pid != os.getpid():  # first use, or first use after a fork
+                threading.Thread(target=_check_loop, args=(_replicas, _stop), name="replica-check", daemon=True).start()
+                _checker_pid = os.getpid()
+    return _replicas
+
+
+def configure(urls: Optional[List[str]] = None) -> None:
+    """Replace the replica set (None re-reads DATABASE_REPLICA_URLS); used by tests and tooling."""
+    global _replicas, _marks, _checker_pid, _stop
+    with _lock:
+        _stop.set()
+        for replica in _replicas or ():
+            replica.engine.dispose()
+        _stop = threading.Event()
+        _marks = _build_marks()
+        _replicas = [Replica(url) for url in (_urls() if urls is None else urls)]
+        _checker_pid = None
+        for key in _counters:
+            _counters[key] = 0
+
+
+def check_all() -> None:
+    """Run every health check now (otherwise the checker thread does, every REPLICA_CHECK_SECONDS)."""
+    for replica in get_replicas():
+        replica.check()
+
+
+def mark_write(company_id: int) -> None:
+    """Keep the company's reads on the primary for REPLICA_STICKY_SECONDS; call after its writes commit."""
+    if get_replicas():
+        _marks.mark(company_id)
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def pick(company_id: Optional[int]) -> Optional[Replica]:
+    """The replica to read from, or None for the primary."""
+    replicas = get_replicas()
+    if not replicas:
+        _count("primary")
+        return None
+    if company_id is not None and _marks.recent(company_id):
+        _count("sticky")
+        return None
+    healthy = [r for r in replicas if r.healthy]
+    if not healthy:
+        _count("fallback")
+        return None
+    _count("replica")
+    return healthy[next(_round_robin) % len(healthy)]
+
+
+def read_session(company_id: Optional[int]) -> Session:
+    replica = pick(company_id)
+    return replica.sessionmaker() if replica is not None else SessionLocal()
+
+
+def async_read_session(company_id: Optional[int]):
+    replica = pick(company_id)
+    if replica is not None:
+        return replica.async_sessionmaker()()
+    from .async_session import new_session
+
+    return new_session()
+
+
+def dispose_after_fork() -> None:
+    for replica in _replicas or ():
+        replica.engine.dispose(close=False)
+        if replica._async_sessionmaker is not None:
+            replica._async_sessionmaker.kw["bind"].sync_engine.dispose(close=False)
+
+
+async def dispose_async_engines() -> None:
+    for replica in _replicas or ():
+        if replica._async_sessionmaker is not None:
+            await replica._async_sessionmaker.kw["bind"].dispose()
+            replica._async_sessionmaker = None
+
+
+def stats() -> dict:
+    replicas = get_replicas()
+    with _lock:
+        reads = dict(_counters)
+    return {"replicas": [r.stats() for r in replicas], "reads": reads, "sticky_s": settings.REPLICA_STICKY_SECONDS}
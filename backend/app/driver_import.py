@@ -0,0 +1,275 @@
+# app/driver_import.py
+"""
+Streaming bulk driver import (CSV or NDJSON).
+
+Rows are parsed as the upload streams in, validated with DriverCreate and
+written in chunks: one set-based license lookup per chunk, then a single
+multi-row INSERT (COPY on Postgres through psycopg2) and a commit. Each chunk is its own
+transaction, so a bad row never sinks the rest of the file; it just shows up
+in the error report with its line number.
+"""
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models, response_cache, schemas, search, suggest
+from .core.security import settings
+from .db import replicas
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Cap on reported errors so a completely wrong file doesn't produce a huge response
+MAX_REPORTED_ERRORS = 1000
+
+_COPY_COLUMNS = ("name", "dob", "license_number", "created_by_company_id", "created_at")
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str, license_number: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "license_number": license_number, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+# ----- Parsing -----
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class _LineFeed:
+    """Resumable iterator so the stdlib csv reader can pull lines that arrive asynchronously."""
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+def _ends_in_quotes(line: str, quoted: bool) -> bool:
+    """
+    Whether a CSV record is still inside a quoted field after `line`, given
+    whether it was at the start of it (default dialect: `"` quotes, `""` escapes).
+    """
+    if '"' not in line:
+        return quoted
+    field_start = not quoted
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if quoted:
+            if ch == '"':
+                if line[i + 1:i + 2] == '"':
+                    i += 1
+                else:
+                    quoted = False
+        elif ch == '"' and field_start:
+            quoted = True
+        field_start = ch == "," and not quoted
+        i += 1
+    return quoted
+
+
+async def parse_rows(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line_number, dict | error message) per data row."""
+    if content_type in NDJSON_TYPES:
+        line_no = 0
+        async for line in iter_lines(chunks):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                yield line_no, row if isinstance(row, dict) else "Expected a JSON object"
+            except ValueError as exc:
+                yield line_no, f"Invalid JSON: {exc}"
+        return
+
+    # One reader over one continuous feed, handed whole records only: a quoted
+    # field may span lines, and the reader must not see the feed run dry inside one
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header: Optional[List[str]] = None
+    quoted, pending = False, 0
+    start = 1  # line the next record starts on
+    async for line in iter_lines(chunks):
+        feed.lines.append(line)
+        quoted = _ends_in_quotes(line, quoted)
+        pending += len(line)
+        # An unterminated quote is handed over once it outgrows the field limit, so the reader rejects it
+        if quoted and pending <= csv.field_size_limit():
+            continue
+        quoted, pending = False, 0
+        try:
+            for record in reader:
+                line_no, start = start, reader.line_num + 1
+                if not any(field.strip() for field in record):
+                    continue
+                if header is None:
+                    header = [h.strip() for h in record]
+                    continue
+                yield line_no, dict(zip(header, record)) if len(record) == len(header) else (
+                    f"Expected {len(header)} columns, got {len(record)}"
+                )
+        except csv.Error as exc:
+            # The reader has lost track of record boundaries; later rows can't be trusted
+            yield start, f"Invalid CSV, stopped reading here: {exc}"
+            return
+    if quoted:
+        yield start, "Invalid CSV, stopped reading here: unterminated quoted field"
+
+
+def validate(line_no: int, raw, report: ImportReport) -> Optional[schemas.DriverCreate]:
+    if isinstance(raw, str):
+        report.error(line_no, raw)
+        return None
+    try:
+        return schemas.DriverCreate.model_validate(raw)
+    except ValidationError as exc:
+        problems = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+        report.error(line_no, problems, raw.get("license_number"))
+        return None
+
+
+# ----- Writing -----
+def _existing_licenses(db: Session, licenses: List[str]) -> set:
+    return set(
+        db.execute(select(models.Driver.license_number).where(models.Driver.license_number.in_(licenses))).scalars()
+    )
+
+
+def _copy_drivers(db: Session, rows: List[dict]) -> None:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row[c] for c in _COPY_COLUMNS])
+    buf.seek(0)
+    statement = f"COPY drivers ({', '.join(_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    dbapi = db.get_bind().dialect.dbapi
+    try:
+        with db.connection().connection.cursor() as cur:
+            cur.copy_expert(statement, buf)
+    except dbapi.Error as exc:
+        # The raw cursor bypasses SQLAlchemy; wrap like any other statement so a
+        # duplicate license surfaces as IntegrityError
+        raise DBAPIError.instance(statement, None, exc, dbapi.Error) from exc
+
+
+def _insert_drivers(db: Session, rows: List[dict]) -> None:
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        # The trigram index is maintained by Postgres itself, so COPY needs nothing else
+        _copy_drivers(db, rows)
+        return
+    created = db.execute(
+        insert(models.Driver).returning(
+            models.Driver.id, models.Driver.name, models.Driver.created_by_company_id
+        ),
+        rows,
+    ).mappings().all()
+    search.index_drivers(db.connection(), created)
+
+
+def write_chunk(db: Session, company_id: int, chunk: List[Tuple[int, schemas.DriverCreate]], report: ImportReport) -> None:
+    """Insert one chunk of validated, in-file-unique rows in its own transaction."""
+    for _ in range(2):
+        taken = _existing_licenses(db, [d.license_number for _, d in chunk])
+        now = datetime.utcnow()
+        rows, conflicts = [], []
+        for line_no, d in chunk:
+            if d.license_number in taken:
+                conflicts.append((line_no, d.license_number))
+                continue
+            rows.append({
+                "name": d.name,
+                "dob": d.dob,
+                "license_number": d.license_number,
+                "created_by_company_id": company_id,
+                "created_at": now,
+            })
+        try:
+            if rows:
+                _insert_drivers(db, rows)
+            db.commit()
+        except IntegrityError:
+            # A concurrent writer took one of these licenses after our lookup; re-check once
+            db.rollback()
+            continue
+        if rows:
+            response_cache.invalidate_company(company_id)
+            replicas.mark_write(company_id)
+            suggest.invalidate_company(company_id)
+        for line_no, license_number in conflicts:
+            report.error(line_no, "Driver already exists", license_number)
+        report.inserted += len(rows)
+        return
+
+    for line_no, d in chunk:
+        report.error(line_no, "Conflicting concurrent write, retry this row", d.license_number)
+
+
+async def run_import(content_type: str, chunks: AsyncIterator[bytes], company_id: int, flush) -> Dict:
+    """
+    Drive the import. `flush(fn, *args)` must call fn(session, *args) off the
+    event loop: run_in_threadpool with a Session, or AsyncSession.run_sync.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in CSV_TYPES | NDJSON_TYPES:
+        raise HTTPException(status_code=415, detail="Upload text/csv or application/x-ndjson")
+
+    report = ImportReport()
+    seen: set = set()
+    chunk: List[Tuple[int, schemas.DriverCreate]] = []
+    async for line_no, raw in parse_rows(media_type, chunks):
+        driver = validate(line_no, raw, report)
+        if driver is None:
+            continue
+        if driver.license_number in seen:
+            report.error(line_no, "Duplicate license_number in file", driver.license_number)
+            continue
+        seen.add(driver.license_number)
+        chunk.append((line_no, driver))
+        if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+            await flush(write_chunk, company_id, chunk, report)
+            chunk = []
+    if chunk:
+        await flush(write_chunk, company_id, chunk, report)
+    return report.as_dict()
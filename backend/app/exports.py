@@ -0,0 +1,125 @@
+# app/exports.py
+"""
+Streaming NDJSON/CSV exports of a company's drivers and rating history.
+
+Rows come off a server-side cursor (yield_per, which implies stream_results on
+Postgres) EXPORT_BATCH_SIZE at a time and each batch is encoded into one chunk
+of the StreamingResponse, so memory stays bounded by the batch size no matter
+how many rows the tenant has. The generator opens its own session: the
+request's get_db session is already closed by the time the body streams.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterator, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from . import models
+from .core.security import settings
+from .db.session import SessionLocal
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+DRIVER_COLUMNS = (
+    models.Driver.id,
+    models.Driver.name,
+    models.Driver.dob,
+    models.Driver.license_number,
+    models.Driver.created_at,
+)
+RATING_COLUMNS = (
+    models.DriverRating.id,
+    models.DriverRating.driver_id,
+    models.Driver.license_number,
+    models.DriverRating.user_id,
+    models.DriverRating.department,
+    models.DriverRating.score,
+    models.DriverRating.comment,
+    models.DriverRating.created_at,
+)
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def drivers_query(company_id: int, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    stmt = select(*DRIVER_COLUMNS).where(models.Driver.created_by_company_id == company_id)
+    return _created_between(stmt, models.Driver.created_at, created_from, created_to).order_by(models.Driver.id)
+
+
+def ratings_query(company_id: int, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None):
+    stmt = (
+        select(*RATING_COLUMNS)
+        .join(models.Driver, models.Driver.id == models.DriverRating.driver_id)
+        .where(models.Driver.created_by_company_id == company_id)
+    )
+    # Grouped per driver so the plan starts from the company's drivers and walks
+    # ix_driver_ratings_driver_created, rather than every tenant's ratings by id
+    return _created_between(stmt, models.DriverRating.created_at, created_from, created_to).order_by(
+        models.Driver.id, models.DriverRating.created_at, models.DriverRating.id
+    )
+
+
+def _created_between(stmt, column, created_from: Optional[datetime], created_to: Optional[datetime]):
+    """`created_from` is inclusive, `created_to` exclusive."""
+    if created_from is not None and created_to is not None and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+    if created_from is not None:
+        stmt = stmt.where(column >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(column < created_to)
+    return stmt
+
+
+def _encode_batches(fmt: str, columns: Sequence[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows([_plain(v) for v in row] for row in batch)
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue().encode()  # header only: no rows
+        return
+    for batch in batches:
+        yield "".join(
+            json.dumps({c: _plain(v) for c, v in zip(columns, row)}, separators=(",", ":")) + "\n" for row in batch
+        ).encode()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def stream(stmt, fmt: str, gzip: bool = False, session_factory=SessionLocal) -> Iterator[bytes]:
+    """Encoded export body; runs the query on its own session (from session_factory) when iteration starts."""
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+
+    def batches_and_encode() -> Iterator[bytes]:
+        db = session_factory()
+        try:
+            result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+            yield from _encode_batches(fmt, list(result.keys()), result.partitions())
+        finally:
+            db.close()
+
+    return _gzip(batches_and_encode()) if gzip else batches_and_encode()
@@ -0,0 +1,122 @@
+# app/hashing.py
+"""
+Bounded bcrypt worker pool.
+
+bcrypt is deliberately slow (~250ms per call), so running it on a request
+worker stalls every other endpoint during a login burst. Hashing and
+verification are shipped to a small process pool instead; callers await the
+result. When more than HASH_POOL_SIZE + HASH_QUEUE_DEPTH jobs are in flight we
+shed load with 503 + Retry-After rather than letting the backlog grow.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from . import utils
+from .core import instrumentation
+from .core.security import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "queue_wait_total_s": 0.0,
+    "queue_wait_max_s": 0.0,
+    "hash_time_total_s": 0.0,
+    "hash_time_max_s": 0.0,
+}
+
+
+def _timed(fn: Callable, *args) -> Tuple[object, float, float]:
+    # Runs in the worker process. time.monotonic() is system-wide on Linux,
+    # so the start stamp is comparable with the parent's submit stamp.
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=max(1, settings.HASH_POOL_SIZE))
+    return _executor
+
+
+def _acquire_slot() -> None:
+    global _in_flight
+    capacity = max(1, settings.HASH_POOL_SIZE) + max(0, settings.HASH_QUEUE_DEPTH)
+    with _lock:
+        if _in_flight >= capacity:
+            _stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": str(settings.HASH_RETRY_AFTER_SECONDS)},
+            )
+        _in_flight += 1
+        _stats["submitted"] += 1
+
+
+def _release_slot(submitted_at: float, started: Optional[float], finished: Optional[float]) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+        if started is None or finished is None:
+            return
+        wait, took = max(0.0, started - submitted_at), finished - started
+        _stats["completed"] += 1
+        _stats["queue_wait_total_s"] += wait
+        _stats["queue_wait_max_s"] = max(_stats["queue_wait_max_s"], wait)
+        _stats["hash_time_total_s"] += took
+        _stats["hash_time_max_s"] = max(_stats["hash_time_max_s"], took)
+
+
+async def _run(fn: Callable, *args):
+    _acquire_slot()
+    submitted_at = time.monotonic()
+    started = finished = None
+    try:
+        loop = asyncio.get_running_loop()
+        with instrumentation.span("hash"):
+            result, started, finished = await loop.run_in_executor(_get_executor(), _timed, fn, *args)
+        return result
+    finally:
+        _release_slot(submitted_at, started, finished)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(utils.hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run(utils.verify_password, plain_password, hashed_password)
+
+
+def stats() -> dict:
+    with _lock:
+        snapshot = dict(_stats)
+        snapshot["in_flight"] = _in_flight
+    completed = snapshot["completed"] or 1
+    snapshot["queue_wait_avg_s"] = snapshot["queue_wait_total_s"] / completed
+    snapshot["hash_time_avg_s"] = snapshot["hash_time_total_s"] / completed
+    snapshot["pool_size"] = settings.HASH_POOL_SIZE
+    snapshot["queue_depth"] = settings.HASH_QUEUE_DEPTH
+    return snapshot
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
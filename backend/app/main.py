@@ -1,31 +1,53 @@
+import logging
+import uuid
 from typing import List, Optional
-from datetime import datetime, timedelta, timezone, date
+from datetime import datetime, timedelta, timezone
 
-from fastapi import FastAPI, Depends, HTTPException, status, Response
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import PlainTextResponse
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 # Local imports
-from . import models, schemas, utils
-from .routes import ping, staff
-from .auth import get_current_staff_user as get_current_staff
+from . import analytics, crud, models, schemas, hashing, outbox, pagination, principals, response_cache, serialization
+from .routes import analytics as analytics_routes, ping, staff, ops
+from .auth import ALGORITHM, get_company_read_db, get_current_company
+from .core.instrumentation import RequestMetricsMiddleware, mark_ready, render as render_metrics
+from .rate_limit import RateLimitMiddleware
 from .core.security import settings  # has SECRET_KEY, STAFF_SECRET_KEY, DATABASE_URL, CORS_ORIGINS
-from .db.session import get_db, engine
-from .db.base import Base
+from .db import replicas
+from .db.session import get_db
+from .db.async_session import dispose_async_engine
+
+# Kept out of the import path on purpose (cold start): python-jose/cryptography
+# load on the first token, alembic only when migrations run in this process,
+# and only the driver router that is actually served gets built.
+# `python -m app.manage profile-startup` shows what import time is left.
+if settings.DB_ASYNC:
+    from .routes import drivers_async as driver_routes
+else:
+    from .routes import drivers as driver_routes
+
+logger = logging.getLogger(__name__)
 
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = HTTPBearer()
 
 
 # FastAPI app
-app = FastAPI()
+app = FastAPI(default_response_class=serialization.default_response_class())
 app.include_router(ping.router)
 app.include_router(staff.router)
+app.include_router(ops.router)
+app.include_router(analytics_routes.router)
+# DB_ASYNC serves the driver/rating endpoints from AsyncSession handlers
+app.include_router(driver_routes.router)
+
+# Rate limits / admission control (see app/rate_limit.py). Added first, so it
+# runs inside CORS and the metrics middleware: 429s carry CORS headers and are counted
+app.add_middleware(RateLimitMiddleware)
 
 # ----- CORS (env-driven) -----
 # e.g. CORS_ORIGINS="http://localhost:5173,https://driver.post312.com"
@@ -36,67 +58,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+# Outermost, so its timings include the other middleware
+app.add_middleware(RequestMetricsMiddleware)
 
 # ----- Utils -----
 def create_access_token(data: dict, secret_key: str, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, secret_key, algorithm=ALGORITHM)
 
-# ----- Auth helpers -----
-def get_current_company(
-    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid authentication credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+# The auth handlers are async so they can await the bcrypt pool. Their DB work
+# runs in the threadpool, and reads end their transaction first, so no pooled
+# connection is held while a request waits on bcrypt; otherwise a login burst
+# larger than the pool blocks the event loop in checkout and deadlocks.
+def _fetch_one(db: Session, stmt):
     try:
-        payload = jwt.decode(token.credentials, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        company_id_raw = payload.get("sub")
-        company_id: Optional[int] = int(company_id_raw) if company_id_raw is not None else None
-        if company_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    company = db.query(models.Company).filter(models.Company.id == company_id).first()
-    if company is None:
-        raise credentials_exception
-    return company
+        return db.execute(stmt).first()
+    finally:
+        db.rollback()
+
+def _save(db: Session, obj) -> None:
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+
+def _save_invite(db: Session, user: models.User) -> None:
+    db.add(user)
+    db.flush()
+    outbox.enqueue(db, "staff.invited", user_id=user.id, company_id=user.company_id)
+    db.commit()
+    db.refresh(user)
 
 # ----- CEO routes -----
 @app.post("/register")
-def register_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.Company).filter(models.Company.email == company.email).first()
+async def register_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(_fetch_one, db, select(models.Company.id).where(models.Company.email == company.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = utils.hash_password(company.password)
+    hashed_pw = await hashing.hash_password_async(company.password)
     new_company = models.Company(
         name=company.name,
         email=company.email,
         password=hashed_pw,
         address=company.address,
     )
-    db.add(new_company)
-    db.commit()
-    db.refresh(new_company)
+    await run_in_threadpool(_save, db, new_company)
     return {"message": "Company registered successfully", "company_id": new_company.id}
 
 @app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    company = db.query(models.Company).filter(models.Company.email == form_data.username).first()
-    if not company or not utils.verify_password(form_data.password, company.password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    company = await run_in_threadpool(
+        _fetch_one, db, select(models.Company.id, models.Company.password).where(models.Company.email == form_data.username)
+    )
+    if not company or not await hashing.verify_password_async(form_data.password, company.password):
         raise HTTPException(status_code=400, detail="Invalid email or password")
     access_token = create_access_token(data={"sub": str(company.id)}, secret_key=settings.SECRET_KEY)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/company/me")
-def read_company_me(current_company: models.Company = Depends(get_current_company)):
+def read_company_me(current_company: principals.CompanyPrincipal = Depends(get_current_company)):
     return {
         "id": current_company.id,
         "name": current_company.name,
@@ -105,21 +130,25 @@ def read_company_me(current_company: models.Company = Depends(get_current_compan
     }
 
 @app.post("/invite-user")
-def invite_user(
+async def invite_user(
     user: schemas.InviteUser,
     db: Session = Depends(get_db),
-    current_company: models.Company = Depends(get_current_company),
+    current_company: principals.CompanyPrincipal = Depends(get_current_company),
 ):
     allowed_departments = {"dispatch", "hr", "safety", "accountant", "fleet_manager"}
     if user.department not in allowed_departments:
         raise HTTPException(status_code=400, detail="Invalid department")
 
-    existing = db.query(models.User).filter_by(company_id=current_company.id, department=user.department).first()
+    existing = await run_in_threadpool(
+        _fetch_one,
+        db,
+        select(models.User.id).where(models.User.company_id == current_company.id, models.User.department == user.department),
+    )
     if existing:
         raise HTTPException(status_code=400, detail=f"{user.department} already exists in your company")
 
     # TODO: replace with one-time invite token flow in production
-    hashed_pw = utils.hash_password("changeme123")
+    hashed_pw = await hashing.hash_password_async("changeme123")
     new_user = models.User(
         name=user.name,
         email=user.email,
@@ -128,122 +157,69 @@ def invite_user(
         company_id=current_company.id,
         must_reset_password=True,  # add this column if not present
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(_save_invite, db, new_user)
+    response_cache.invalidate_company(current_company.id)
+    replicas.mark_write(current_company.id)
     return {"message": f"{user.department} invited", "user_id": new_user.id, "default_password": "changeme123"}
 
-@app.get("/company/staff")
+@app.get("/company/staff", response_model=List[schemas.StaffUserResponse])
 def get_company_staff(
-    current_company: models.Company = Depends(get_current_company),
-    db: Session = Depends(get_db),
+    request: Request,
+    current_company: principals.CompanyPrincipal = Depends(get_current_company),
+    db: Session = Depends(get_company_read_db),
 ):
-    staff_users = db.query(models.User).filter(models.User.company_id == current_company.id).all()
-    return [{"id": u.id, "name": u.name, "email": u.email, "department": u.department} for u in staff_users]
+    cached = response_cache.lookup(request, current_company.id)
+    if cached.response is not None:
+        return cached.response
+    return cached.store(List[schemas.StaffUserResponse], crud.list_company_staff(db, current_company.id), trusted=True)
 
 # ----- Staff routes -----
 @app.post("/staff-login")
-def staff_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    staff_user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not staff_user or not utils.verify_password(form_data.password, staff_user.password):
-        raise HTTPException(status_code=400, detail="Invalid email or password")
-    access_token = create_access_token(data={"sub": str(staff_user.id)}, secret_key=settings.STAFF_SECRET_KEY)
-    return {"access_token": access_token, "token_type": "bearer"}
-
-# ----- Driver management -----
-@app.post("/drivers", response_model=schemas.DriverResponse)
-def create_driver(
-    driver: schemas.DriverCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_company),
-):
-    existing = db.query(models.Driver).filter(models.Driver.license_number == driver.license_number).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Driver already exists")
-    new_driver = models.Driver(
-        name=driver.name,
-        dob=driver.dob,
-        license_number=driver.license_number,
-        created_by_company_id=current_user.id,
+async def staff_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    staff_user = await run_in_threadpool(
+        _fetch_one,
+        db,
+        select(models.User.id, models.User.password, models.User.company_id).where(models.User.email == form_data.username),
     )
-    db.add(new_driver)
-    db.commit()
-    db.refresh(new_driver)
-    return new_driver
-
-@app.get("/drivers/search", response_model=List[schemas.DriverResponse])
-def search_drivers(
-    name: str = "",
-    dob: Optional[date] = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_company),
-):
-    q = db.query(models.Driver).filter(models.Driver.created_by_company_id == current_user.id)
-    if name:
-        q = q.filter(models.Driver.name.ilike(f"%{name}%"))
-    if dob:
-        q = q.filter(models.Driver.dob == dob)
-    return q.offset(offset).limit(limit).all()
-
-@app.get("/drivers/{driver_id}", response_model=schemas.DriverResponse)
-def get_driver(
-    driver_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_company),
-):
-    driver = db.query(models.Driver).filter_by(id=driver_id, created_by_company_id=current_user.id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    return driver
-
-# ----- Driver rating -----
-@app.post("/ratings", response_model=schemas.DriverRatingResponse)
-def rate_driver(
-    rating: schemas.DriverRatingCreate,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_staff),
-):
-    driver = db.query(models.Driver).filter(models.Driver.id == rating.driver_id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    if driver.created_by_company_id != current_user.company_id:
-        raise HTTPException(status_code=403, detail="You can only rate drivers from your company")
-
-    new_rating = models.DriverRating(
-        driver_id=rating.driver_id,
-        user_id=current_user.id,
-        department=current_user.department,
-        score=rating.score,
-        comment=rating.comment,
+    if not staff_user or not await hashing.verify_password_async(form_data.password, staff_user.password):
+        raise HTTPException(status_code=400, detail="Invalid email or password")
+    # `cid` lets the rate limiter key staff requests by company without a DB lookup
+    access_token = create_access_token(
+        data={"sub": str(staff_user.id), "cid": staff_user.company_id}, secret_key=settings.STAFF_SECRET_KEY
     )
-    db.add(new_rating)
-    db.commit()
-    db.refresh(new_rating)
-    return new_rating
-
-@app.get("/drivers/{driver_id}/ratings", response_model=List[schemas.DriverRatingResponse])
-def get_driver_ratings(
-    driver_id: int,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_company),
-):
-    driver = db.query(models.Driver).filter_by(id=driver_id, created_by_company_id=current_user.id).first()
-    if not driver:
-        raise HTTPException(status_code=404, detail="Driver not found")
-    return driver.ratings
+    return {"access_token": access_token, "token_type": "bearer"}
 
 # ----- Health & misc -----
 @app.get("/healthz", include_in_schema=False)
 def healthz():
     return {"ok": True}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/favicon.ico", include_in_schema=False)
 def favicon():
     return Response(status_code=204)
 
 @app.on_event("startup")
 def on_startup():
-    # Dev only: prefer Alembic migrations in AWS
-    Base.metadata.create_all(bind=engine)
+    # Under app.server migrations already ran once in the master and this is off
+    if settings.MIGRATE_ON_STARTUP:
+        from .db import migrate
+
+        migrate.upgrade()
+    logger.info("worker ready, %.2fs after launch", mark_ready())
+
+@app.on_event("startup")
+async def start_outbox_worker():
+    outbox.start_worker()
+    analytics.start_refresher()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await outbox.stop_worker()
+    await analytics.stop_refresher()
+    hashing.shutdown()
+    await dispose_async_engine()
+    await replicas.dispose_async_engines()
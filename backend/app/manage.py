@@ -0,0 +1,94 @@
+# app/manage.py
+"""
+Maintenance commands.
+
+    python -m app.manage migrate
+    python -m app.manage reindex-search
+    python -m app.manage rebuild-stats
+    python -m app.manage profile-startup
+    python -m app.manage outbox-worker [--once]
+    python -m app.manage analytics-refresh [--rebuild]
+"""
+import argparse
+import logging
+
+from . import analytics, outbox, rating_stats, search
+from .core import startup
+from .db import migrate as db_migrate
+from .db.session import SessionLocal
+
+
+def migrate(args) -> None:
+    db_migrate.upgrade(args.revision)
+
+
+def reindex_search(args) -> None:
+    db = SessionLocal()
+    try:
+        print(f"indexed {search.rebuild_index(db, batch_size=args.batch_size)} drivers")
+    finally:
+        db.close()
+
+
+def rebuild_stats(args) -> None:
+    db = SessionLocal()
+    try:
+        print(f"rebuilt rating stats for {rating_stats.rebuild(db)} drivers")
+    finally:
+        db.close()
+
+
+def profile_startup(args) -> None:
+    print(startup.report(startup.profile(args.module), top=args.top))
+
+
+def outbox_worker(args) -> None:
+    if args.once:
+        print(f"handled {outbox.drain_all()} outbox events")
+        return
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        outbox.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def analytics_refresh(args) -> None:
+    folded = analytics.rebuild() if args.rebuild else analytics.refresh()
+    print(f"folded {folded} ratings into rating_rollups")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="apply Alembic migrations (stamps create_all-built databases first)")
+    p.add_argument("revision", nargs="?", default="head")
+    p.set_defaults(func=migrate)
+
+    p = sub.add_parser("reindex-search", help="rebuild the driver name n-gram index (non-Postgres backends)")
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.set_defaults(func=reindex_search)
+
+    p = sub.add_parser("rebuild-stats", help="recompute driver_rating_stats from driver_ratings")
+    p.set_defaults(func=rebuild_stats)
+
+    p = sub.add_parser("profile-startup", help="time importing the app and serving the first /healthz, per module")
+    p.add_argument("--module", default="app.main")
+    p.add_argument("--top", type=int, default=20)
+    p.set_defaults(func=profile_startup)
+
+    p = sub.add_parser("outbox-worker", help="drain outbox events (run with OUTBOX_WORKER=off on the API)")
+    p.add_argument("--once", action="store_true", help="drain what is due, then exit")
+    p.set_defaults(func=outbox_worker)
+
+    p = sub.add_parser("analytics-refresh", help="fold new ratings into rating_rollups (cron it with ANALYTICS_REFRESH_SECONDS=0)")
+    p.add_argument("--rebuild", action="store_true", help="drop the rollups and fold the whole history again")
+    p.set_defaults(func=analytics_refresh)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,12 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime  # ✅ This is what you were missing
-from app.database import Base
-
-
-class Company(Base):
-    __tablename__ = "companies"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String, nullable=False)
-    address = Column(String, nullable=True)
-
-    users = relationship("User", back_populates="company", cascade="all, delete-orphan")  # ✅ Moved inside class
-
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String, nullable=True)  # Optional: for now
-    department = Column(String, nullable=False)
-    company_id = Column(Integer, ForeignKey("companies.id"))
-
-    company = relationship("Company", back_populates="users")
-
-class Driver(Base):
-    __tablename__ = "drivers"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    dob = Column(Date, index=True)
-    license_number = Column(String, unique=True, index=True)
-    created_by_company_id = Column(Integer, ForeignKey("companies.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    ratings = relationship("DriverRating", back_populates="driver")
-    company = relationship("Company")
-
-class DriverRating(Base):
-    __tablename__ = "driver_ratings"
-
-    id = Column(Integer, primary_key=True, index=True)
-    driver_id = Column(Integer, ForeignKey("drivers.id"))
-    user_id = Column(Integer, ForeignKey("users.id"))
-    department = Column(String)
-    score = Column(Integer)
-    comment = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-    driver = relationship("Driver", back_populates="ratings")
-    user = relationship("User")
-
+# app/models.py
+# The ORM models are defined once in app.db.models; re-exported here so
+# `from app import models` keeps working across main, auth and the routers.
+from .db.models import (
+    Company, User, Driver, DriverRating, DriverNameGram, DriverRatingStats, OutboxEvent, RatingRollup,
+    AnalyticsWatermark, DepartmentEnum,
+)
+
+__all__ = [
+    "Company", "User", "Driver", "DriverRating", "DriverNameGram", "DriverRatingStats", "OutboxEvent", "RatingRollup",
+    "AnalyticsWatermark", "DepartmentEnum",
+]
@@ -0,0 +1,27 @@
+# app/notifications.py
+"""
+Outbound notifications, delivered by outbox handlers once the write commits.
+
+There is no mail transport yet, so deliveries are logged. Handlers only read,
+so a redelivered event at worst repeats a notification.
+"""
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, outbox
+
+logger = logging.getLogger(__name__)
+
+
+@outbox.handler("staff.invited")
+def staff_invited(db: Session, payload: dict) -> None:
+    row = db.execute(
+        select(models.User.email, models.User.department, models.Company.name.label("company"))
+        .join(models.Company, models.Company.id == models.User.company_id)
+        .where(models.User.id == payload["user_id"])
+    ).first()
+    if row is None:
+        return  # removed before we got to it
+    logger.info("invite: %s joins %s as %s", row.email, row.company, getattr(row.department, "value", row.department))
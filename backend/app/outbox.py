@@ -0,0 +1,273 @@
+# app/outbox.py
+"""
+Transactional outbox for post-write side effects.
+
+Writers call enqueue() before committing, so the event row commits (or rolls
+back) with the change that caused it, and the request only pays for one extra
+INSERT. drain() works through due events in batches:
+
+  1. claim: select due ids (FOR UPDATE SKIP LOCKED on Postgres) and push their
+     available_at out by OUTBOX_LEASE_SECONDS, so concurrent drainers skip them
+     and a crashed worker's batch comes back after the lease;
+  2. handle: run every handler and delete the events in one transaction; if a
+     handler raises, redo the batch one event per transaction and reschedule
+     the failures with exponential backoff, parking them (available_at NULL)
+     after OUTBOX_MAX_ATTEMPTS.
+
+Delivery is at-least-once (a lease can expire mid-batch, and SQLite has no
+row locks), so handlers must be idempotent. A handler's own writes commit
+together with its event's delete.
+
+Handlers live next to the data they maintain and register with @handler;
+HANDLER_MODULES lists the modules to import so a standalone worker sees them.
+"""
+import asyncio
+import importlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .core import instrumentation
+from .core.security import settings
+from .db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+HANDLER_MODULES = ("app.search", "app.notifications")
+MAX_BACKOFF_SECONDS = 3600
+
+Handler = Callable[[Session, dict], None]
+_handlers: Dict[str, Handler] = {}
+_loaded = False
+_events = models.OutboxEvent
+
+
+def handler(topic: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        _handlers[topic] = fn
+        return fn
+
+    return register
+
+
+def _load_handlers() -> None:
+    global _loaded
+    if not _loaded:
+        for name in HANDLER_MODULES:
+            importlib.import_module(name)
+        _loaded = True
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Postgres hands timestamptz back aware, SQLite naive; writes are naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def enqueue(db: Session, topic: str, **payload) -> None:
+    """Record an event in the caller's transaction; it is handled after the commit."""
+    db.add(models.OutboxEvent(topic=topic, payload=payload))
+    db.info["outbox_pending"] = True
+
+
+# ----- Draining -----
+def _claim(db: Session, limit: int) -> List[int]:
+    now = _now()
+    ids = list(
+        db.execute(
+            select(_events.id)
+            .where(_events.available_at <= now)
+            .order_by(_events.available_at, _events.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars()
+    )
+    if ids:
+        db.execute(
+            update(_events)
+            .where(_events.id.in_(ids))
+            .values(available_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS))
+        )
+    db.commit()
+    return ids
+
+
+def _run(db: Session, outbox_event: models.OutboxEvent) -> None:
+    fn = _handlers.get(outbox_event.topic)
+    if fn is None:
+        raise LookupError(f"no outbox handler for {outbox_event.topic!r}")
+    fn(db, outbox_event.payload)
+
+
+def _done(handled: List[Tuple[str, datetime]]) -> None:
+    now = _now()
+    for topic, created_at in handled:
+        instrumentation.record_outbox(topic, "handled", (now - _naive_utc(created_at)).total_seconds())
+
+
+def _fail(db: Session, outbox_event: models.OutboxEvent, exc: Exception) -> None:
+    outbox_event.attempts += 1
+    outbox_event.last_error = f"{type(exc).__name__}: {exc}"[:500]
+    if outbox_event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        outbox_event.available_at = None
+        outcome = "dead"
+        logger.error("outbox event %s (%s) gave up after %d attempts: %s",
+                     outbox_event.id, outbox_event.topic, outbox_event.attempts, outbox_event.last_error)
+    else:
+        delay = min(settings.OUTBOX_BACKOFF_SECONDS * 2 ** (outbox_event.attempts - 1), MAX_BACKOFF_SECONDS)
+        outbox_event.available_at = _now() + timedelta(seconds=delay)
+        outcome = "retried"
+        logger.warning("outbox event %s (%s) failed, retrying in %.0fs: %s",
+                       outbox_event.id, outbox_event.topic, delay, outbox_event.last_error)
+    db.commit()
+    instrumentation.record_outbox(outbox_event.topic, outcome)
+
+
+def drain(limit: Optional[int] = None) -> int:
+    """Handle one batch of due events; returns how many were claimed."""
+    _load_handlers()
+    db = SessionLocal()
+    try:
+        ids = _claim(db, limit or settings.OUTBOX_BATCH_SIZE)
+        if not ids:
+            return 0
+        events = list(db.execute(select(_events).where(_events.id.in_(ids)).order_by(_events.id)).scalars())
+        # Read before committing: deleted rows can't be refreshed afterwards
+        meta = [(e.topic, e.created_at) for e in events]
+        try:
+            for e in events:
+                _run(db, e)
+                db.delete(e)
+            db.commit()
+            _done(meta)
+            return len(ids)
+        except Exception:
+            db.rollback()
+
+        # Something in the batch failed: isolate it
+        for e, handled in zip(events, meta):
+            try:
+                _run(db, e)
+                db.delete(e)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                _fail(db, e, exc)
+            else:
+                _done([handled])
+        return len(ids)
+    finally:
+        db.close()
+
+
+def drain_all(max_batches: int = 1000) -> int:
+    """Drain until nothing is due (or max_batches); returns events claimed."""
+    total = 0
+    for _ in range(max_batches):
+        claimed = drain()
+        total += claimed
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            break
+    return total
+
+
+def stats(db: Session) -> dict:
+    now = _now()
+    row = db.execute(
+        select(
+            func.count().filter(_events.available_at <= now).label("due"),
+            func.count().filter(_events.available_at > now).label("scheduled"),
+            func.count().filter(_events.available_at.is_(None)).label("dead"),
+            func.min(_events.created_at).filter(_events.available_at.is_not(None)).label("oldest"),
+        )
+    ).one()
+    oldest = (now - _naive_utc(row.oldest)).total_seconds() if row.oldest else 0.0
+    return {
+        "worker": settings.OUTBOX_WORKER,
+        "due": row.due,
+        "scheduled": row.scheduled,
+        "dead": row.dead,
+        "oldest_pending_age_s": round(oldest, 3),
+    }
+
+
+# ----- Workers -----
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_wake: Optional[asyncio.Event] = None
+_task: Optional[asyncio.Task] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if not session.info.pop("outbox_pending", False):
+        return
+    if settings.OUTBOX_WORKER == "inline":
+        drain_all()
+    elif _loop is not None and _wake is not None:
+        _loop.call_soon_threadsafe(_wake.set)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("outbox_pending", None)
+
+
+async def _worker() -> None:
+    while True:
+        _wake.clear()
+        try:
+            claimed = await run_in_threadpool(drain)
+        except Exception:
+            logger.exception("outbox drain failed")
+            claimed = 0
+        if claimed >= settings.OUTBOX_BATCH_SIZE:
+            continue
+        try:
+            await asyncio.wait_for(_wake.wait(), settings.OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_worker() -> None:
+    """Start the in-process drain task on the running loop (OUTBOX_WORKER=inprocess)."""
+    global _loop, _wake, _task
+    if settings.OUTBOX_WORKER != "inprocess" or _task is not None:
+        return
+    _loop = asyncio.get_running_loop()
+    _wake = asyncio.Event()
+    _task = _loop.create_task(_worker())
+
+
+async def stop_worker() -> None:
+    global _loop, _wake, _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _loop = _wake = _task = None
+
+
+def run_forever(stop: Optional[threading.Event] = None) -> None:
+    """Standalone worker loop (python -m app.manage outbox-worker)."""
+    stop = stop or threading.Event()
+    logger.info("outbox worker started (batch %d, poll %.1fs)", settings.OUTBOX_BATCH_SIZE, settings.OUTBOX_POLL_SECONDS)
+    while not stop.is_set():
+        try:
+            claimed = drain()
+        except Exception:
+            logger.exception("outbox drain failed")
+            claimed = 0
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            stop.wait(settings.OUTBOX_POLL_SECONDS)
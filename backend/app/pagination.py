@@ -0,0 +1,119 @@
+# app/pagination.py
+"""
+Opaque keyset (cursor) pagination.
+
+A cursor is the sort key of the last row on the previous page, base64-encoded.
+The next page is `WHERE (k1, k2, ...) > cursor ORDER BY k1, k2, ... LIMIT n`,
+which costs the same at page 1 and page 10,000. List endpoints return the
+cursor for the following page in the X-Next-Cursor header (absent on the last
+page) so the JSON bodies stay plain lists.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (column or expression, descending?)
+SortKey = Tuple[Any, bool]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _typed(value, expected: Optional[type]):
+    """`value` as a sort value of type `expected` (None: any JSON scalar); ValueError otherwise."""
+    if isinstance(value, bool) and expected is not bool:
+        raise ValueError
+    if expected is None:
+        if not isinstance(value, (str, int, float)):
+            raise ValueError
+        return value
+    if expected is float and isinstance(value, int):
+        return float(value)
+    if not isinstance(value, expected) or (expected is date and isinstance(value, datetime)):
+        raise ValueError
+    return value
+
+
+def key_types(keys: Sequence[SortKey]) -> List[Optional[type]]:
+    """The Python type of each sort key's values, None where the column type doesn't say."""
+    types = []
+    for expr, _ in keys:
+        try:
+            types.append(expr.type.python_type)
+        except NotImplementedError:
+            types.append(None)
+    return types
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[Optional[type]]) -> Optional[list]:
+    """Cursor values checked against the sort key `types` (see key_types()); 400 on any mismatch."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [_typed(_decode_value(v), t) for v, t in zip(values, types)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after(keys: Sequence[SortKey], values: Sequence):
+    """WHERE clause selecting rows strictly after `values` in `keys` order."""
+    clauses = []
+    for i, (expr, descending) in enumerate(keys):
+        prefix = [k == v for (k, _), v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*prefix, expr < values[i] if descending else expr > values[i]))
+    return or_(*clauses)
+
+
+def order_by(keys: Sequence[SortKey]) -> list:
+    return [expr.desc() if descending else expr.asc() for expr, descending in keys]
+
+
+def paginate(stmt, keys: Sequence[SortKey], cursor: Optional[str], limit: int):
+    """Apply cursor filter, ordering and limit+1 to a select()."""
+    values = decode_cursor(cursor, key_types(keys))
+    if values is not None:
+        stmt = stmt.where(after(keys, values))
+    return stmt.order_by(*order_by(keys)).limit(limit + 1)
+
+
+def split_page(rows: List, limit: int, key_of) -> Tuple[List, Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key_of(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
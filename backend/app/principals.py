@@ -0,0 +1,98 @@
+# app/principals.py
+"""
+In-process cache of authenticated principals.
+
+get_current_company / get_current_staff_user used to load the Company/User row
+on every request. A verified JWT plus a short-lived snapshot of the row is
+enough for authorization, so we cache the snapshot keyed by
+(kind, sub, jti) and drop it whenever the underlying row changes.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from . import models
+from .core.cache import TTLCache
+from .core.security import settings
+
+COMPANY = "company"
+STAFF = "staff"
+
+_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class CompanyPrincipal:
+    id: int
+    name: str
+    email: str
+    address: Optional[str]
+
+
+@dataclass(frozen=True)
+class StaffPrincipal:
+    id: int
+    name: str
+    email: str
+    department: str
+    company_id: int
+
+
+def company_from_row(company: models.Company) -> CompanyPrincipal:
+    return CompanyPrincipal(id=company.id, name=company.name, email=company.email, address=company.address)
+
+
+def staff_from_row(user: models.User) -> StaffPrincipal:
+    return StaffPrincipal(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        department=user.department,
+        company_id=user.company_id,
+    )
+
+
+def get(kind: str, subject: int, token_id: Optional[str]):
+    return _cache.get((kind, subject, token_id))
+
+
+def put(kind: str, subject: int, token_id: Optional[str], principal) -> None:
+    _cache.set((kind, subject, token_id), principal)
+
+
+def invalidate(kind: str, subject: int) -> int:
+    return _cache.delete_where(lambda key: key[0] == kind and key[1] == subject)
+
+
+def invalidate_company(company_id: int) -> int:
+    return invalidate(COMPANY, company_id)
+
+
+def invalidate_user(user_id: int) -> int:
+    return invalidate(STAFF, user_id)
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
+
+
+# ----- Invalidation hooks -----
+# Any ORM update/delete of a Company or User drops its cached principal.
+@event.listens_for(models.Company, "after_update")
+@event.listens_for(models.Company, "after_delete")
+def _on_company_change(mapper, connection, target):
+    invalidate_company(target.id)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _on_user_change(mapper, connection, target):
+    invalidate_user(target.id)
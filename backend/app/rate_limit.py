@@ -0,0 +1,302 @@
+# app/rate_limit.py
+"""
+Per-tenant / per-IP rate limiting and admission control.
+
+RateLimitMiddleware matches each request against RULES (first match wins) and
+takes one token from that rule's bucket before the app sees the request.
+Login/registration buckets are keyed by client IP. Everything else is keyed by
+company: the verified JWT `sub` for CEO tokens, the `cid` claim for staff
+tokens, falling back to the client IP when there is no valid token. Budgets
+are "requests/seconds" settings, so a bucket holds `requests` tokens and
+refills at requests/seconds per second.
+
+Expensive routes (imports, exports, batch ratings) also have a per-company cap
+on requests in flight in this worker. Both limits answer 429 with Retry-After.
+
+The default backend is in-process (per worker: N workers allow up to N times
+the budget). The Redis backend shares buckets across workers through one
+atomic Lua script and accepts any client exposing eval().
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Pattern, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import auth
+from .core.security import settings
+
+EXEMPT_PATHS = {"/healthz", "/metrics", "/ping", "/favicon.ico"}
+_ANY = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD"})
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    methods: FrozenSet[str]
+    pattern: Pattern
+    per: str  # "ip" or "company"
+    budget: str  # Settings attribute holding "requests/seconds"
+    concurrency: Optional[str] = None  # Settings attribute holding the in-flight cap
+
+
+RULES = (
+    Rule("login", frozenset({"POST"}), re.compile(r"^/(login|staff-login|register)$"), "ip", "RATE_LIMIT_LOGIN"),
+    Rule("search", frozenset({"GET"}), re.compile(r"^/drivers/search$"), "company", "RATE_LIMIT_SEARCH"),
+    Rule(
+        "bulk", frozenset({"GET", "POST"}), re.compile(r"^/(drivers/import|ratings/batch|staff/export/[^/]+)$"),
+        "company", "RATE_LIMIT_BULK", concurrency="CONCURRENCY_LIMIT_BULK",
+    ),
+    Rule("default", _ANY, re.compile(r""), "company", "RATE_LIMIT_DEFAULT"),
+)
+
+
+def match(method: str, path: str) -> Rule:
+    return next(r for r in RULES if method in r.methods and r.pattern.match(path))
+
+
+@lru_cache(maxsize=64)
+def parse_budget(value: str) -> Optional[Tuple[float, float]]:
+    """'120/60' -> (capacity 120, refill 2.0/s); 'off' or '0' -> None."""
+    value = value.strip().lower()
+    if value in ("", "0", "off"):
+        return None
+    requests, _, seconds = value.partition("/")
+    capacity = float(requests)
+    return capacity, capacity / float(seconds or 1)
+
+
+# ----- Backends -----
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 when allowed, else seconds until they would be available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            # An evicted (least recently used) bucket just starts full again
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._buckets), "max_keys": self.max_keys}
+
+
+# KEYS[1] bucket; ARGV capacity, refill/s, cost. Server time, so workers' clocks don't matter.
+_TOKEN_BUCKET = """
+local capacity, rate, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    blocking = True
+
+    def __init__(self, client, prefix: str = "rl"):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> float:
+        return float(self.client.eval(_TOKEN_BUCKET, 1, f"{self.prefix}:{key}", capacity, rate, cost))
+
+    def clear(self) -> None:
+        pass  # shared state; buckets expire once full again
+
+    def stats(self) -> dict:
+        return {}
+
+
+def _build_backend():
+    kind = settings.RATE_LIMIT_BACKEND.lower()
+    if kind == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisBackend(redis.Redis.from_url(settings.RATE_LIMIT_REDIS_URL))
+    if kind == "memory":
+        return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r}")
+
+
+_backend = _build_backend()
+_in_flight: Dict[str, int] = {}
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+
+
+def set_backend(backend) -> None:
+    """Swap the bucket backend; used by tests and custom deployments."""
+    global _backend
+    _backend = backend
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + 1
+
+
+def _acquire(key: str, limit: int) -> bool:
+    with _lock:
+        if _in_flight.get(key, 0) >= limit:
+            return False
+        _in_flight[key] = _in_flight.get(key, 0) + 1
+        return True
+
+
+def _release(key: str) -> None:
+    with _lock:
+        left = _in_flight[key] - 1
+        if left:
+            _in_flight[key] = left
+        else:
+            del _in_flight[key]
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": type(_backend).__name__,
+            **_backend.stats(),
+            "in_flight": sum(_in_flight.values()),
+            **dict(sorted(_counters.items())),
+        }
+
+
+def reset() -> None:
+    _backend.clear()
+    with _lock:
+        _counters.clear()
+
+
+# ----- Keys -----
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope) -> str:
+    """Peer address, or the X-Forwarded-For entry added by the outermost of RATE_LIMIT_PROXY_HOPS trusted proxies."""
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    forwarded = _header(scope, b"x-forwarded-for") if hops > 0 else None
+    if forwarded:
+        addresses = [a.strip() for a in forwarded.split(",") if a.strip()]
+        if len(addresses) >= hops:
+            return addresses[-hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def company_key(scope) -> Optional[str]:
+    from jose import JWTError, jwt  # deferred: pulls in cryptography
+
+    header = _header(scope, b"authorization") or ""
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    # Only staff tokens carry `cid`, so the unverified claims pick the one secret to check
+    try:
+        staff = "cid" in jwt.get_unverified_claims(token)
+    except JWTError:
+        return None
+    claims = auth.verified_claims(token, settings.STAFF_SECRET_KEY if staff else settings.SECRET_KEY, scope)
+    if claims is None or not claims.get("cid" if staff else "sub"):
+        return None
+    return f"company:{claims['cid'] if staff else claims['sub']}"
+
+
+# ----- Middleware -----
+async def _reject(send, retry_after: float, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware; runs before routing, so a rejected request costs no handler work."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        rule = match(scope["method"], scope["path"])
+        who = (company_key(scope) if rule.per == "company" else None) or f"ip:{client_ip(scope)}"
+        key = f"{rule.name}:{who}"
+
+        budget = parse_budget(getattr(settings, rule.budget))
+        if budget is not None:
+            capacity, rate = budget
+            if _backend.blocking:
+                wait = await run_in_threadpool(_backend.take, key, capacity, rate)
+            else:
+                wait = _backend.take(key, capacity, rate)
+            if wait > 0:
+                _count(f"limited_{rule.name}")
+                await _reject(send, wait, "Rate limit exceeded")
+                return
+
+        limit = getattr(settings, rule.concurrency) if rule.concurrency else 0
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+        if not _acquire(key, limit):
+            _count(f"concurrency_{rule.name}")
+            await _reject(send, settings.CONCURRENCY_RETRY_AFTER_SECONDS, "Too many concurrent requests")
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _release(key)
@@ -0,0 +1,180 @@
+# app/rating_stats.py
+"""
+Per-driver rating aggregates (driver_rating_stats).
+
+Writers call record() with the new DriverRating rows before committing, so the
+running totals move in the same transaction as the ratings themselves. Reads
+are a primary-key lookup per driver regardless of how many ratings exist.
+
+Rows also carry the driver's (globally unique) license number, which makes
+them the cross-company reputation read model: lookup() screens any number of
+licenses with one unique-index read and exposes only the aggregates.
+"""
+from typing import Dict, Iterable, List
+
+from fastapi import HTTPException
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+DEPARTMENTS = [d.value for d in models.DepartmentEnum]
+COUNTERS = ["rating_count", "score_sum"] + [f"{d}_{k}" for d in DEPARTMENTS for k in ("count", "sum")]
+
+_stats = models.DriverRatingStats.__table__
+
+
+def _department(value) -> str:
+    return getattr(value, "value", value)
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"rating stats upsert is not implemented for {dialect!r}")
+    return dialect_insert(_stats)
+
+
+def record(db: Session, company_id: int, ratings: Iterable[models.DriverRating]) -> None:
+    """Fold new (flushed, not yet committed) ratings into their drivers' totals, one upsert row per driver."""
+    per_driver: Dict[int, dict] = {}
+    for r in ratings:
+        row = per_driver.get(r.driver_id)
+        if row is None:
+            row = per_driver[r.driver_id] = dict.fromkeys(COUNTERS, 0)
+            row.update(
+                driver_id=r.driver_id,
+                company_id=company_id,
+                # Only used when the row is first inserted; licenses never change
+                license_number=select(models.Driver.license_number)
+                .where(models.Driver.id == r.driver_id)
+                .scalar_subquery(),
+                last_rated_at=None,
+            )
+        dept = _department(r.department)
+        row["rating_count"] += 1
+        row["score_sum"] += r.score
+        row[f"{dept}_count"] += 1
+        row[f"{dept}_sum"] += r.score
+        if row["last_rated_at"] is None or (r.created_at and r.created_at > row["last_rated_at"]):
+            row["last_rated_at"] = r.created_at
+    if not per_driver:
+        return
+
+    stmt = _upsert(db).values(list(per_driver.values()))
+    new = stmt.excluded
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[_stats.c.driver_id],
+            set_={
+                **{c: _stats.c[c] + new[c] for c in COUNTERS},
+                "last_rated_at": case(
+                    (_stats.c.last_rated_at.is_(None), new.last_rated_at),
+                    (new.last_rated_at > _stats.c.last_rated_at, new.last_rated_at),
+                    else_=_stats.c.last_rated_at,
+                ),
+            },
+        )
+    )
+
+
+# ----- Reads -----
+def _mean(total: int, count: int):
+    return total / count if count else None
+
+
+def _summary(row=None) -> dict:
+    get = (lambda key: getattr(row, key)) if row is not None else (lambda key: None if key == "last_rated_at" else 0)
+    return {
+        "count": get("rating_count"),
+        "sum": get("score_sum"),
+        "mean": _mean(get("score_sum"), get("rating_count")),
+        "last_rated_at": get("last_rated_at"),
+        "departments": {
+            d: {"count": get(f"{d}_count"), "sum": get(f"{d}_sum"), "mean": _mean(get(f"{d}_sum"), get(f"{d}_count"))}
+            for d in DEPARTMENTS
+        },
+    }
+
+
+def to_response(driver_id: int, row=None) -> dict:
+    return {"driver_id": driver_id, **_summary(row)}
+
+
+def _rows(db: Session, driver_ids: List[int], company_id: int) -> dict:
+    return {
+        row.driver_id: row
+        for row in db.execute(
+            select(_stats).where(_stats.c.company_id == company_id, _stats.c.driver_id.in_(driver_ids))
+        )
+    }
+
+
+def for_drivers(db: Session, driver_ids: List[int], company_id: int) -> Dict[int, dict]:
+    """Summaries keyed by id for drivers already known to belong to the company (one query)."""
+    found = _rows(db, driver_ids, company_id) if driver_ids else {}
+    return {d: to_response(d, found.get(d)) for d in driver_ids}
+
+
+def get_many(db: Session, driver_ids: List[int], company_id: int) -> List[dict]:
+    """Summaries for the given ids that belong to the company, in request order; unrated drivers get zeros."""
+    wanted = list(dict.fromkeys(driver_ids))
+    if not wanted:
+        return []
+    found = _rows(db, wanted, company_id)
+    missing = [d for d in wanted if d not in found]
+    unrated = set()
+    if missing:
+        unrated = set(
+            db.execute(
+                select(models.Driver.id).where(
+                    models.Driver.created_by_company_id == company_id, models.Driver.id.in_(missing)
+                )
+            ).scalars()
+        )
+    return [to_response(d, found.get(d)) for d in wanted if d in found or d in unrated]
+
+
+def get_one(db: Session, driver_id: int, company_id: int) -> dict:
+    summaries = get_many(db, [driver_id], company_id)
+    if not summaries:
+        raise HTTPException(status_code=404, detail="Driver not found")
+    return summaries[0]
+
+
+def lookup(db: Session, licenses: List[str]) -> List[dict]:
+    """Reputation per license across all companies, in request order (deduplicated)."""
+    wanted = list(dict.fromkeys(l.strip() for l in licenses))
+    found = {row.license_number: row for row in db.execute(select(_stats).where(_stats.c.license_number.in_(wanted)))}
+    return [{"license_number": l, **_summary(found.get(l))} for l in wanted]
+
+
+# ----- Backfill -----
+def rebuild(db: Session) -> int:
+    """Recompute every driver's totals from driver_ratings in one set-based statement."""
+    r = models.DriverRating
+    columns = {
+        "driver_id": r.driver_id,
+        "company_id": models.Driver.created_by_company_id,
+        "license_number": models.Driver.license_number,
+        "rating_count": func.count(r.id),
+        "score_sum": func.sum(r.score),
+        "last_rated_at": func.max(r.created_at),
+    }
+    for d in DEPARTMENTS:
+        in_dept = r.department == models.DepartmentEnum(d)
+        columns[f"{d}_count"] = func.sum(case((in_dept, 1), else_=0))
+        columns[f"{d}_sum"] = func.sum(case((in_dept, r.score), else_=0))
+    source = (
+        select(*(expr.label(name) for name, expr in columns.items()))
+        .join(models.Driver, models.Driver.id == r.driver_id)
+        .group_by(r.driver_id, models.Driver.created_by_company_id, models.Driver.license_number)
+    )
+    db.execute(delete(_stats))
+    result = db.execute(insert(_stats).from_select(list(columns), source))
+    db.commit()
+    return result.rowcount
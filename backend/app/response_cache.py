@@ -0,0 +1,216 @@
+# app/response_cache.py
+"""
+Cached JSON bodies for tenant-scoped read endpoints.
+
+Entries are keyed by company, the company's cache generation and the request
+path + query. Any write for a company bumps its generation, so every cached
+response for that tenant is invalidated at once and the stale entries simply
+age out. Responses carry a strong ETag; a matching If-None-Match gets a 304.
+
+The default backend is an in-process LRU (per worker: another worker may serve
+a stale body for up to RESPONSE_CACHE_TTL_SECONDS after a write). The Redis
+backend shares entries and generations across workers and accepts any client
+exposing get/set(ex=)/incr, so a local stand-in can replace a real server.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from . import serialization
+from .core import instrumentation
+from .core.cache import TTLCache
+from .core.security import settings
+
+CACHE_CONTROL = "private, no-cache"
+
+
+# ----- Backends -----
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Bounded like the entries and kept longer. A generation dropped anyway
+        # restarts at a fresh clock value, never at one an old entry is keyed on
+        self._generations = TTLCache(maxsize=maxsize, ttl=ttl * 10)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+    def _current(self, company_id: int) -> int:
+        generation = self._generations.get(company_id)
+        if generation is None:
+            generation = time.monotonic_ns()
+            self._generations.set(company_id, generation)
+        return generation
+
+    def generation(self, company_id: int) -> int:
+        with self._lock:
+            return self._current(company_id)
+
+    def bump(self, company_id: int) -> None:
+        with self._lock:
+            self._generations.set(company_id, self._current(company_id) + 1)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._generations.clear()
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        return {"size": stats["size"], "maxsize": stats["maxsize"], "evictions": stats["evictions"]}
+
+
+class RedisBackend:
+    def __init__(self, client, ttl: int, prefix: str = "resp"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(f"{self.prefix}:{key}", value, ex=self.ttl)
+
+    def generation(self, company_id: int) -> int:
+        return int(self.client.get(f"{self.prefix}:gen:{company_id}") or 0)
+
+    def bump(self, company_id: int) -> None:
+        self.client.incr(f"{self.prefix}:gen:{company_id}")
+
+    def clear(self) -> None:
+        pass  # shared state; entries expire on their own
+
+    def stats(self) -> dict:
+        return {}
+
+
+def _build_backend():
+    kind = settings.RESPONSE_CACHE_BACKEND.lower()
+    if kind == "off":
+        return None
+    if kind == "redis":
+        import redis  # optional dependency, only needed for this backend
+
+        return RedisBackend(redis.Redis.from_url(settings.RESPONSE_CACHE_REDIS_URL), settings.RESPONSE_CACHE_TTL_SECONDS)
+    if kind == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {settings.RESPONSE_CACHE_BACKEND!r}")
+
+
+_backend = _build_backend()
+_counters = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def set_backend(backend) -> None:
+    """Swap the backend (None disables caching); used by tests and custom deployments."""
+    global _backend
+    _backend = backend
+
+
+# ----- Entries -----
+def _pack(etag: str, headers: Dict[str, str], body: bytes) -> bytes:
+    return json.dumps({"etag": etag, "headers": headers}).encode() + b"\n" + body
+
+
+def _unpack(value: bytes):
+    meta, _, body = value.partition(b"\n")
+    meta = json.loads(meta)
+    return meta["etag"], meta["headers"], body
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _respond(request: Request, etag: str, headers: Dict[str, str], body: bytes) -> Response:
+    headers = {**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        _count("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class Lookup:
+    """Result of lookup(): either a ready response, or the slot to store() the fresh body in."""
+
+    def __init__(self, request: Request, key: Optional[str], response: Optional[Response]):
+        self.request = request
+        self.key = key
+        self.response = response
+
+    def store(
+        self, schema, content: Any, headers: Optional[Dict[str, str]] = None, trusted: bool = False
+    ) -> Response:
+        """
+        Serialize `content` through `schema` (the route's response_model), cache
+        it and respond. `trusted` marks projected DB rows; see serialization.dump.
+        """
+        with instrumentation.span("serialize"):
+            body = serialization.dump(schema, content, trusted=trusted)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        if self.key is not None and _backend is not None:
+            _backend.set(self.key, _pack(etag, headers, body))
+        return _respond(self.request, etag, headers, body)
+
+
+def lookup(request: Request, company_id: int) -> Lookup:
+    """
+    Check the cache for this request. The generation is read here, before the
+    caller loads data, so a write racing the load can only leave a stale body
+    under an already-dead key.
+    """
+    if _backend is None:
+        return Lookup(request, None, None)
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    key = f"{company_id}:{_backend.generation(company_id)}:{request.url.path}?{query}"
+    cached = _backend.get(key)
+    if cached is None:
+        _count("misses")
+        return Lookup(request, key, None)
+    _count("hits")
+    return Lookup(request, key, _respond(request, *_unpack(cached)))
+
+
+def invalidate_company(company_id: int) -> None:
+    """Drop every cached response for the tenant; call after its writes commit."""
+    if _backend is None:
+        return
+    _backend.bump(company_id)
+    _count("invalidations")
+
+
+def clear() -> None:
+    if _backend is not None:
+        _backend.clear()
+
+
+def stats() -> dict:
+    with _counters_lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        "backend": type(_backend).__name__ if _backend is not None else None,
+        **counters,
+        "hit_rate": (counters["hits"] / lookups) if lookups else 0.0,
+        **(_backend.stats() if _backend is not None else {}),
+    }
@@ -0,0 +1,48 @@
+# Rating trends for the company's staff, read from rating_rollups (app.analytics)
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from .. import analytics, principals, schemas
+from ..auth import get_current_staff_user, get_staff_read_db
+from ..core.security import settings
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+GRAIN = "^(day|week|month)$"
+
+@router.get("/trends", response_model=schemas.RatingTrends)
+def rating_trends(
+    grain: str = Query("week", pattern=GRAIN),
+    by: str = Query("company", pattern="^(company|department|driver)$"),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    department: Optional[schemas.Department] = None,
+    driver_id: List[int] = Query([], max_length=settings.ANALYTICS_MAX_DRIVERS),
+    window: int = Query(4, ge=1, le=52),
+    db: Session = Depends(get_staff_read_db),
+    current_user: principals.StaffPrincipal = Depends(get_current_staff_user),
+):
+    return analytics.trends(
+        db, current_user.company_id, grain=grain, by=by, since=since, until=until,
+        department=department.value if department else None, driver_ids=driver_id, window=window,
+    )
+
+@router.get("/outliers", response_model=schemas.RatingOutliers)
+def rating_outliers(
+    grain: str = Query("week", pattern=GRAIN),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    department: Optional[schemas.Department] = None,
+    min_ratings: int = Query(5, ge=1),
+    z: float = Query(3.5, gt=0),
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: Session = Depends(get_staff_read_db),
+    current_user: principals.StaffPrincipal = Depends(get_current_staff_user),
+):
+    return analytics.outliers(
+        db, current_user.company_id, grain=grain, since=since, until=until,
+        department=department.value if department else None, min_ratings=min_ratings, threshold=z, limit=limit,
+    )
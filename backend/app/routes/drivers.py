@@ -0,0 +1,154 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from .. import crud, driver_import, pagination, response_cache, schemas, suggest
+from ..core.security import settings
+from ..auth import get_company_read_db, get_current_company, get_current_staff_user
+from ..db.session import get_db
+
+router = APIRouter(tags=["Drivers"])
+
+# ----- Driver management -----
+@router.post("/drivers", response_model=schemas.DriverResponse)
+def create_driver(
+    driver: schemas.DriverCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_company),
+):
+    return crud.create_driver(db, driver, current_user.id)
+
+@router.post("/drivers/import")
+async def import_drivers(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_company),
+):
+    # Streams the upload; each chunk's DB work runs in the threadpool
+    async def flush(fn, *args):
+        return await run_in_threadpool(fn, db, *args)
+
+    return await driver_import.run_import(request.headers.get("content-type", ""), request.stream(), current_user.id, flush)
+
+@router.get("/drivers/search", response_model=List[schemas.DriverResponse])
+def search_drivers(
+    response: Response,
+    name: str = "",
+    dob: Optional[date] = None,
+    license: str = "",
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    drivers, next_cursor = crud.search_drivers(
+        db, current_user.id, name=name, dob=dob, license=license, limit=limit, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return drivers
+
+@router.get("/drivers/suggest", response_model=List[schemas.DriverSuggestion])
+def suggest_drivers(
+    q: str = Query(..., min_length=1, max_length=120),
+    limit: int = Query(10, ge=1, le=25),
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    return suggest.suggest(db, current_user.id, q, limit)
+
+@router.get("/drivers/stats", response_model=List[schemas.DriverRatingStatsResponse])
+def get_drivers_rating_stats(
+    ids: List[int] = Query(..., max_length=settings.PAGE_SIZE_MAX),
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    return crud.get_rating_stats_batch(db, ids, current_user.id)
+
+# Dashboard view: one round trip instead of a ratings + stats call per driver
+@router.get("/drivers/profile", response_model=List[schemas.DriverProfile])
+def get_driver_profiles(
+    request: Request,
+    ids: List[int] = Query(..., max_length=settings.PROFILE_BATCH_MAX),
+    ratings_limit: int = Query(settings.PROFILE_RATINGS_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    profiles = crud.get_driver_profiles(db, ids, current_user.id, ratings_limit)
+    return cached.store(List[schemas.DriverProfile], profiles, trusted=True)
+
+# Cross-company: any company can screen a license before hiring
+@router.get("/drivers/lookup", response_model=schemas.DriverReputation)
+def lookup_driver(
+    license: str = Query(..., min_length=1, max_length=64),
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    return crud.lookup_reputation(db, [license])[0]
+
+@router.post("/drivers/lookup", response_model=List[schemas.DriverReputation])
+def lookup_drivers(
+    batch: schemas.DriverLookupBatch,
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    return crud.lookup_reputation(db, batch.licenses)
+
+@router.get("/drivers/{driver_id}", response_model=schemas.DriverResponse)
+def get_driver(
+    driver_id: int,
+    request: Request,
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    return cached.store(schemas.DriverResponse, crud.get_company_driver(db, driver_id, current_user.id))
+
+# ----- Driver rating -----
+@router.post("/ratings", response_model=schemas.DriverRatingResponse)
+def rate_driver(
+    rating: schemas.DriverRatingCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_staff_user),
+):
+    return crud.create_rating(db, rating, current_user)
+
+@router.post("/ratings/batch", response_model=List[schemas.DriverRatingBatchItem])
+def rate_drivers_batch(
+    batch: schemas.DriverRatingBatchCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_staff_user),
+):
+    return crud.create_ratings_batch(db, batch.ratings, current_user)
+
+@router.get("/drivers/{driver_id}/ratings", response_model=List[schemas.DriverRatingResponse])
+def get_driver_ratings(
+    driver_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    ratings, next_cursor = crud.list_driver_ratings(db, driver_id, current_user.id, limit=limit, cursor=cursor)
+    return cached.store(
+        List[schemas.DriverRatingResponse], ratings, {pagination.NEXT_CURSOR_HEADER: next_cursor}, trusted=True
+    )
+
+@router.get("/drivers/{driver_id}/stats", response_model=schemas.DriverRatingStatsResponse)
+def get_driver_rating_stats(
+    driver_id: int,
+    db: Session = Depends(get_company_read_db),
+    current_user=Depends(get_current_company),
+):
+    return crud.get_rating_stats(db, driver_id, current_user.id)
@@ -0,0 +1,154 @@
+# Async twin of routes/drivers.py, served instead of it when DB_ASYNC is on.
+# Handlers run on the event loop against AsyncSession; the shared crud
+# functions execute inside run_sync so both paths keep identical semantics.
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud, driver_import, pagination, response_cache, schemas, suggest
+from ..core.security import settings
+from ..auth import get_company_read_db_async, get_current_company_async, get_current_staff_user_async
+from ..db.async_session import get_async_db
+
+router = APIRouter(tags=["Drivers"])
+
+# ----- Driver management -----
+@router.post("/drivers", response_model=schemas.DriverResponse)
+async def create_driver(
+    driver: schemas.DriverCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_company_async),
+):
+    return await db.run_sync(crud.create_driver, driver, current_user.id)
+
+@router.post("/drivers/import")
+async def import_drivers(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_company_async),
+):
+    return await driver_import.run_import(
+        request.headers.get("content-type", ""), request.stream(), current_user.id, db.run_sync
+    )
+
+@router.get("/drivers/search", response_model=List[schemas.DriverResponse])
+async def search_drivers(
+    response: Response,
+    name: str = "",
+    dob: Optional[date] = None,
+    license: str = "",
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    drivers, next_cursor = await db.run_sync(
+        crud.search_drivers, current_user.id, name=name, dob=dob, license=license, limit=limit, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return drivers
+
+@router.get("/drivers/suggest", response_model=List[schemas.DriverSuggestion])
+async def suggest_drivers(
+    q: str = Query(..., min_length=1, max_length=120),
+    limit: int = Query(10, ge=1, le=25),
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    return await db.run_sync(suggest.suggest, current_user.id, q, limit)
+
+@router.get("/drivers/stats", response_model=List[schemas.DriverRatingStatsResponse])
+async def get_drivers_rating_stats(
+    ids: List[int] = Query(..., max_length=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    return await db.run_sync(crud.get_rating_stats_batch, ids, current_user.id)
+
+# Dashboard view: one round trip instead of a ratings + stats call per driver
+@router.get("/drivers/profile", response_model=List[schemas.DriverProfile])
+async def get_driver_profiles(
+    request: Request,
+    ids: List[int] = Query(..., max_length=settings.PROFILE_BATCH_MAX),
+    ratings_limit: int = Query(settings.PROFILE_RATINGS_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    profiles = await db.run_sync(crud.get_driver_profiles, ids, current_user.id, ratings_limit)
+    return cached.store(List[schemas.DriverProfile], profiles, trusted=True)
+
+# Cross-company: any company can screen a license before hiring
+@router.get("/drivers/lookup", response_model=schemas.DriverReputation)
+async def lookup_driver(
+    license: str = Query(..., min_length=1, max_length=64),
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    return (await db.run_sync(crud.lookup_reputation, [license]))[0]
+
+@router.post("/drivers/lookup", response_model=List[schemas.DriverReputation])
+async def lookup_drivers(
+    batch: schemas.DriverLookupBatch,
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    return await db.run_sync(crud.lookup_reputation, batch.licenses)
+
+@router.get("/drivers/{driver_id}", response_model=schemas.DriverResponse)
+async def get_driver(
+    driver_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    return cached.store(schemas.DriverResponse, await db.run_sync(crud.get_company_driver, driver_id, current_user.id))
+
+# ----- Driver rating -----
+@router.post("/ratings", response_model=schemas.DriverRatingResponse)
+async def rate_driver(
+    rating: schemas.DriverRatingCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_staff_user_async),
+):
+    return await db.run_sync(crud.create_rating, rating, current_user)
+
+@router.post("/ratings/batch", response_model=List[schemas.DriverRatingBatchItem])
+async def rate_drivers_batch(
+    batch: schemas.DriverRatingBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_staff_user_async),
+):
+    return await db.run_sync(crud.create_ratings_batch, batch.ratings, current_user)
+
+@router.get("/drivers/{driver_id}/ratings", response_model=List[schemas.DriverRatingResponse])
+async def get_driver_ratings(
+    driver_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    cached = response_cache.lookup(request, current_user.id)
+    if cached.response is not None:
+        return cached.response
+    ratings, next_cursor = await db.run_sync(crud.list_driver_ratings, driver_id, current_user.id, limit=limit, cursor=cursor)
+    return cached.store(
+        List[schemas.DriverRatingResponse], ratings, {pagination.NEXT_CURSOR_HEADER: next_cursor}, trusted=True
+    )
+
+@router.get("/drivers/{driver_id}/stats", response_model=schemas.DriverRatingStatsResponse)
+async def get_driver_rating_stats(
+    driver_id: int,
+    db: AsyncSession = Depends(get_company_read_db_async),
+    current_user=Depends(get_current_company_async),
+):
+    return await db.run_sync(crud.get_rating_stats, driver_id, current_user.id)
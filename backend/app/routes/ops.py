@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from .. import analytics, hashing, outbox, principals, rate_limit, response_cache, suggest
+from ..auth import require_ops_token
+from ..db import replicas
+from ..db.session import get_db, pool_stats
+
+router = APIRouter(prefix="/ops", tags=["Ops"], include_in_schema=False, dependencies=[Depends(require_ops_token)])
+
+@router.get("/hashing")
+def hashing_stats():
+    return hashing.stats()
+
+@router.get("/principal-cache")
+def principal_cache_stats():
+    return principals.stats()
+
+@router.get("/response-cache")
+def response_cache_stats():
+    return response_cache.stats()
+
+@router.get("/outbox")
+def outbox_stats(db: Session = Depends(get_db)):
+    return outbox.stats(db)
+
+@router.get("/analytics")
+def analytics_stats(db: Session = Depends(get_db)):
+    return analytics.stats(db)
+
+@router.get("/rate-limit")
+def rate_limit_stats():
+    return rate_limit.stats()
+
+@router.get("/suggest-index")
+def suggest_index_stats():
+    return suggest.stats()
+
+@router.get("/replicas")
+def replica_stats():
+    return replicas.stats()
+
+@router.get("/db-pool")
+def db_pool_stats():
+    return pool_stats()
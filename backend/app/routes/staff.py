@@ -1,15 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import models, database
-from ..auth import get_current_staff_user
+from .. import crud, exports, pagination, principals, response_cache, schemas
+from ..auth import get_current_staff_user, get_staff_read_db
+from ..core.security import settings
+from ..db import replicas
 
 router = APIRouter(prefix="/staff", tags=["Staff"])
 
-@router.get("/drivers")
+@router.get("/drivers", response_model=List[schemas.DriverResponse])
 def get_all_drivers(
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(get_current_staff_user),
+    request: Request,
+    limit: int = Query(50, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_staff_read_db),
+    current_user: principals.StaffPrincipal = Depends(get_current_staff_user),
+):
+    # Example protected endpoint: list all drivers for this company only, by name
+    cached = response_cache.lookup(request, current_user.company_id)
+    if cached.response is not None:
+        return cached.response
+    drivers, next_cursor = crud.list_company_drivers(db, current_user.company_id, limit=limit, cursor=cursor)
+    return cached.store(
+        List[schemas.DriverResponse], drivers, {pagination.NEXT_CURSOR_HEADER: next_cursor}, trusted=True
+    )
+
+# ----- Exports (streamed; memory bounded by EXPORT_BATCH_SIZE) -----
+def _export_response(name: str, stmt, format: str, gzip: bool, company_id: int) -> StreamingResponse:
+    body = exports.stream(stmt, format, gzip=gzip, session_factory=lambda: replicas.read_session(company_id))
+    headers = {"Content-Disposition": f'attachment; filename="{name}-{date.today().isoformat()}.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=exports.FORMATS[format], headers=headers)
+
+@router.get("/export/drivers")
+def export_drivers(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: principals.StaffPrincipal = Depends(get_current_staff_user),
+):
+    stmt = exports.drivers_query(current_user.company_id, created_from, created_to)
+    return _export_response("drivers", stmt, format, gzip, current_user.company_id)
+
+@router.get("/export/ratings")
+def export_ratings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: principals.StaffPrincipal = Depends(get_current_staff_user),
 ):
-    # Example protected endpoint: list all drivers for this company only
-    return db.query(models.Driver).filter(models.Driver.created_by_company_id == current_user.company_id).all()
+    stmt = exports.ratings_query(current_user.company_id, created_from, created_to)
+    return _export_response("ratings", stmt, format, gzip, current_user.company_id)
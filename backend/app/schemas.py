@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional, Literal
+from typing import Dict, List, Optional, Literal
 from enum import Enum
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
@@ -66,9 +66,15 @@ class DriverResponse(BaseModel):
     dob: date
     license_number: str
     created_by_company_id: int
+    created_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+class DriverSuggestion(BaseModel):
+    id: int
+    name: str
+    license_number: str
+
 # ---------- Driver Rating ----------
 
 class DriverRatingCreate(BaseModel):
@@ -86,3 +92,93 @@ class DriverRatingResponse(BaseModel):
     created_at: Optional[datetime] = None  # keep optional if not persisted yet
 
     model_config = ConfigDict(from_attributes=True)
+
+class DriverRatingBatchCreate(BaseModel):
+    ratings: List[DriverRatingCreate] = Field(..., min_length=1)
+
+class DriverRatingBatchItem(BaseModel):
+    index: int  # position in the submitted list
+    status_code: int  # 200 created, 404/403 as for POST /ratings
+    rating: Optional[DriverRatingResponse] = None
+    error: Optional[str] = None
+
+class DepartmentRatingStats(BaseModel):
+    count: int
+    sum: int
+    mean: Optional[float] = None
+
+class DriverRatingStatsResponse(BaseModel):
+    driver_id: int
+    count: int
+    sum: int
+    mean: Optional[float] = None  # None until the first rating
+    last_rated_at: Optional[datetime] = None
+    departments: Dict[Department, DepartmentRatingStats]
+
+class DriverProfile(DriverResponse):
+    ratings: List[DriverRatingResponse]  # newest first
+    ratings_next_cursor: Optional[str] = None  # continue with /drivers/{id}/ratings?cursor=
+    stats: DriverRatingStatsResponse
+
+class DriverReputation(BaseModel):
+    # Cross-company view: aggregates only, nothing identifying the rating company.
+    # Unknown and unrated licenses look the same (count 0).
+    license_number: str
+    count: int
+    sum: int
+    mean: Optional[float] = None
+    last_rated_at: Optional[datetime] = None
+    departments: Dict[Department, DepartmentRatingStats]
+
+class DriverLookupBatch(BaseModel):
+    licenses: List[str] = Field(..., min_length=1)
+
+# ---------- Rating analytics ----------
+
+class TrendPoint(BaseModel):
+    bucket: date  # first day of the day / week / month
+    count: int
+    mean: Optional[float] = None
+    moving_mean: Optional[float] = None  # count-weighted over the trailing `window` buckets
+    p10: Optional[int] = None
+    p50: Optional[int] = None
+    p90: Optional[int] = None
+
+class TrendSeries(BaseModel):
+    department: Optional[Department] = None  # by=department
+    driver_id: Optional[int] = None  # by=driver
+    points: List[TrendPoint]
+
+class RatingTrends(BaseModel):
+    grain: Literal["day", "week", "month"]
+    by: Literal["company", "department", "driver"]
+    since: date
+    until: date
+    window: int
+    refreshed_at: Optional[datetime] = None  # rollups include ratings up to this refresh
+    series: List[TrendSeries]
+
+class FleetSummary(BaseModel):
+    drivers: int  # drivers with at least min_ratings ratings in range
+    ratings: int
+    mean: Optional[float] = None
+    driver_mean_p10: Optional[float] = None
+    driver_mean_p50: Optional[float] = None
+    driver_mean_p90: Optional[float] = None
+
+class OutlierDriver(BaseModel):
+    driver_id: int
+    name: str
+    license_number: str
+    count: int
+    mean: float
+    z: float  # modified z-score of the driver's mean within the fleet
+    percentile: float  # share of the fleet with a lower mean, 0..100
+
+class RatingOutliers(BaseModel):
+    grain: Literal["day", "week", "month"]
+    since: date
+    until: date
+    refreshed_at: Optional[datetime] = None
+    fleet: FleetSummary
+    outliers: List[OutlierDriver]
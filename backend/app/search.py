@@ -0,0 +1,237 @@
+# app/search.py
+"""
+Ranked fuzzy driver search.
+
+Postgres: word_similarity() over driver_search_name(name), an SQL twin of
+normalize() served by the pg_trgm GIN index, so both sides of the comparison
+are normalized the same way. Elsewhere: the driver_name_ngrams table
+(company_id, gram) is the index, and rank is the number of query trigrams a
+name shares. Either way the old leading-wildcard ILIKE scan over a tenant's
+drivers is gone.
+
+Common short queries ("mir") share grams with a large part of the fleet, and
+ranking every candidate is what costs. Names holding every query gram rank
+first, ordered by length, and the postings are clustered in that order, so
+when those fill the page it is read straight off the rarest gram's posting and
+stops after `limit` rows.
+
+Drivers created one at a time are indexed by the outbox "driver.created"
+handler, off the request path; imports index their chunk inline in bulk.
+"""
+import math
+import re
+import unicodedata
+from collections.abc import Mapping
+from datetime import date
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Float, Integer, cast, delete, event, exists, func, insert, inspect, literal, or_, select, union_all
+from sqlalchemy.orm import Session, aliased
+
+from . import models, outbox, pagination
+
+# Share of query trigrams a name must contain to match (pg_trgm's default is 0.3)
+MIN_GRAM_OVERLAP = 0.5
+# Postings counted per query gram when picking the rarest one
+POSTING_PROBE_LIMIT = 5000
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def name_grams(name: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing blank."""
+    grams = set()
+    for word in normalize(name).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def query_grams(query: str) -> Set[str]:
+    # No trailing blank, so a partially typed last word still matches as a prefix.
+    # The "  x" gram of each word is only kept for one/two-letter words: it is
+    # shared by ~1/26 of all names and adds scan cost without adding selectivity.
+    grams = set()
+    for word in normalize(query).split():
+        padded = f"  {word}"
+        grams.update(padded[i:i + 3] for i in range(0 if len(word) < 3 else 1, len(padded) - 2))
+    return grams
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _uses_trigram_index(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def search_drivers(
+    db: Session,
+    company_id: int,
+    name: str = "",
+    dob: Optional[date] = None,
+    license: str = "",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[models.Driver], Optional[str]]:
+    """One page of matches plus the cursor for the next page (None on the last page)."""
+    stmt = select(models.Driver).where(models.Driver.created_by_company_id == company_id)
+    if dob:
+        stmt = stmt.where(models.Driver.dob == dob)
+    if license:
+        stmt = stmt.where(models.Driver.license_number.like(f"{_escape_like(license.strip())}%", escape="\\"))
+
+    query = normalize(name) if name else ""
+    if query and _uses_trigram_index(db):
+        searchable = func.driver_search_name(models.Driver.name)
+        score = cast(func.word_similarity(query, searchable), Float)
+        stmt = stmt.where(or_(searchable.contains(query, autoescape=True), literal(query).op("<%")(searchable)))
+        keys = [(score, True), (models.Driver.id, False)]
+    elif query:
+        grams = query_grams(query)
+        # Only a single word is common enough to fill a page with full matches
+        if not dob and not license and " " not in query:
+            page = _full_match_page(db, company_id, grams, limit, cursor)
+            if page is not None:
+                return page
+        hits = (
+            select(models.DriverNameGram.driver_id, func.count().label("hits"))
+            .where(models.DriverNameGram.company_id == company_id, models.DriverNameGram.gram.in_(grams))
+            .group_by(models.DriverNameGram.driver_id)
+            .having(func.count() >= max(1, math.ceil(len(grams) * MIN_GRAM_OVERLAP)))
+            .subquery()
+        )
+        stmt = stmt.join(hits, hits.c.driver_id == models.Driver.id)
+        keys = [(hits.c.hits, True), (func.length(models.Driver.name, type_=Integer), False), (models.Driver.id, False)]
+    elif name:
+        # Only punctuation was typed; nothing can match
+        return [], None
+    else:
+        keys = [(models.Driver.name, False), (models.Driver.id, False)]
+
+    stmt = stmt.add_columns(*(expr for expr, _ in keys))
+    rows = db.execute(pagination.paginate(stmt, keys, cursor, limit)).all()
+    rows, next_cursor = pagination.split_page(rows, limit, lambda row: tuple(row)[1:])
+    return [row[0] for row in rows], next_cursor
+
+
+def _full_match_page(
+    db: Session, company_id: int, grams: Set[str], limit: int, cursor: Optional[str]
+) -> Optional[Tuple[List[models.Driver], Optional[str]]]:
+    """
+    The page of search_drivers() when it holds only names containing every
+    query gram, read from the rarest gram's posting in (name length, id)
+    order with the other grams as lookups. Returns None when those names do not
+    fill the page (or the cursor is already past them); the ranked query then
+    serves it.
+    """
+    values = pagination.decode_cursor(cursor, (int, int, int))
+    if values is not None and values[0] != len(grams):
+        return None
+    g = models.DriverNameGram
+    probes = [
+        select(literal(gram).label("gram"), func.count().label("n")).select_from(
+            select(g.driver_id).where(g.company_id == company_id, g.gram == gram).limit(POSTING_PROBE_LIMIT).subquery()
+        )
+        for gram in sorted(grams)
+    ]
+    postings = dict(db.execute(union_all(*probes) if len(probes) > 1 else probes[0]).all())
+    rarest = min(sorted(postings), key=postings.get)
+    if postings[rarest] <= limit:
+        return None
+
+    # The rarest gram's posting in rank order; every full match is in it
+    driving = aliased(g)
+    keys = [(driving.name_len, False), (driving.driver_id, False)]
+    stmt = (
+        select(models.Driver, driving.name_len)
+        .join(models.Driver, models.Driver.id == driving.driver_id)
+        .where(driving.company_id == company_id, driving.gram == rarest)
+    )
+    # Rarest first: most candidates fail the first lookup
+    for gram in sorted(grams - {rarest}, key=lambda gram: (postings[gram], gram)):
+        other = aliased(g)
+        stmt = stmt.where(exists().where(
+            other.company_id == company_id, other.gram == gram,
+            other.name_len == driving.name_len, other.driver_id == driving.driver_id,
+        ))
+    if values is not None:
+        stmt = stmt.where(pagination.after(keys, values[1:]))
+    rows = db.execute(stmt.order_by(*pagination.order_by(keys)).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return None
+    rows, next_cursor = pagination.split_page(rows, limit, lambda row: (len(grams), row[1], row[0].id))
+    return [row[0] for row in rows], next_cursor
+
+
+# ----- n-gram index maintenance (non-Postgres backends) -----
+def gram_rows(drivers: Iterable) -> List[dict]:
+    """Index rows for objects/dicts exposing id, name and created_by_company_id."""
+    rows = []
+    for d in drivers:
+        get = d.__getitem__ if isinstance(d, Mapping) else (lambda key, _d=d: getattr(_d, key))
+        name = get("name")
+        rows.extend(
+            {"driver_id": get("id"), "gram": g, "name_len": len(name), "company_id": get("created_by_company_id")}
+            for g in name_grams(name)
+        )
+    return rows
+
+
+def index_drivers(connection, drivers: Iterable) -> None:
+    if connection.dialect.name == "postgresql":
+        return
+    rows = gram_rows(drivers)
+    if rows:
+        connection.execute(insert(models.DriverNameGram), rows)
+
+
+def unindex_drivers(connection, driver_ids: Iterable[int]) -> None:
+    if connection.dialect.name == "postgresql":
+        return
+    connection.execute(delete(models.DriverNameGram).where(models.DriverNameGram.driver_id.in_(list(driver_ids))))
+
+
+def rebuild_index(db: Session, batch_size: int = 5000) -> int:
+    """Rebuild driver_name_ngrams from scratch; returns the number of drivers indexed."""
+    conn = db.connection()
+    if conn.dialect.name == "postgresql":
+        return 0
+    conn.execute(delete(models.DriverNameGram))
+    total = 0
+    stmt = select(models.Driver.id, models.Driver.name, models.Driver.created_by_company_id).order_by(models.Driver.id)
+    for chunk in db.execute(stmt.execution_options(yield_per=batch_size)).mappings().partitions():
+        index_drivers(conn, chunk)
+        total += len(chunk)
+    db.commit()
+    return total
+
+
+@outbox.handler("driver.created")
+def _index_created_driver(db: Session, payload: dict) -> None:
+    # Idempotent: replaces whatever grams the driver already has
+    conn = db.connection()
+    if conn.dialect.name == "postgresql":
+        return
+    driver_id = payload["driver_id"]
+    unindex_drivers(conn, [driver_id])
+    row = db.execute(
+        select(models.Driver.id, models.Driver.name, models.Driver.created_by_company_id).where(models.Driver.id == driver_id)
+    ).mappings().first()
+    if row is not None:
+        index_drivers(conn, [row])
+
+
+@event.listens_for(models.Driver, "after_update")
+def _reindex_driver(mapper, connection, target):
+    if not inspect(target).attrs.name.history.has_changes():
+        return
+    unindex_drivers(connection, [target.id])
+    index_drivers(connection, [target])
@@ -0,0 +1,39 @@
+# app/serialization.py
+"""
+JSON encoding for response bodies.
+
+dump() is the one place handlers that build their own Response (the response
+cache, list endpoints) turn data into bytes. By default content is validated
+through a TypeAdapter for the route's response_model, exactly like FastAPI
+would. With FAST_JSON on, rows marked `trusted` -- plain dicts from the column
+projections in crud, whose keys and types already match the schema -- go
+straight to orjson, skipping the second validation pass. FAST_JSON also makes
+ORJSONResponse the app's default response class.
+"""
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from .core.security import settings
+
+
+@lru_cache(maxsize=None)
+def adapter(schema) -> TypeAdapter:
+    """Compiled (and cached) validator/serializer for a response_model such as List[DriverResponse]."""
+    return TypeAdapter(schema)
+
+
+def dump(schema, content: Any, trusted: bool = False) -> bytes:
+    if trusted and settings.FAST_JSON:
+        import orjson  # only required in FAST_JSON mode
+
+        # OPT_UTC_Z: pydantic writes UTC as "Z", orjson defaults to "+00:00"
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    a = adapter(schema)
+    return a.dump_json(a.validate_python(content, from_attributes=True))
+
+
+def default_response_class():
+    return ORJSONResponse if settings.FAST_JSON else JSONResponse
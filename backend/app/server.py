@@ -0,0 +1,201 @@
+# app/server.py
+"""
+Production launcher: gunicorn + uvicorn workers, sized from the container.
+
+    python -m app.server                 # what the Docker image runs
+    python -m app.server --print-config  # show the derived settings and exit
+
+Worker count comes from SERVER_WORKERS, or when that is 0 from the CPU quota
+(one event loop per core) capped by memory / SERVER_WORKER_MEMORY_MB. Both
+limits are read from the cgroup first, so a 1-vCPU task on a big host gets one
+worker, not one per host core.
+
+With SERVER_PRELOAD the app is imported once in the master and workers fork
+from it, which keeps worker boot to a fork. Each forked worker disposes the
+inherited engine pools (without closing the parent's sockets) so no two
+processes ever share a DB connection. Migrations, when enabled, run once here
+in the master before any worker starts; the per-worker startup hook is turned
+off. Boot timings are logged and exported on /metrics.
+"""
+import time
+
+_launched_at = time.time()
+
+import argparse
+import importlib.util
+import logging
+import math
+import os
+import sys
+import warnings
+from typing import Optional
+
+from gunicorn.app.base import BaseApplication
+
+with warnings.catch_warnings():
+    # Still the worker class gunicorn documents for uvicorn; the split-out
+    # uvicorn-worker package has the same interface
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from uvicorn.workers import UvicornWorker
+
+from .core import instrumentation
+from .core.security import settings
+
+os.environ.setdefault(instrumentation.LAUNCHED_AT_ENV, repr(_launched_at))
+
+log = logging.getLogger(__name__)
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop" if _has("uvloop") else "asyncio",
+        "http": "httptools" if _has("httptools") else "h11",
+    }
+
+
+# ----- Container limits -----
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit() -> float:
+    """CPUs this process may use: cgroup quota, then affinity mask, then host count."""
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>" or "max <period>"
+    if cpu_max and not cpu_max.startswith("max"):
+        quota, period = cpu_max.split()
+        return int(quota) / int(period)
+    quota, period = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"), _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    if hasattr(os, "sched_getaffinity"):
+        return float(len(os.sched_getaffinity(0)))
+    return float(os.cpu_count() or 1)
+
+
+def memory_limit() -> Optional[int]:
+    """Bytes of memory available: cgroup limit, else physical memory, else None."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read(path)
+        # v1 reports "no limit" as a huge page-aligned number
+        if value and value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def worker_count(cpus: float, memory: Optional[int]) -> int:
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    workers = max(1, math.ceil(cpus))
+    if memory:
+        workers = min(workers, memory // (settings.SERVER_WORKER_MEMORY_MB * 1024 * 1024))
+    return max(1, workers)
+
+
+def gunicorn_config() -> dict:
+    cpus, memory = cpu_limit(), memory_limit()
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.PORT}",
+        "workers": worker_count(cpus, memory),
+        "worker_class": Worker,
+        "preload_app": settings.SERVER_PRELOAD,
+        "timeout": settings.SERVER_TIMEOUT_SECONDS,
+        "graceful_timeout": settings.SERVER_TIMEOUT_SECONDS,
+        "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS // 10,
+        "accesslog": "-" if settings.SERVER_ACCESS_LOG else None,
+        "errorlog": "-",
+        "post_fork": post_fork,
+        "when_ready": when_ready,
+    }
+
+
+# ----- Hooks -----
+def _since_launch() -> float:
+    return time.time() - float(os.environ[instrumentation.LAUNCHED_AT_ENV])
+
+
+def post_fork(server, worker) -> None:
+    os.environ[instrumentation.FORKED_AT_ENV] = repr(time.time())
+    # Connections opened in the master (preload, migrations) stay with it
+    from .db import async_session, replicas, session
+
+    session.dispose_after_fork()
+    async_session.dispose_after_fork()
+    replicas.dispose_after_fork()
+
+
+def when_ready(server) -> None:
+    cfg = server.cfg
+    connections = cfg.workers * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    server.log.info(
+        "master ready in %.2fs: %d %s workers (loop=%s, http=%s, preload=%s), up to %d DB connections",
+        _since_launch(), cfg.workers, Worker.__name__, Worker.CONFIG_KWARGS["loop"], Worker.CONFIG_KWARGS["http"],
+        cfg.preload_app, connections,
+    )
+
+
+class Server(BaseApplication):
+    def __init__(self, config: dict):
+        self.config = config
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.config.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # In the master with preload, otherwise once per worker
+        started = time.perf_counter()
+        from .main import app
+
+        instrumentation.record_startup("import", time.perf_counter() - started)
+        return app
+
+
+def prepare() -> None:
+    """Master-side work that must happen once, before any worker exists."""
+    if settings.MIGRATE_ON_STARTUP:
+        from .db import migrate
+        from .db.session import engine
+
+        started = time.perf_counter()
+        migrate.upgrade()
+        engine.dispose()
+        instrumentation.record_startup("migrate", time.perf_counter() - started)
+        log.info("migrations applied in %.2fs", time.perf_counter() - started)
+    # Workers inherit this (fork), so none of them repeat the schema work
+    settings.MIGRATE_ON_STARTUP = False
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API under gunicorn.")
+    parser.add_argument("--print-config", action="store_true", help="print the derived gunicorn settings and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="[%(asctime)s] [%(process)d] [%(levelname)s] %(message)s")
+    for name in (__name__, "app.main", "alembic.runtime.migration"):
+        logging.getLogger(name).setLevel(logging.INFO)
+
+    config = gunicorn_config()
+    if args.print_config:
+        for key, value in config.items():
+            print(f"{key} = {getattr(value, '__name__', value)}")
+        print(f"# cpus={cpu_limit():g} memory_mb={(memory_limit() or 0) // 2**20}")
+        return
+    prepare()
+    Server(config).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# app/suggest.py
+"""
+Per-keystroke driver typeahead (GET /drivers/suggest).
+
+Each tenant gets an in-memory prefix index, built lazily from `drivers` on its
+first suggest call: a sorted array of (token, driver_id) where the tokens are
+the normalized words of the name plus the compacted license number. A prefix
+lookup is a bisect plus a short forward walk, so a hit never touches the DB.
+
+The index is refreshed in place by create_driver and dropped when bulk writes
+land (imports), and rebuilt after SUGGEST_TTL_SECONDS so writes made through
+other workers show up. One request builds a tenant's index; others arriving
+meanwhile are answered by the regular search until it is live. Indexes live in one LRU bounded by SUGGEST_MAX_DRIVERS
+in total: the least recently used tenants are evicted first. A tenant bigger
+than the whole budget is served by the regular search instead.
+"""
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, search
+from .core.security import settings
+
+# Index entries walked per lookup before ranking; bounds the cost of one- or
+# two-letter prefixes that match a large share of a tenant
+MAX_SCAN = 2000
+
+_LICENSE_MARK = "#"
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def _license_token(license_number: str) -> str:
+    return _LICENSE_MARK + _NON_ALNUM.sub("", license_number.lower())
+
+
+class TenantIndex:
+    def __init__(self, drivers: List[Tuple[int, str, str]]):
+        self.drivers: Dict[int, Tuple[str, str, str]] = {}  # id -> (name, license, normalized name)
+        self.tokens: List[Tuple[str, int]] = []
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+        for driver_id, name, license_number in drivers:
+            self.tokens.extend((token, driver_id) for token in self._remember(driver_id, name, license_number))
+        self.tokens.sort()
+
+    def _remember(self, driver_id: int, name: str, license_number: str) -> set:
+        normalized = search.normalize(name)
+        self.drivers[driver_id] = (name, license_number, normalized)
+        return set(normalized.split()) | {_license_token(license_number)}
+
+    def __len__(self) -> int:
+        return len(self.drivers)
+
+    def add(self, driver_id: int, name: str, license_number: str) -> None:
+        with self._lock:
+            if driver_id in self.drivers:
+                return
+            for token in self._remember(driver_id, name, license_number):
+                insort(self.tokens, (token, driver_id))
+
+    def _walk(self, prefix: str) -> List[int]:
+        found = []
+        i = bisect_left(self.tokens, (prefix,))
+        end = min(len(self.tokens), i + MAX_SCAN)
+        while i < end and self.tokens[i][0].startswith(prefix):
+            found.append(self.tokens[i][1])
+            i += 1
+        return found
+
+    def match(self, q: str, limit: int) -> List[dict]:
+        words = search.normalize(q).split()
+        if not words:
+            return []
+        with self._lock:
+            # Probe with the longest word (most selective), then require every
+            # other query word to prefix some word of the name
+            probe = max(words, key=len)
+            rest = [w for w in words if w != probe]
+            candidates = {
+                d for d in self._walk(probe)
+                if not rest or all(any(t.startswith(w) for t in self.drivers[d][2].split()) for w in rest)
+            }
+            candidates.update(self._walk(_license_token("".join(words))))
+            rows = [(d, *self.drivers[d]) for d in candidates]
+        # Whole-name prefix matches first, then shorter names
+        phrase = " ".join(words)
+        top = heapq.nsmallest(limit, rows, key=lambda r: (not r[3].startswith(phrase), len(r[1]), r[1], r[0]))
+        return [{"id": d, "name": name, "license_number": lic} for d, name, lic, _ in top]
+
+
+class _Oversized:
+    """Stands in for a tenant whose drivers don't fit the memory budget."""
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return 0
+
+
+class _Building:
+    """
+    Holds a tenant's slot while one request reads its index from the DB. Drivers
+    committed meanwhile may be missing from that read, so add_driver queues
+    them here and _build folds them in before the index goes live.
+    """
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.adds: List[Tuple[int, str, str]] = []
+
+    def __len__(self) -> int:
+        return 0
+
+
+_indexes: "OrderedDict[int, object]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "builds": 0, "evictions": 0, "fallbacks": 0}
+
+
+def _claim(company_id: int) -> Tuple[object, bool]:
+    """
+    The tenant's live index (or the _Building of a request reading it) and
+    False, or a new _Building and True when this caller has to build it.
+    """
+    now = time.monotonic()
+    with _lock:
+        index = _indexes.get(company_id)
+        if isinstance(index, _Building):
+            return index, False
+        if index is not None and now - index.built_at <= settings.SUGGEST_TTL_SECONDS:
+            _indexes.move_to_end(company_id)
+            _stats["hits"] += 1
+            return index, False
+        # Claim the slot before reading, so a driver committed after the read is queued, not lost
+        building = _indexes[company_id] = _Building()
+        _indexes.move_to_end(company_id)
+        return building, True
+
+
+def _build(db: Session, company_id: int, building: _Building):
+    budget = settings.SUGGEST_MAX_DRIVERS
+    try:
+        rows = db.execute(
+            select(models.Driver.id, models.Driver.name, models.Driver.license_number)
+            .where(models.Driver.created_by_company_id == company_id)
+            .limit(budget + 1)
+        ).all()
+    except BaseException:
+        with _lock:
+            if _indexes.get(company_id) is building:
+                del _indexes[company_id]
+        raise
+    index = TenantIndex(rows) if len(rows) <= budget else _Oversized()
+    with _lock:
+        _stats["builds"] += 1
+        if _indexes.get(company_id) is not building:
+            # Invalidated (or rebuilt by another request) during the read: serve it, don't keep it
+            return index
+        if isinstance(index, TenantIndex):
+            for add in building.adds:
+                index.add(*add)
+        _indexes[company_id] = index
+        _indexes.move_to_end(company_id)
+        total = sum(len(i) for i in _indexes.values())
+        while total > budget and len(_indexes) > 1:
+            _, evicted = _indexes.popitem(last=False)
+            total -= len(evicted)
+            _stats["evictions"] += 1
+    return index
+
+
+def suggest(db: Session, company_id: int, q: str, limit: int) -> List[dict]:
+    """Top `limit` drivers whose name words or license start with the typed text."""
+    index, claimed = _claim(company_id)
+    if claimed:
+        index = _build(db, company_id, index)
+    if isinstance(index, (_Oversized, _Building)):
+        with _lock:
+            _stats["fallbacks"] += 1
+        drivers, _ = search.search_drivers(db, company_id, name=q, limit=limit)
+        return [{"id": d.id, "name": d.name, "license_number": d.license_number} for d in drivers]
+    return index.match(q, limit)
+
+
+# ----- Freshness -----
+def add_driver(driver: models.Driver) -> None:
+    """Fold a committed driver into its tenant's index, if that index is loaded."""
+    with _lock:
+        index = _indexes.get(driver.created_by_company_id)
+        if isinstance(index, _Building):
+            index.adds.append((driver.id, driver.name, driver.license_number))
+            return
+    if isinstance(index, TenantIndex):
+        index.add(driver.id, driver.name, driver.license_number)
+
+
+def invalidate_company(company_id: int) -> None:
+    with _lock:
+        _indexes.pop(company_id, None)
+
+
+def clear() -> None:
+    with _lock:
+        _indexes.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "tenants": len(_indexes),
+            "drivers": sum(len(i) for i in _indexes.values()),
+            "max_drivers": settings.SUGGEST_MAX_DRIVERS,
+            "ttl_s": settings.SUGGEST_TTL_SECONDS,
+            **_stats,
+        }
@@ -0,0 +1,124 @@
+# backend/benchmarks/async_vs_sync.py
+"""
+Load-test the sync (threadpool + Session) and async (AsyncSession) driver
+routes side by side, in-process over ASGI.
+
+    cd backend
+    python -m benchmarks.async_vs_sync --drivers 5000 --requests 2000 --concurrency 64
+
+Uses a throwaway SQLite file unless DATABASE_URL is set; point it at Postgres
+to compare psycopg2 vs asyncpg.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+import httpx
+from fastapi import FastAPI
+
+from app import models
+from app.core.security import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.db.async_session import dispose_async_engine
+from app.main import create_access_token
+from app.routes import drivers, drivers_async
+
+
+def seed(n_drivers: int, ratings_per_driver: int) -> tuple:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        suffix = str(time.time_ns())
+        company = models.Company(name="Bench Co", email=f"bench-{suffix}@example.com", password="x", address="-")
+        db.add(company)
+        db.flush()
+        user = models.User(name="Bench", email=f"bench-staff-{suffix}@example.com", password="x",
+                           department=models.DepartmentEnum.safety, company_id=company.id)
+        db.add(user)
+        db.flush()
+        rows = [
+            {"name": f"Driver {i}", "dob": date(1980, 1, 1 + i % 28),
+             "license_number": f"B{suffix}-{i}", "created_by_company_id": company.id}
+            for i in range(n_drivers)
+        ]
+        db.execute(models.Driver.__table__.insert(), rows)
+        driver_ids = [d for (d,) in db.query(models.Driver.id).filter_by(created_by_company_id=company.id)]
+        db.execute(models.DriverRating.__table__.insert(), [
+            {"driver_id": d, "user_id": user.id, "department": "safety", "score": 1 + (d + k) % 5}
+            for d in driver_ids[:500] for k in range(ratings_per_driver)
+        ])
+        db.commit()
+        return company.id, driver_ids
+    finally:
+        db.close()
+
+
+async def drive(app: FastAPI, token: str, driver_ids: list, total: int, concurrency: int) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = []
+    for i in range(total):
+        d = driver_ids[i % min(len(driver_ids), 500)]
+        paths.append(("/drivers/search?name=Driver 1", f"/drivers/{d}", f"/drivers/{d}/ratings")[i % 3])
+
+    latencies = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for p in paths:
+        queue.put_nowait(p)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                path = queue.get_nowait()
+                t0 = time.perf_counter()
+                r = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - t0)
+                assert r.status_code == 200, (path, r.status_code, r.text)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {"rps": total / elapsed, "p50_ms": q[49] * 1000, "p95_ms": q[94] * 1000, "p99_ms": q[98] * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=2000)
+    parser.add_argument("--ratings-per-driver", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=1500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    company_id, driver_ids = seed(args.drivers, args.ratings_per_driver)
+    token = create_access_token({"sub": str(company_id)}, secret_key=settings.SECRET_KEY)
+
+    results = {}
+    for label, router in (("sync", drivers.router), ("async", drivers_async.router)):
+        app = FastAPI()
+        app.include_router(router)
+
+        async def run():
+            try:
+                return await drive(app, token, driver_ids, args.requests, args.concurrency)
+            finally:
+                await dispose_async_engine()
+
+        results[label] = asyncio.run(run())
+
+    print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, r in results.items():
+        print(f"{label:<6} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# backend/benchmarks/driver_import.py
+"""
+Throughput of POST /drivers/import (streamed CSV / NDJSON) against the
+one-request-per-driver POST /drivers path.
+
+    cd backend
+    python -m benchmarks.driver_import --rows 100000 --single-rows 1000
+
+Uses a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+import httpx
+
+from app import models
+from app.core.security import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app, create_access_token
+
+
+def make_company() -> str:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        company = models.Company(name="Bench", email=f"bench-{time.time_ns()}@example.com", password="x")
+        db.add(company)
+        db.commit()
+        return create_access_token({"sub": str(company.id)}, secret_key=settings.SECRET_KEY)
+    finally:
+        db.close()
+
+
+def csv_body(prefix: str, n: int):
+    yield b"name,dob,license_number\n"
+    for i in range(n):
+        yield f"Import Driver {i},1985-{1 + i % 12:02d}-{1 + i % 28:02d},{prefix}-{i}\n".encode()
+
+
+def ndjson_body(prefix: str, n: int):
+    for i in range(n):
+        row = {"name": f"Import Driver {i}", "dob": f"1985-{1 + i % 12:02d}-{1 + i % 28:02d}", "license_number": f"{prefix}-{i}"}
+        yield (json.dumps(row) + "\n").encode()
+
+
+async def bulk(client: httpx.AsyncClient, headers: dict, content_type: str, body) -> tuple:
+    async def stream():
+        buf = []
+        for line in body:
+            buf.append(line)
+            if len(buf) == 500:  # ~64KB network chunks
+                yield b"".join(buf)
+                buf = []
+        if buf:
+            yield b"".join(buf)
+
+    t0 = time.perf_counter()
+    r = await client.post("/drivers/import", content=stream(), headers={**headers, "Content-Type": content_type})
+    elapsed = time.perf_counter() - t0
+    assert r.status_code == 200, r.text
+    return r.json()["inserted"], elapsed
+
+
+async def one_by_one(client: httpx.AsyncClient, headers: dict, prefix: str, n: int) -> tuple:
+    t0 = time.perf_counter()
+    for i in range(n):
+        r = await client.post("/drivers", json={"name": f"Single {i}", "dob": "1985-01-01", "license_number": f"{prefix}-{i}"}, headers=headers)
+        assert r.status_code == 200, r.text
+    return n, time.perf_counter() - t0
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {make_company()}"}
+    stamp = time.time_ns()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        results = [
+            ("POST /drivers", await one_by_one(client, headers, f"S{stamp}", args.single_rows)),
+            ("import csv", await bulk(client, headers, "text/csv", csv_body(f"C{stamp}", args.rows))),
+            ("import ndjson", await bulk(client, headers, "application/x-ndjson", ndjson_body(f"N{stamp}", args.rows))),
+        ]
+    print(f"{'path':<15} {'rows':>8} {'seconds':>9} {'rows/s':>10}")
+    for label, (rows, elapsed) in results:
+        print(f"{label:<15} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single-rows", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
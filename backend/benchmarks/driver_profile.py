@@ -0,0 +1,138 @@
+# backend/benchmarks/driver_profile.py
+"""
+Dashboard load: the per-driver call chain vs GET /drivers/profile.
+
+One "load" searches for drivers and then fetches what the dashboard shows for
+the first --ids hits:
+
+    chain    GET /drivers/search, then GET /drivers/{id}/ratings and
+             GET /drivers/{id}/stats for every hit (2 + 2 * ids calls)
+    profile  GET /drivers/search, then one GET /drivers/profile?ids=...
+
+Every call pays token checks, the principal lookup and routing again, so the
+chain pays them per driver.
+
+Reports loads/s, p50/p95 per load, HTTP calls and SQL statements per load
+(from the Server-Timing header), in-process over ASGI with the response cache
+off so every call does its real work.
+
+    cd backend
+    python -m benchmarks.driver_profile --ids 1 5 20 --loads 300 --concurrency 16
+
+Uses a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+
+from app import response_cache
+from app.core.security import settings
+from app.main import create_access_token
+
+from .hot_paths import LAST, seed
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+async def chain(client: httpx.AsyncClient, headers: dict, name: str, ids: int) -> list:
+    search = await client.get("/drivers/search", params={"name": name, "limit": ids}, headers=headers)
+    responses = [search]
+    for driver in search.json():
+        responses.append(await client.get(f"/drivers/{driver['id']}/ratings", params={"limit": 10}, headers=headers))
+        responses.append(await client.get(f"/drivers/{driver['id']}/stats", headers=headers))
+    return responses
+
+
+async def profile(client: httpx.AsyncClient, headers: dict, name: str, ids: int) -> list:
+    search = await client.get("/drivers/search", params={"name": name, "limit": ids}, headers=headers)
+    found = [d["id"] for d in search.json()]
+    if not found:
+        return [search]
+    return [search, await client.get("/drivers/profile", params={"ids": found, "ratings_limit": 10}, headers=headers)]
+
+
+async def drive(client: httpx.AsyncClient, load, tenants: list, ids: int, total: int, concurrency: int) -> dict:
+    rnd = random.Random(5)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        t = tenants[i % len(tenants)]
+        queue.put_nowait(({"Authorization": f"Bearer {t['company_token']}"}, rnd.choice(LAST)))
+    latencies, calls, queries = [], [], []
+
+    async def worker():
+        while not queue.empty():
+            headers, name = queue.get_nowait()
+            t0 = time.perf_counter()
+            responses = await load(client, headers, name, ids)
+            latencies.append(time.perf_counter() - t0)
+            for r in responses:
+                assert r.status_code == 200, (r.request.url, r.status_code, r.text)
+            calls.append(len(responses))
+            queries.append(sum(int(QUERIES.search(r.headers["server-timing"]).group(1)) for r in responses))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "loads_per_s": total / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "calls": statistics.mean(calls),
+        "queries": statistics.mean(queries),
+    }
+
+
+async def run(tenants: list, args) -> list:
+    from app.main import app
+
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for ids in args.ids:
+            for label, load in (("chain", chain), ("profile", profile)):
+                await drive(client, load, tenants, ids, max(1, args.loads // 10), args.concurrency)  # warm-up
+                rows.append((ids, label, await drive(client, load, tenants, ids, args.loads, args.concurrency)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--drivers", type=int, default=2000, help="drivers per company")
+    parser.add_argument("--ratings-per-driver", type=int, default=20)
+    parser.add_argument("--ids", type=int, nargs="+", default=[1, 5, 20], help="drivers shown per load")
+    parser.add_argument("--loads", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    if max(args.ids) > settings.PROFILE_BATCH_MAX:
+        parser.error(f"--ids above PROFILE_BATCH_MAX ({settings.PROFILE_BATCH_MAX})")
+
+    response_cache.set_backend(None)
+    tenants = seed(args.companies, args.drivers, args.ratings_per_driver)
+    for t in tenants:
+        t["company_token"] = create_access_token({"sub": str(t["company_id"])}, secret_key=settings.SECRET_KEY)
+    rows = asyncio.run(run(tenants, args))
+
+    print(f"{'ids':>4} {'mode':<8} {'loads/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'calls':>6} {'queries':>8}")
+    for ids, label, r in rows:
+        print(
+            f"{ids:>4} {label:<8} {r['loads_per_s']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f}"
+            f" {r['calls']:>6.1f} {r['queries']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# backend/benchmarks/driver_search.py
+"""
+p50/p95 latency of driver name search: leading-wildcard ILIKE vs the indexed,
+ranked search in app.search, for one tenant with --drivers rows.
+
+    cd backend
+    python -m benchmarks.driver_search --drivers 1000000 --queries 200
+
+Uses a throwaway SQLite file (n-gram index) unless DATABASE_URL is set; point
+it at Postgres to measure the pg_trgm path.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+from sqlalchemy import insert, select
+
+from app import models, search
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+
+FIRST = ["james", "maria", "john", "olga", "ahmed", "li", "carlos", "fatima", "ivan", "grace", "azim", "nora"]
+SYLLABLES = ["ka", "lo", "mir", "ba", "tov", "zen", "ri", "shu", "dan", "el", "vo", "gra", "nik", "os", "tu"]
+
+
+def surname(rnd: random.Random) -> str:
+    return "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+
+
+def seed(n: int, batch: int = 20000) -> int:
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(7)
+    suffix = time.time_ns()
+    with engine.begin() as conn:
+        company_id = conn.execute(
+            insert(models.Company).values(name="Bench", email=f"bench-{suffix}@example.com", password="x")
+        ).inserted_primary_key[0]
+        for start in range(0, n, batch):
+            rows = [
+                {"name": f"{rnd.choice(FIRST).title()} {surname(rnd).title()}",
+                 "dob": date(1960 + i % 40, 1 + i % 12, 1 + i % 28),
+                 "license_number": f"L{suffix}-{i}", "created_by_company_id": company_id}
+                for i in range(start, min(n, start + batch))
+            ]
+            conn.execute(insert(models.Driver), rows)
+            first_id = conn.execute(
+                select(models.Driver.id).where(models.Driver.license_number == rows[0]["license_number"])
+            ).scalar_one()
+            for offset, row in enumerate(rows):
+                row["id"] = first_id + offset
+            search.index_drivers(conn, rows)
+    return company_id
+
+
+def ilike_search(db, company_id: int, name: str):
+    return db.query(models.Driver).filter(
+        models.Driver.created_by_company_id == company_id, models.Driver.name.ilike(f"%{name}%")
+    ).limit(50).all()
+
+
+def timed(fn, queries) -> dict:
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - t0)
+    cuts = statistics.quantiles(latencies, n=100)
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000}
+
+
+def query_mix(rnd: random.Random, n: int) -> dict:
+    """Typical dashboard inputs: full names, surname fragments, typos, and misses."""
+    def typo(word: str) -> str:
+        i = rnd.randrange(len(word))
+        return word[:i] + word[i + 1:]
+
+    return {
+        "full name": [f"{rnd.choice(FIRST)} {surname(rnd)}" for _ in range(n)],
+        "surname prefix": [surname(rnd)[:rnd.randint(3, 5)] for _ in range(n)],
+        "typo": [typo(surname(rnd)) for _ in range(n)],
+        "no match": [f"xq{surname(rnd)}zz" for _ in range(n)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    company_id = seed(args.drivers)
+    print(f"seeded {args.drivers} drivers in {time.perf_counter() - t0:.1f}s")
+
+    mix = query_mix(random.Random(11), args.queries)
+    db = SessionLocal()
+    try:
+        print(f"{'queries':<16} {'path':<8} {'p50 ms':>9} {'p95 ms':>9}")
+        for label, queries in mix.items():
+            for path, fn in (
+                ("ilike", lambda q: ilike_search(db, company_id, q)),
+                ("indexed", lambda q: search.search_drivers(db, company_id, name=q)),
+            ):
+                r = timed(fn, queries)
+                print(f"{label:<16} {path:<8} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# backend/benchmarks/hot_paths.py
+"""
+Load test for the API hot paths with a regression gate.
+
+Seeds --companies tenants (each with a CEO, a safety staff user, --drivers
+drivers and --ratings-per-driver ratings), then drives each scenario at fixed
+concurrency and reports throughput and p50/p95/p99:
+
+    login          POST /login
+    search         GET  /drivers/search?name=...
+    ratings        GET  /drivers/{id}/ratings
+    rate           POST /ratings
+    staff_drivers  GET  /staff/drivers
+
+    cd backend
+    python -m benchmarks.hot_paths                                # in-process (ASGI)
+    python -m benchmarks.hot_paths --target uvicorn               # real server on a free port
+    python -m benchmarks.hot_paths --save-baseline benchmarks/baseline.json
+    python -m benchmarks.hot_paths --baseline benchmarks/baseline.json --tolerance 0.25
+
+With --baseline the run exits non-zero when any scenario errors, loses more
+than --tolerance of its throughput, or its p95 grows by more than --tolerance.
+Baselines are per machine and per target; regenerate them on your hardware.
+
+Uses a throwaway SQLite file unless DATABASE_URL is set (Postgres works too).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+# Measures handler cost, not the limiter (which would 429 the login scenario)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+from sqlalchemy import insert, select
+
+from app import models, rating_stats, search, utils
+from app.core.security import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import create_access_token
+
+PASSWORD = "benchpass123"
+SCENARIOS = ("login", "search", "ratings", "rate", "staff_drivers")
+FIRST = ["james", "maria", "john", "olga", "ahmed", "li", "carlos", "fatima", "ivan", "grace", "azim", "nora"]
+LAST = ["kalo", "mirba", "tovzen", "rishu", "danel", "vogra", "nikos", "tuka", "bamir", "zenri"]
+
+
+# ----- Seeding -----
+def seed(n_companies: int, n_drivers: int, ratings_per_driver: int) -> list:
+    """Returns one dict per tenant: emails, ids, driver ids and surnames to search for."""
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(11)
+    hashed = utils.hash_password(PASSWORD)
+    suffix = time.time_ns()
+    tenants = []
+    with engine.begin() as conn:
+        for c in range(n_companies):
+            email = f"bench-{suffix}-{c}@example.com"
+            company_id = conn.execute(
+                insert(models.Company).values(name=f"Bench {c}", email=email, password=hashed, address="-")
+            ).inserted_primary_key[0]
+            user_id = conn.execute(
+                insert(models.User).values(
+                    name="Bench Safety", email=f"bench-staff-{suffix}-{c}@example.com", password=hashed,
+                    department=models.DepartmentEnum.safety, company_id=company_id,
+                )
+            ).inserted_primary_key[0]
+            conn.execute(insert(models.Driver), [
+                {"name": f"{rnd.choice(FIRST).title()} {rnd.choice(LAST).title()}",
+                 "dob": date(1960 + i % 40, 1 + i % 12, 1 + i % 28),
+                 "license_number": f"H{suffix}-{c}-{i}", "created_by_company_id": company_id}
+                for i in range(n_drivers)
+            ])
+            driver_ids = list(conn.execute(
+                select(models.Driver.id).where(models.Driver.created_by_company_id == company_id)
+            ).scalars())
+            if ratings_per_driver:
+                conn.execute(insert(models.DriverRating), [
+                    {"driver_id": d, "user_id": user_id, "department": models.DepartmentEnum.safety,
+                     "score": 1 + (d + k) % 5}
+                    for d in driver_ids for k in range(ratings_per_driver)
+                ])
+            tenants.append({"email": email, "company_id": company_id, "user_id": user_id, "driver_ids": driver_ids})
+
+    # Core inserts skip the ORM hooks, so build the derived tables in one pass
+    db = SessionLocal()
+    try:
+        search.rebuild_index(db)
+        rating_stats.rebuild(db)
+    finally:
+        db.close()
+    return tenants
+
+
+def build_requests(tenants: list, scenario: str, total: int, rnd: random.Random) -> list:
+    """(method, path, kwargs) tuples, spread round-robin over the tenants."""
+    out = []
+    for i in range(total):
+        t = tenants[i % len(tenants)]
+        company = {"Authorization": f"Bearer {t['company_token']}"}
+        staff = {"Authorization": f"Bearer {t['staff_token']}"}
+        driver_id = rnd.choice(t["driver_ids"])
+        if scenario == "login":
+            out.append(("POST", "/login", {"data": {"username": t["email"], "password": PASSWORD}}))
+        elif scenario == "search":
+            query = rnd.choice(LAST)[: rnd.randint(3, 5)]
+            out.append(("GET", "/drivers/search", {"params": {"name": query, "limit": 20}, "headers": company}))
+        elif scenario == "ratings":
+            out.append(("GET", f"/drivers/{driver_id}/ratings", {"params": {"limit": 20}, "headers": company}))
+        elif scenario == "rate":
+            out.append(("POST", "/ratings", {"json": {"driver_id": driver_id, "score": rnd.randint(1, 5)}, "headers": staff}))
+        elif scenario == "staff_drivers":
+            out.append(("GET", "/staff/drivers", {"params": {"limit": 50}, "headers": staff}))
+    return out
+
+
+# ----- Driving -----
+async def drive(client: httpx.AsyncClient, requests: list, concurrency: int) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for r in requests:
+        queue.put_nowait(r)
+    latencies, errors = [], []
+
+    async def worker():
+        while not queue.empty():
+            method, path, kwargs = queue.get_nowait()
+            t0 = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                errors.append((path, response.status_code))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+    return {
+        "requests": len(requests),
+        "errors": len(errors),
+        "rps": len(requests) / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+async def run_scenarios(client: httpx.AsyncClient, tenants: list, args) -> dict:
+    rnd = random.Random(23)
+    # bcrypt is bounded by the hashing pool; beyond its capacity logins are shed with 503
+    login_concurrency = min(args.concurrency, max(1, settings.HASH_POOL_SIZE) + settings.HASH_QUEUE_DEPTH)
+    concurrency_for = {"login": login_concurrency, "rate": args.write_concurrency}
+    results = {}
+    for scenario in args.scenarios:
+        total = args.login_requests if scenario == "login" else args.requests
+        concurrency = concurrency_for.get(scenario, args.concurrency)
+        requests = build_requests(tenants, scenario, total, rnd)
+        await drive(client, requests[: max(1, total // 10)], concurrency)  # warm-up
+        results[scenario] = await drive(client, requests, concurrency)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_inprocess(tenants: list, args) -> dict:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        return await run_scenarios(client, tenants, args)
+
+
+async def run_uvicorn(tenants: list, args) -> dict:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/healthz")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not come up")
+                await asyncio.sleep(0.2)
+            return await run_scenarios(client, tenants, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+# ----- Reporting -----
+def report(results: dict) -> None:
+    print(f"{'scenario':<14} {'requests':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<14} {r['requests']:>8} {r['errors']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for name, r in results.items():
+        if r["errors"]:
+            problems.append(f"{name}: {r['errors']} failed requests")
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {r['rps']:.1f} req/s vs baseline {base['rps']:.1f}")
+        if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {r['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--drivers", type=int, default=2000, help="drivers per company")
+    parser.add_argument("--ratings-per-driver", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-concurrency", type=int, default=8,
+                        help="concurrency for POST /ratings (SQLite has a single writer)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--baseline", help="compare against this baseline file and fail on regressions")
+    parser.add_argument("--save-baseline", help="write this run's results into a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    tenants = seed(args.companies, args.drivers, args.ratings_per_driver)
+    for t in tenants:
+        t["company_token"] = create_access_token({"sub": str(t["company_id"])}, secret_key=settings.SECRET_KEY)
+        t["staff_token"] = create_access_token({"sub": str(t["user_id"])}, secret_key=settings.STAFF_SECRET_KEY)
+
+    runner = run_uvicorn if args.target == "uvicorn" else run_inprocess
+    results = asyncio.run(runner(tenants, args))
+    report(results)
+
+    params = {
+        k: getattr(args, k)
+        for k in ("companies", "drivers", "ratings_per_driver", "requests", "login_requests", "concurrency", "write_concurrency")
+    }
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline) as f:
+                stored = json.load(f)
+        stored[args.target] = {"params": params, "results": results}
+        with open(args.save_baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline for {args.target!r} written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f).get(args.target)
+        if stored is None:
+            print(f"no {args.target!r} entry in {args.baseline}", file=sys.stderr)
+            return 2
+        if stored["params"] != params:
+            print(f"warning: baseline was recorded with {stored['params']}", file=sys.stderr)
+        problems = regressions(results, stored["results"], args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        if problems:
+            return 1
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# backend/benchmarks/json_serialization.py
+"""
+Encoding cost of 10k-row driver and rating lists, per serialization path:
+
+    orm + stdlib json       ORM entities validated from attributes, json.dumps (FastAPI's default)
+    rows + stdlib json      projected row dicts validated, json.dumps
+    rows + dump_json        projected row dicts validated, TypeAdapter.dump_json (FAST_JSON off)
+    rows + orjson response  validated, then ORJSONResponse rendering
+    trusted rows + orjson   projected row dicts straight to orjson (FAST_JSON on)
+
+    cd backend
+    python -m benchmarks.json_serialization --rows 10000 --repeat 7
+
+Only the encoding is timed; the rows are fetched once up front. Uses a
+throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app import crud, schemas, serialization
+from app.core.security import settings
+from app.db.session import SessionLocal
+from benchmarks.list_serialization import orm_drivers, orm_ratings, seed
+
+
+def stdlib(schema, items, from_attributes: bool) -> bytes:
+    a = serialization.adapter(schema)
+    return JSONResponse(a.dump_python(a.validate_python(items, from_attributes=from_attributes), mode="json")).body
+
+
+def orjson_response(schema, items) -> bytes:
+    a = serialization.adapter(schema)
+    return ORJSONResponse(a.dump_python(a.validate_python(items), mode="json")).body
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compare(label: str, schema, entities, rows, repeat: int) -> None:
+    settings.FAST_JSON = True
+    assert orjson.loads(serialization.dump(schema, rows, trusted=True)) == json.loads(stdlib(schema, entities, True))
+    paths = [
+        ("orm + stdlib json", lambda: stdlib(schema, entities, True)),
+        ("rows + stdlib json", lambda: stdlib(schema, rows, False)),
+        ("rows + dump_json", lambda: serialization.adapter(schema).dump_json(serialization.adapter(schema).validate_python(rows))),
+        ("rows + orjson response", lambda: orjson_response(schema, rows)),
+        ("trusted rows + orjson", lambda: serialization.dump(schema, rows, trusted=True)),
+    ]
+    baseline = None
+    for name, fn in paths:
+        took = best_of(repeat, fn)
+        baseline = baseline or took
+        print(f"{label:<8} {name:<24} {took * 1000:8.1f} ms  {len(rows) / took:>12,.0f} rows/s  x{baseline / took:5.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    company_id, driver_id = seed(args.rows)
+    db = SessionLocal()
+    try:
+        n = args.rows
+        compare("drivers", List[schemas.DriverResponse], orm_drivers(db, company_id, n),
+                crud.list_company_drivers(db, company_id, limit=n)[0], args.repeat)
+        compare("ratings", List[schemas.DriverRatingResponse], orm_ratings(db, company_id, driver_id, n),
+                crud.list_driver_ratings(db, driver_id, company_id, limit=n)[0], args.repeat)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
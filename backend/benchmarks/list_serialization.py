@@ -0,0 +1,123 @@
+# backend/benchmarks/list_serialization.py
+"""
+Rows/sec for list endpoints: ORM entities validated from attributes (the old
+path) vs. column projections returned as plain row dicts (the current crud
+path). Both are validated against the response_model and dumped to JSON, as
+FastAPI does.
+
+    cd backend
+    python -m benchmarks.list_serialization --rows 20000 --repeat 5
+
+Uses a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+from typing import List
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import crud, models, schemas
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+
+
+def seed(n_rows: int) -> tuple:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        suffix = str(time.time_ns())
+        company = models.Company(name="Bench Co", email=f"bench-{suffix}@example.com", password="x", address="-")
+        db.add(company)
+        db.flush()
+        user = models.User(name="Bench", email=f"bench-staff-{suffix}@example.com", password="x",
+                           department=models.DepartmentEnum.safety, company_id=company.id)
+        db.add(user)
+        db.flush()
+        db.execute(models.Driver.__table__.insert(), [
+            {"name": f"Driver {i}", "dob": date(1980, 1, 1 + i % 28),
+             "license_number": f"L{suffix}-{i}", "created_by_company_id": company.id}
+            for i in range(n_rows)
+        ])
+        driver_id = db.execute(
+            select(models.Driver.id).where(models.Driver.created_by_company_id == company.id).limit(1)
+        ).scalar_one()
+        db.execute(models.DriverRating.__table__.insert(), [
+            {"driver_id": driver_id, "user_id": user.id, "department": "safety", "score": 1 + i % 5,
+             "comment": f"note {i}"}
+            for i in range(n_rows)
+        ])
+        db.commit()
+        return company.id, driver_id
+    finally:
+        db.close()
+
+
+def _serialize(adapter: TypeAdapter, items, from_attributes: bool) -> bytes:
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=from_attributes))
+
+
+def orm_drivers(db, company_id: int, limit: int):
+    stmt = (
+        select(models.Driver)
+        .where(models.Driver.created_by_company_id == company_id)
+        .order_by(models.Driver.name, models.Driver.id)
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def orm_ratings(db, company_id: int, driver_id: int, limit: int):
+    crud.get_company_driver(db, driver_id, company_id)
+    stmt = (
+        select(models.DriverRating)
+        .where(models.DriverRating.driver_id == driver_id)
+        .order_by(models.DriverRating.created_at.desc(), models.DriverRating.id.desc())
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def measure(label: str, fetch, adapter: TypeAdapter, from_attributes: bool, repeat: int) -> None:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            items = fetch(db)
+            _serialize(adapter, items, from_attributes)
+            best = min(best, time.perf_counter() - started)
+            rows = len(items)
+        finally:
+            db.close()
+    print(f"{label:<28} {rows:>7} rows  {best * 1000:8.1f} ms  {rows / best:>10,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    company_id, driver_id = seed(args.rows)
+    drivers = TypeAdapter(List[schemas.DriverResponse])
+    ratings = TypeAdapter(List[schemas.DriverRatingResponse])
+    n = args.rows
+
+    measure("drivers  orm entities", lambda db: orm_drivers(db, company_id, n), drivers, True, args.repeat)
+    measure("drivers  projection", lambda db: crud.list_company_drivers(db, company_id, limit=n)[0],
+            drivers, False, args.repeat)
+    measure("ratings  orm entities", lambda db: orm_ratings(db, company_id, driver_id, n), ratings, True, args.repeat)
+    measure("ratings  projection", lambda db: crud.list_driver_ratings(db, driver_id, company_id, limit=n)[0],
+            ratings, False, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
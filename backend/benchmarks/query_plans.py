@@ -0,0 +1,210 @@
+# backend/benchmarks/query_plans.py
+"""
+Query-plan check: EXPLAIN every statement the read routes run and fail on
+sequential scans.
+
+Seeds --companies tenants with --drivers drivers and a few ratings each,
+ANALYZEs, then calls the same crud/auth/export code the routes use while
+capturing the SQL it emits. Each captured statement is EXPLAINed with its real
+parameters. SQLite plans fail on `SCAN <table>` (full table or full index
+scan); Postgres plans fail on `Seq Scan` nodes.
+
+    cd backend
+    python -m benchmarks.query_plans
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.query_plans --drivers 5000
+
+Exit status is 1 when any route query scans. Uses a throwaway SQLite file
+unless DATABASE_URL is set.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+
+from fastapi import Request
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event, insert, select, text
+
+from app import analytics, auth, crud, exports, models, principals, rating_stats, search
+from app.core.security import settings
+from app.db import migrate
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import create_access_token
+
+SURNAMES = ["kalo", "mirba", "tovzen", "rishu", "danel", "vogra", "nikos", "tuka", "bamir", "zenri"]
+
+
+def seed(n_companies: int, n_drivers: int) -> dict:
+    migrate.upgrade()
+    suffix = time.time_ns()
+    with engine.begin() as conn:
+        for c in range(n_companies):
+            company_id = conn.execute(insert(models.Company).values(
+                name=f"Plan {c}", email=f"plan-{suffix}-{c}@example.com", password="x", address="-",
+            )).inserted_primary_key[0]
+            user_id = conn.execute(insert(models.User).values(
+                name="Plan Safety", email=f"plan-staff-{suffix}-{c}@example.com", password="x",
+                department=models.DepartmentEnum.safety, company_id=company_id,
+            )).inserted_primary_key[0]
+            conn.execute(insert(models.Driver), [
+                {"name": f"Driver {SURNAMES[i % len(SURNAMES)].title()} {i}", "dob": date(1960 + i % 40, 1 + i % 12, 1 + i % 28),
+                 "license_number": f"P{suffix}-{c}-{i}", "created_by_company_id": company_id}
+                for i in range(n_drivers)
+            ])
+            driver_ids = list(conn.execute(
+                select(models.Driver.id).where(models.Driver.created_by_company_id == company_id)
+            ).scalars())
+            conn.execute(insert(models.DriverRating), [
+                {"driver_id": d, "user_id": user_id, "department": models.DepartmentEnum.safety, "score": 1 + (d + k) % 5}
+                for d in driver_ids[: n_drivers // 4] for k in range(4)
+            ])
+    db = SessionLocal()
+    try:
+        search.rebuild_index(db)
+        rating_stats.rebuild(db)
+    finally:
+        db.close()
+    settle, settings.ANALYTICS_SETTLE_SECONDS = settings.ANALYTICS_SETTLE_SECONDS, 0
+    try:
+        analytics.refresh()
+    finally:
+        settings.ANALYTICS_SETTLE_SECONDS = settle
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return {"company_id": company_id, "user_id": user_id, "driver_ids": driver_ids,
+            "email": f"plan-{suffix}-{n_companies - 1}@example.com", "suffix": suffix}
+
+
+@contextmanager
+def captured():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def cases(t: dict) -> dict:
+    company_id, driver_id = t["company_id"], t["driver_ids"][0]
+    company_token = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": str(company_id)}, secret_key=settings.SECRET_KEY)
+    )
+    staff_token = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": str(t["user_id"])}, secret_key=settings.STAFF_SECRET_KEY)
+    )
+    _, ratings_cursor = crud.list_driver_ratings(SessionLocal(), driver_id, company_id, limit=2)
+    _, drivers_cursor = crud.list_company_drivers(SessionLocal(), company_id, limit=50)
+
+    def consume(stmt):
+        return lambda db: db.execute(stmt.limit(100)).all()
+
+    return {
+        "POST /login": lambda db: db.execute(
+            select(models.Company.id, models.Company.password).where(models.Company.email == t["email"])
+        ).first(),
+        "auth company": lambda db: auth.get_current_company(Request({"type": "http"}), company_token, db),
+        "auth staff": lambda db: auth.get_current_staff_user(Request({"type": "http"}), staff_token, db),
+        "GET /drivers/{id}": lambda db: crud.get_company_driver(db, driver_id, company_id),
+        "GET /drivers/search?name": lambda db: crud.search_drivers(db, company_id, name="mirba"),
+        "GET /drivers/search?dob": lambda db: crud.search_drivers(db, company_id, dob=date(1961, 2, 2)),
+        "GET /drivers/search?license": lambda db: crud.search_drivers(db, company_id, license=f"P{t['suffix']}"),
+        "GET /drivers/search": lambda db: crud.search_drivers(db, company_id),
+        "GET /drivers/{id}/ratings": lambda db: crud.list_driver_ratings(db, driver_id, company_id, limit=2),
+        "GET /drivers/{id}/ratings?cursor": lambda db: crud.list_driver_ratings(
+            db, driver_id, company_id, limit=2, cursor=ratings_cursor
+        ),
+        "GET /drivers/stats": lambda db: crud.get_rating_stats_batch(db, t["driver_ids"][:20], company_id),
+        "GET /drivers/profile": lambda db: crud.get_driver_profiles(db, t["driver_ids"][:20], company_id, ratings_limit=5),
+        "GET /drivers/lookup": lambda db: crud.lookup_reputation(db, [f"P{t['suffix']}-0-{i}" for i in range(20)]),
+        "GET /staff/drivers": lambda db: crud.list_company_drivers(db, company_id, limit=50),
+        "GET /staff/drivers?cursor": lambda db: crud.list_company_drivers(db, company_id, limit=50, cursor=drivers_cursor),
+        "GET /company/staff": lambda db: crud.list_company_staff(db, company_id),
+        "GET /staff/export/drivers": consume(exports.drivers_query(company_id, created_from=datetime(2000, 1, 1))),
+        "GET /staff/export/ratings": consume(exports.ratings_query(company_id)),
+        "GET /analytics/trends": lambda db: analytics.trends(db, company_id),
+        "GET /analytics/trends?by=department": lambda db: analytics.trends(db, company_id, "month", by="department"),
+        "GET /analytics/trends?by=driver": lambda db: analytics.trends(
+            db, company_id, "day", by="driver", driver_ids=t["driver_ids"][:20]
+        ),
+        "GET /analytics/outliers": lambda db: analytics.outliers(db, company_id, department="safety"),
+    }
+
+
+# ----- Plan inspection -----
+def sqlite_scans(conn, statement, parameters) -> list:
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    tables = set(Base.metadata.tables)
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        words = detail.split()
+        if words[:1] == ["SCAN"] and len(words) > 1 and words[1] in tables:
+            scans.append(detail)
+    return [r[-1] for r in rows], scans
+
+
+def postgres_scans(conn, statement, parameters) -> list:
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    lines, scans = [], []
+
+    def walk(node, depth=0):
+        label = f"{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}".strip()
+        lines.append("  " * depth + label)
+        if node["Node Type"] == "Seq Scan":
+            scans.append(label)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"])
+    return lines, scans
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--drivers", type=int, default=2000, help="drivers per company")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not just failures")
+    args = parser.parse_args()
+
+    tenant = seed(args.companies, args.drivers)
+    inspect_plan = postgres_scans if engine.dialect.name == "postgresql" else sqlite_scans
+    failures = 0
+    for name, run in cases(tenant).items():
+        principals.clear()
+        db = SessionLocal()
+        try:
+            with captured() as statements:
+                run(db)
+        finally:
+            db.close()
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan, scans = inspect_plan(conn, statement, parameters)
+                status = "SCAN" if scans else "ok"
+                print(f"{status:<4} {name}")
+                if scans or args.verbose:
+                    print("       " + " ".join(statement.split())[:300])
+                    for line in plan:
+                        print(f"         {line}")
+                failures += bool(scans)
+    print(f"{failures} statement(s) with sequential scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
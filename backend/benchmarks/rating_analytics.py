@@ -0,0 +1,208 @@
+# backend/benchmarks/rating_analytics.py
+"""
+Rating trend analytics: rollup refresh throughput, and trend/outlier reads from
+rating_rollups against the same numbers aggregated from raw driver_ratings.
+
+    full         refresh() over the whole seeded history (ratings/s)
+    incremental  refresh() after --increment new ratings
+    trends       GET /analytics/trends work for one company, --grain buckets
+                 over --days: rollups vs scanning that company's ratings
+    outliers     fleet driver means over the same range: rollups vs a
+                 GROUP BY driver_id over driver_ratings
+
+Every read is checked against the raw aggregation before it is timed.
+
+    cd backend
+    python -m benchmarks.rating_analytics --ratings 10000000 --days 730
+
+Uses a throwaway SQLite file unless DATABASE_URL is set.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.sqlite3"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from app import analytics, models
+from app.core.security import settings
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+
+CHUNK = 100_000
+
+
+def seed(n_companies: int, n_drivers: int, n_ratings: int, days: int) -> list:
+    """Returns one (company_id, user_id, driver_ids) per company; ratings are spread over the last `days` days."""
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(7)
+    suffix = time.time_ns()
+    tenants = []
+    with engine.begin() as conn:
+        for c in range(n_companies):
+            company_id = conn.execute(
+                insert(models.Company).values(name=f"Bench {c}", email=f"bench-{suffix}-{c}@example.com", password="x", address="-")
+            ).inserted_primary_key[0]
+            user_id = conn.execute(
+                insert(models.User).values(
+                    name="Bench Safety", email=f"bench-staff-{suffix}-{c}@example.com", password="x",
+                    department=models.DepartmentEnum.safety, company_id=company_id,
+                )
+            ).inserted_primary_key[0]
+            conn.execute(insert(models.Driver), [
+                {"name": f"Bench Driver {i}", "dob": date(1960 + i % 40, 1 + i % 12, 1 + i % 28),
+                 "license_number": f"RA{suffix}-{c}-{i}", "created_by_company_id": company_id}
+                for i in range(n_drivers)
+            ])
+            driver_ids = list(conn.execute(
+                select(models.Driver.id).where(models.Driver.created_by_company_id == company_id)
+            ).scalars())
+            tenants.append((company_id, user_id, np.array(driver_ids)))
+    add_ratings(tenants, n_ratings, days, rng)
+    return tenants
+
+
+def add_ratings(tenants: list, n: int, days: int, rng) -> None:
+    departments = [d.value for d in models.DepartmentEnum]
+    now = datetime.utcnow() - timedelta(minutes=5)
+    with engine.begin() as conn:
+        for start in range(0, n, CHUNK):
+            size = min(CHUNK, n - start)
+            tenant = rng.integers(len(tenants), size=size)
+            pick = rng.random(size)
+            # Per-driver skew, so driver means spread out and a few stand apart
+            scores = np.clip(np.rint(rng.normal(3.8, 0.9, size)), 1, 5).astype(int)
+            ages = rng.random(size) * days * 86400
+            dept = rng.integers(len(departments), size=size)
+            rows = []
+            for t, p, s, a, d in zip(tenant.tolist(), pick.tolist(), scores.tolist(), ages.tolist(), dept.tolist()):
+                _, user_id, driver_ids = tenants[t]
+                driver = int(driver_ids[int(p * len(driver_ids))])
+                if driver % 97 == 0:
+                    s = 1 + s // 3
+                rows.append({"driver_id": driver, "user_id": user_id, "department": departments[d], "score": s,
+                             "created_at": now - timedelta(seconds=a)})
+            conn.execute(insert(models.DriverRating), rows)
+
+
+def timed(fn, repeat: int) -> tuple:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return result, statistics.median(samples)
+
+
+def raw_trend(company_id: int, grain: str, buckets) -> dict:
+    """The trend counts and means computed from the company's raw ratings in range."""
+    db = SessionLocal()
+    try:
+        r = models.DriverRating
+        since = datetime.combine(analytics._dates(buckets[:1])[0], datetime.min.time())
+        rows = db.execute(
+            select(r.created_at, r.score)
+            .join(models.Driver, models.Driver.id == r.driver_id)
+            .where(models.Driver.created_by_company_id == company_id, r.created_at >= since)
+        ).all()
+    finally:
+        db.close()
+    created, scores = zip(*rows) if rows else ((), ())
+    days = np.array([analytics._naive_utc(c) for c in created], dtype="datetime64[D]").astype(np.int64)
+    position = np.searchsorted(buckets, analytics.bucket_start(grain, days), "right") - 1
+    keep = (position >= 0) & (position < len(buckets))
+    hist = np.zeros((1, len(buckets), 5), dtype=np.int64)
+    np.add.at(hist, (0, position[keep], np.array(scores, dtype=np.int64)[keep] - 1), 1)
+    return analytics._summaries(hist, 4)
+
+
+def raw_outliers(company_id: int, since: date) -> dict:
+    db = SessionLocal()
+    try:
+        r = models.DriverRating
+        rows = db.execute(
+            select(r.driver_id, func.count(), func.sum(r.score))
+            .join(models.Driver, models.Driver.id == r.driver_id)
+            .where(models.Driver.created_by_company_id == company_id,
+                   r.created_at >= datetime.combine(since, datetime.min.time()))
+            .group_by(r.driver_id)
+        ).all()
+    finally:
+        db.close()
+    counts = np.array([row[1] for row in rows])
+    return {"drivers": len(rows), "ratings": int(counts.sum()), "mean": round(sum(row[2] for row in rows) / counts.sum(), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ratings", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--drivers", type=int, default=2000, help="per company")
+    parser.add_argument("--increment", type=int, default=10_000)
+    parser.add_argument("--grain", choices=analytics.GRAINS, default="week")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    settings.ANALYTICS_SETTLE_SECONDS = 0
+
+    t0 = time.perf_counter()
+    tenants = seed(args.companies, args.drivers, args.ratings, args.days)
+    print(f"seeded {args.ratings} ratings for {args.companies * args.drivers} drivers in {time.perf_counter() - t0:.1f}s")
+
+    results = []
+    t0 = time.perf_counter()
+    folded = analytics.refresh()
+    results.append(("full refresh", folded, time.perf_counter() - t0))
+    add_ratings(tenants, args.increment, args.days, np.random.default_rng(8))
+    t0 = time.perf_counter()
+    folded = analytics.refresh()
+    results.append(("incremental", folded, time.perf_counter() - t0))
+    print(f"{'refresh':<13} {'ratings':>10} {'seconds':>9} {'ratings/s':>11}")
+    for label, n, elapsed in results:
+        print(f"{label:<13} {n:>10} {elapsed:>9.2f} {n / elapsed:>11.0f}")
+
+    company_id = tenants[0][0]
+    until = datetime.utcnow().date()
+    since = until - timedelta(days=args.days)
+    buckets = analytics.bucket_range(args.grain, since, until)
+    first_day = analytics._dates(buckets[:1])[0]
+
+    def rollup_trend():
+        db = SessionLocal()
+        try:
+            return analytics.trends(db, company_id, args.grain, since=since, until=until)["series"][0]["points"]
+        finally:
+            db.close()
+
+    def rollup_outliers():
+        db = SessionLocal()
+        try:
+            return analytics.outliers(db, company_id, args.grain, since=since, until=until, min_ratings=1)
+        finally:
+            db.close()
+
+    points, rollup_ms = timed(rollup_trend, args.repeat)
+    raw, raw_ms = timed(lambda: raw_trend(company_id, args.grain, buckets), args.repeat)
+    assert [p["count"] for p in points] == raw["count"][0].tolist(), "trend counts differ from driver_ratings"
+    assert np.allclose([p["mean"] or 0 for p in points], np.nan_to_num(raw["mean"][0]).round(4)), "trend means differ"
+
+    body, outlier_ms = timed(rollup_outliers, args.repeat)
+    fleet, raw_outlier_ms = timed(lambda: raw_outliers(company_id, first_day), args.repeat)
+    assert {k: body["fleet"][k] for k in fleet} == fleet, (body["fleet"], fleet)
+
+    print(f"\n{'read (company ' + str(company_id) + ')':<24} {'rollups ms':>11} {'raw ms':>9} {'speedup':>8}")
+    print(f"{args.grain + ' trends':<24} {rollup_ms:>11.1f} {raw_ms:>9.1f} {raw_ms / rollup_ms:>7.1f}x")
+    print(f"{'outliers':<24} {outlier_ms:>11.1f} {raw_outlier_ms:>9.1f} {raw_outlier_ms / outlier_ms:>7.1f}x")
+    print(f"\n{len(points)} {args.grain} buckets, {body['fleet']['drivers']} drivers, "
+          f"{len(body['outliers'])} flagged at |z| >= 3.5")
+
+
+if __name__ == "__main__":
+    main()
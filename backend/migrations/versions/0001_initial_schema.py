@@ -0,0 +1,166 @@
+"""initial schema
+
+The schema as Base.metadata.create_all built it before migrations existed.
+Databases created that way are stamped at this revision by app.db.migrate.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 08:09:01.932142
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('companies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('address', sa.String(length=200), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_companies'))
+    )
+    with op.batch_alter_table('companies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_companies_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_companies_id'), ['id'], unique=False)
+
+    op.create_table('drivers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('dob', sa.Date(), nullable=False),
+    sa.Column('license_number', sa.String(length=64), nullable=False),
+    sa.Column('created_by_company_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_company_id'], ['companies.id'], name=op.f('fk_drivers_created_by_company_id_companies'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_drivers')),
+    sa.UniqueConstraint('license_number', name='uq_driver_license')
+    )
+    with op.batch_alter_table('drivers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_drivers_created_by_company_id'), ['created_by_company_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_drivers_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_drivers_license_number'), ['license_number'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('must_reset_password', sa.Boolean(), nullable=False),
+    sa.Column('department', sa.Enum('dispatch', 'hr', 'safety', 'accountant', 'fleet_manager', name='department_enum', native_enum=False), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], name=op.f('fk_users_company_id_companies'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_users')),
+    sa.UniqueConstraint('company_id', 'department', name='uq_company_department')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_company_id'), ['company_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('driver_name_ngrams',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('gram', sa.String(length=3), nullable=False),
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], name=op.f('fk_driver_name_ngrams_driver_id_drivers'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'gram', 'driver_id', name=op.f('pk_driver_name_ngrams')),
+    sqlite_with_rowid=False
+    )
+    with op.batch_alter_table('driver_name_ngrams', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_driver_name_ngrams_driver_id'), ['driver_id'], unique=False)
+
+    op.create_table('driver_rating_stats',
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Integer(), nullable=False),
+    sa.Column('dispatch_count', sa.Integer(), nullable=False),
+    sa.Column('dispatch_sum', sa.Integer(), nullable=False),
+    sa.Column('hr_count', sa.Integer(), nullable=False),
+    sa.Column('hr_sum', sa.Integer(), nullable=False),
+    sa.Column('safety_count', sa.Integer(), nullable=False),
+    sa.Column('safety_sum', sa.Integer(), nullable=False),
+    sa.Column('accountant_count', sa.Integer(), nullable=False),
+    sa.Column('accountant_sum', sa.Integer(), nullable=False),
+    sa.Column('fleet_manager_count', sa.Integer(), nullable=False),
+    sa.Column('fleet_manager_sum', sa.Integer(), nullable=False),
+    sa.Column('last_rated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], name=op.f('fk_driver_rating_stats_company_id_companies'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], name=op.f('fk_driver_rating_stats_driver_id_drivers'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('driver_id', name=op.f('pk_driver_rating_stats'))
+    )
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_driver_rating_stats_company_id'), ['company_id'], unique=False)
+
+    op.create_table('driver_ratings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('department', sa.Enum('dispatch', 'hr', 'safety', 'accountant', 'fleet_manager', name='department_enum', native_enum=False), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.String(length=2000), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], name=op.f('fk_driver_ratings_driver_id_drivers'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_driver_ratings_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_driver_ratings'))
+    )
+    with op.batch_alter_table('driver_ratings', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_driver_ratings_driver_id'), ['driver_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_driver_ratings_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_driver_ratings_user_id'), ['user_id'], unique=False)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_drivers_name_trgm ON drivers USING gin (lower(name) gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_drivers_license_prefix ON drivers (license_number text_pattern_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_drivers_license_prefix")
+        op.execute("DROP INDEX IF EXISTS ix_drivers_name_trgm")
+
+    with op.batch_alter_table('driver_ratings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_driver_ratings_user_id'))
+        batch_op.drop_index(batch_op.f('ix_driver_ratings_id'))
+        batch_op.drop_index(batch_op.f('ix_driver_ratings_driver_id'))
+
+    op.drop_table('driver_ratings')
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_driver_rating_stats_company_id'))
+
+    op.drop_table('driver_rating_stats')
+    with op.batch_alter_table('driver_name_ngrams', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_driver_name_ngrams_driver_id'))
+
+    op.drop_table('driver_name_ngrams')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+        batch_op.drop_index(batch_op.f('ix_users_company_id'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('drivers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_drivers_license_number'))
+        batch_op.drop_index(batch_op.f('ix_drivers_id'))
+        batch_op.drop_index(batch_op.f('ix_drivers_created_by_company_id'))
+
+    op.drop_table('drivers')
+    with op.batch_alter_table('companies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_companies_id'))
+        batch_op.drop_index(batch_op.f('ix_companies_email'))
+
+    op.drop_table('companies')
@@ -0,0 +1,50 @@
+"""composite indexes for tenant query shapes
+
+drivers (created_by_company_id, name, id) serves the per-company listing and
+its keyset cursor, (created_by_company_id, dob) the dob filter of search, and
+driver_ratings (driver_id, created_at, id) the newest-first rating history.
+Case-insensitive name matching stays on the pg_trgm GIN index / n-gram table.
+
+On Postgres the indexes are built CONCURRENTLY so live tables are not locked.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:09:17.295695
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('driver_ratings', 'ix_driver_ratings_driver_created', ['driver_id', 'created_at', 'id']),
+    ('drivers', 'ix_drivers_company_dob', ['created_by_company_id', 'dob']),
+    ('drivers', 'ix_drivers_company_name', ['created_by_company_id', 'name', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for table, name, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        return
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name, _ in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
@@ -0,0 +1,56 @@
+"""license_number on driver_rating_stats for cross-company reputation lookups
+
+Licenses are globally unique, so keying the per-driver rating totals by
+license turns /drivers/lookup into one unique-index read. Existing rows are
+backfilled from drivers before the column becomes NOT NULL.
+
+On Postgres the unique index is built CONCURRENTLY so rating writes are not
+blocked while it builds.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 08:27:05.039005
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = 'ix_driver_rating_stats_license_number'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('license_number', sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE driver_rating_stats SET license_number ="
+        " (SELECT license_number FROM drivers WHERE drivers.id = driver_rating_stats.driver_id)"
+    )
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.alter_column('license_number', existing_type=sa.String(length=64), nullable=False)
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                INDEX, 'driver_rating_stats', ['license_number'], unique=True,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        return
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.create_index(INDEX, ['license_number'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('driver_rating_stats', schema=None) as batch_op:
+        batch_op.drop_index(INDEX)
+        batch_op.drop_column('license_number')
@@ -0,0 +1,62 @@
+"""rating_rollups and analytics_watermarks for rating trend analytics
+
+rating_rollups holds a 1..5 score histogram per (company, grain, bucket,
+driver, department); app.analytics folds driver_ratings into it past the
+watermark kept in analytics_watermarks. The watermark starts at 0, so the
+first refresh after this migration backfills the whole rating history.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 08:52:14.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rating_rollups',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('grain', sa.String(length=8), nullable=False),
+    sa.Column('bucket', sa.Date(), nullable=False),
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.Column('department', sa.Enum('dispatch', 'hr', 'safety', 'accountant', 'fleet_manager', name='department_enum', native_enum=False), nullable=False),
+    sa.Column('score_1', sa.Integer(), nullable=False),
+    sa.Column('score_2', sa.Integer(), nullable=False),
+    sa.Column('score_3', sa.Integer(), nullable=False),
+    sa.Column('score_4', sa.Integer(), nullable=False),
+    sa.Column('score_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], name=op.f('fk_rating_rollups_company_id_companies'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], name=op.f('fk_rating_rollups_driver_id_drivers'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'grain', 'bucket', 'driver_id', 'department', name=op.f('pk_rating_rollups')),
+    sqlite_with_rowid=False
+    )
+    with op.batch_alter_table('rating_rollups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rating_rollups_driver_id'), ['driver_id'], unique=False)
+
+    watermarks = op.create_table('analytics_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('name', name=op.f('pk_analytics_watermarks'))
+    )
+    op.bulk_insert(watermarks, [{'name': 'rating_rollups', 'last_id': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analytics_watermarks')
+    with op.batch_alter_table('rating_rollups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_rating_rollups_driver_id'))
+
+    op.drop_table('rating_rollups')
@@ -0,0 +1,84 @@
+"""name_len in driver_name_ngrams postings; normalized names in the Postgres trigram index
+
+driver_name_ngrams gains name_len in its primary key, between gram and
+driver_id, so a gram's posting comes out in search rank order (shorter names
+first) and a page of full matches can stop early. The table is rebuilt from
+its current rows joined to drivers.
+
+On Postgres, ix_drivers_name_trgm moves from lower(name) to
+driver_search_name(name), an immutable SQL twin of app.search.normalize(), so
+"jose" or "o neil" match "José" and "O'Neil" the same way they do through the
+n-gram table.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 10:12:41.208377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Immutable (unaccent() alone is only stable), so it can back an expression index
+DRIVER_SEARCH_NAME_FUNCTION = (
+    "CREATE OR REPLACE FUNCTION driver_search_name(text) RETURNS text"
+    " LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS"
+    " $$ SELECT btrim(regexp_replace(lower(public.unaccent('public.unaccent'::regdictionary, $1)),"
+    " '[^0-9a-z]+', ' ', 'g')) $$"
+)
+
+
+def _rebuild_ngrams(with_name_len: bool) -> None:
+    op.execute(
+        "CREATE TABLE driver_name_ngrams_rebuild AS"
+        " SELECT g.company_id, g.gram, length(d.name) AS name_len, g.driver_id"
+        " FROM driver_name_ngrams g JOIN drivers d ON d.id = g.driver_id"
+    )
+    with op.batch_alter_table('driver_name_ngrams', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_driver_name_ngrams_driver_id'))
+    op.drop_table('driver_name_ngrams')
+
+    key = ['company_id', 'gram', 'name_len', 'driver_id'] if with_name_len else ['company_id', 'gram', 'driver_id']
+    op.create_table('driver_name_ngrams',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('gram', sa.String(length=3), nullable=False),
+    *([sa.Column('name_len', sa.Integer(), nullable=False)] if with_name_len else []),
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], name=op.f('fk_driver_name_ngrams_driver_id_drivers'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint(*key, name=op.f('pk_driver_name_ngrams')),
+    sqlite_with_rowid=False
+    )
+    columns = ", ".join(key)
+    op.execute(f"INSERT INTO driver_name_ngrams ({columns}) SELECT {columns} FROM driver_name_ngrams_rebuild")
+    op.execute("DROP TABLE driver_name_ngrams_rebuild")
+    with op.batch_alter_table('driver_name_ngrams', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_driver_name_ngrams_driver_id'), ['driver_id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild_ngrams(with_name_len=True)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute(DRIVER_SEARCH_NAME_FUNCTION)
+        op.execute("DROP INDEX IF EXISTS ix_drivers_name_trgm")
+        op.execute("CREATE INDEX ix_drivers_name_trgm ON drivers USING gin (driver_search_name(name) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_drivers_name_trgm")
+        op.execute("CREATE INDEX ix_drivers_name_trgm ON drivers USING gin (lower(name) gin_trgm_ops)")
+        op.execute("DROP FUNCTION IF EXISTS driver_search_name(text)")
+
+    _rebuild_ngrams(with_name_len=False)
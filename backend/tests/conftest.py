@@ -0,0 +1,48 @@
+import os
+import tempfile
+import uuid
+
+# Point the app at a throwaway SQLite file before app.* reads settings
+_db_dir = tempfile.mkdtemp(prefix="driver-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.sqlite3")
+# Tests log in and hammer endpoints far past production budgets; test_rate_limit turns it on
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Handle outbox events right after each commit, so derived data is in place when a request returns
+os.environ.setdefault("OUTBOX_WORKER", "inline")
+# /ops/* answers only to this token (see the ops_headers fixture)
+os.environ.setdefault("OPS_TOKEN", "test-ops-token")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models  # noqa: F401  registers the tables on Base.metadata
+from app.db import migrate
+from app.db.session import engine
+from app.main import app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def create_schema():
+    migrate.upgrade()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def ops_headers():
+    return {"Authorization": f"Bearer {os.environ['OPS_TOKEN']}"}
+
+
+@pytest.fixture(scope="session")
+def company_headers():
+    """Registers a new company per call and returns its CEO's Authorization header."""
+    client = TestClient(app)
+
+    def register(name: str = "Test Co") -> dict:
+        email = f"ceo_{uuid.uuid4().hex[:8]}@example.com"
+        company = {"name": name, "email": email, "password": "ceopass123", "address": "1 Test St"}
+        assert client.post("/register", json=company).status_code == 200
+        token = client.post("/login", data={"username": email, "password": "ceopass123"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return register
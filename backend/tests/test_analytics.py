@@ -0,0 +1,151 @@
+import random
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import analytics, models
+from app.core.security import settings
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+MONDAY = date(2026, 1, 5)
+
+
+def _rate(driver_id: int, user_id: int, department: str, score: int, day: date) -> None:
+    db = SessionLocal()
+    try:
+        db.add(models.DriverRating(
+            driver_id=driver_id, user_id=user_id, department=department, score=score,
+            created_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=12),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def fleet(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Trend Co")
+    staff, user_ids = {}, {}
+    for dept in ("safety", "fleet_manager"):
+        staff_email = f"{dept}_{suffix}@trends.com"
+        client.post("/invite-user", json={"name": f"{dept} one", "email": staff_email, "department": dept}, headers=ceo)
+        token = client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]
+        staff[dept] = {"Authorization": f"Bearer {token}"}
+        db = SessionLocal()
+        try:
+            user_ids[dept] = db.query(models.User.id).filter(models.User.email == staff_email).scalar()
+        finally:
+            db.close()
+    ids = [
+        client.post("/drivers", json={"name": f"Trend Driver {i}", "dob": "1981-02-02", "license_number": f"TR{suffix}{i}"}, headers=ceo).json()["id"]
+        for i in range(10)
+    ]
+    # Week 1: driver 0 gets 5, 3 (safety) and 1 (fleet); week 3: driver 1 gets 4. Week 2 stays empty.
+    for driver, dept, score, day in (
+        (ids[0], "safety", 5, MONDAY), (ids[0], "safety", 3, MONDAY + timedelta(days=2)),
+        (ids[0], "fleet_manager", 1, MONDAY + timedelta(days=6)), (ids[1], "safety", 4, MONDAY + timedelta(days=14)),
+    ):
+        _rate(driver, user_ids[dept], dept, score, day)
+    # A month later: seven drivers averaging 4.3-4.7, one consistently rated 1
+    later = MONDAY + timedelta(days=35)
+    for i, driver in enumerate(ids[2:]):
+        for k in range(6):
+            score = 1 if i == 0 else 4 if k < 2 + i % 3 else 5
+            _rate(driver, user_ids["safety"], "safety", score, later + timedelta(days=k))
+    return {"ceo": ceo, "staff": staff["fleet_manager"], "ids": ids, "user_ids": user_ids}
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_SETTLE_SECONDS", 0)
+    analytics.refresh()
+
+
+def _trends(fleet, **params):
+    params = {"grain": "week", "since": MONDAY.isoformat(), "until": (MONDAY + timedelta(days=20)).isoformat(), **params}
+    response = client.get("/analytics/trends", params=params, headers=fleet["staff"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_weekly_company_trend(fleet, settled):
+    body = _trends(fleet, window=2)
+    (series,) = body["series"]
+    points = series["points"]
+    assert [p["bucket"] for p in points] == ["2026-01-05", "2026-01-12", "2026-01-19"]
+    assert [p["count"] for p in points] == [3, 0, 1]
+    assert points[0]["mean"] == 3.0 and (points[0]["p10"], points[0]["p50"], points[0]["p90"]) == (1, 3, 5)
+    assert points[1]["mean"] is None and points[1]["p50"] is None
+    assert [p["moving_mean"] for p in points] == [3.0, 3.0, 4.0]  # 2-week window skips the empty week's share
+    assert body["refreshed_at"] is not None
+
+
+def test_department_and_driver_series(fleet, settled):
+    body = _trends(fleet, by="department", grain="month", since="2026-01-01", until="2026-01-31")
+    by_dept = {s["department"]: s["points"][0] for s in body["series"]}
+    assert set(by_dept) == {d.value for d in models.DepartmentEnum}
+    assert (by_dept["safety"]["count"], by_dept["safety"]["mean"]) == (3, 4.0)
+    assert (by_dept["fleet_manager"]["count"], by_dept["fleet_manager"]["mean"]) == (1, 1.0)
+
+    ids = fleet["ids"]
+    body = _trends(fleet, by="driver", driver_id=[ids[1], 999999, ids[0]], department="safety")
+    assert [s["driver_id"] for s in body["series"]] == [ids[1], ids[0]]  # foreign ids are left out
+    assert [p["count"] for p in body["series"][1]["points"]] == [2, 0, 0]
+
+    assert client.get("/analytics/trends", params={"by": "driver"}, headers=fleet["staff"]).status_code == 422
+    assert client.get("/analytics/trends", params={"grain": "day", "since": "2000-01-01"}, headers=fleet["staff"]).status_code == 422
+    assert client.get("/analytics/trends", headers=fleet["ceo"]).status_code in (401, 403)
+
+
+def test_refresh_is_incremental_and_matches_a_rebuild(fleet, monkeypatch, settled):
+    assert analytics.refresh() == 0
+    ids, user_ids = fleet["ids"], fleet["user_ids"]
+    _rate(ids[1], user_ids["safety"], "safety", 2, MONDAY + timedelta(days=15))
+    # Too fresh to fold while the settle window is on
+    monkeypatch.setattr(settings, "ANALYTICS_SETTLE_SECONDS", 60)
+    client.post("/ratings", json={"driver_id": ids[1], "score": 5}, headers=fleet["staff"])
+    assert analytics.refresh() == 1
+    monkeypatch.setattr(settings, "ANALYTICS_SETTLE_SECONDS", 0)
+    assert analytics.refresh() == 1
+
+    before = _trends(fleet)["series"]
+    assert [p["count"] for p in before[0]["points"]] == [3, 0, 2]
+    analytics.rebuild()
+    assert _trends(fleet)["series"] == before
+
+
+def test_outliers_flag_the_low_driver(fleet, settled):
+    params = {"grain": "week", "since": "2026-02-09", "until": "2026-02-22", "min_ratings": 3}
+    body = client.get("/analytics/outliers", params=params, headers=fleet["staff"]).json()
+    assert body["fleet"]["drivers"] == 8 and body["fleet"]["ratings"] == 48
+    (low,) = body["outliers"]
+    assert low["driver_id"] == fleet["ids"][2] and low["mean"] == 1.0
+    assert low["z"] < -3.5 and low["percentile"] == 6.25
+    assert client.get("/analytics/outliers", params={**params, "z": 100}, headers=fleet["staff"]).json()["outliers"] == []
+
+
+def test_histograms_match_naive_counts():
+    rnd = random.Random(3)
+    rows = [(rnd.randint(1, 3), rnd.randint(1, 40), rnd.randrange(5), rnd.randint(20000, 20100), rnd.randint(1, 5)) for _ in range(5000)]
+    drivers_company = {}
+    rows = [(drivers_company.setdefault(d, c), d, dep, day, s) for c, d, dep, day, s in rows]
+    arrays = [np.array(col, dtype=np.int64) for col in zip(*rows)]
+    for grain in analytics.GRAINS:
+        buckets = analytics.bucket_start(grain, arrays[3])
+        expected = Counter((d, dep, int(b), s) for (_, d, dep, _, s), b in zip(rows, buckets))
+        got = Counter()
+        for row in analytics._histograms(grain, *arrays):
+            day = (row["bucket"] - date(1970, 1, 1)).days
+            for k in range(1, 6):
+                if row[f"score_{k}"]:
+                    got[(row["driver_id"], analytics.DEPARTMENTS.index(row["department"]), day, k)] += row[f"score_{k}"]
+            assert row["company_id"] == drivers_company[row["driver_id"]]
+        assert got == expected
@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app as sync_app
+from app.routes import drivers_async
+
+sync_client = TestClient(sync_app)
+
+async_app = FastAPI()
+async_app.include_router(drivers_async.router)
+
+
+@pytest.fixture(scope="module")
+def tokens(company_headers):
+    ceo = company_headers("Async Freight")
+    staff = {"name": "Safety One", "email": f"safety_{uuid.uuid4().hex[:6]}@async.com", "department": "safety"}
+    assert sync_client.post("/invite-user", json=staff, headers=ceo).status_code == 200
+    staff_token = sync_client.post("/staff-login", data={"username": staff["email"], "password": "changeme123"}).json()["access_token"]
+    return {"ceo": ceo["Authorization"], "staff": f"Bearer {staff_token}"}
+
+
+def test_async_driver_and_rating_flow(tokens):
+    license_number = f"ASYNC-{uuid.uuid4().hex[:8]}"
+    with TestClient(async_app) as client:
+        created = client.post(
+            "/drivers",
+            json={"name": "Ada Async", "dob": "1990-01-01", "license_number": license_number},
+            headers={"Authorization": tokens["ceo"]},
+        )
+        assert created.status_code == 200
+        driver_id = created.json()["id"]
+
+        found = client.get("/drivers/search", params={"name": "async"}, headers={"Authorization": tokens["ceo"]})
+        assert [d["id"] for d in found.json()] == [driver_id]
+
+        rated = client.post("/ratings", json={"driver_id": driver_id, "score": 4}, headers={"Authorization": tokens["staff"]})
+        assert rated.status_code == 200
+        assert rated.json()["department"] == "safety"
+
+        ratings = client.get(f"/drivers/{driver_id}/ratings", headers={"Authorization": tokens["ceo"]})
+        assert [r["score"] for r in ratings.json()] == [4]
+
+        profiles = client.get("/drivers/profile", params={"ids": [driver_id]}, headers={"Authorization": tokens["ceo"]})
+        assert [(p["id"], p["stats"]["count"], [r["score"] for r in p["ratings"]]) for p in profiles.json()] == [(driver_id, 1, [4])]
+
+        assert client.get("/drivers/999999", headers={"Authorization": tokens["ceo"]}).status_code == 404
+
+
+def test_async_import_inserts_and_reports(tokens):
+    p = uuid.uuid4().hex[:6]
+    body = "\n".join([
+        "name,dob,license_number",
+        f"Imp Async,1980-01-01,AI{p}-1",
+        f"Imp Again,1981-02-02,AI{p}-1",
+        f"Imp Other,1982-03-03,AI{p}-2",
+    ])
+    with TestClient(async_app) as client:
+        headers = {"Authorization": tokens["ceo"], "Content-Type": "text/csv"}
+        report = client.post("/drivers/import", content=body, headers=headers).json()
+        assert (report["inserted"], [e["line"] for e in report["errors"]]) == (2, [3])
+        found = client.get("/drivers/search", params={"license": f"AI{p}"}, headers={"Authorization": tokens["ceo"]})
+        assert {d["name"] for d in found.json()} == {"Imp Async", "Imp Other"}
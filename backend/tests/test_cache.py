@@ -0,0 +1,31 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recent
+    cache.set("c", 3)           # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("k", "v")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+
+def test_delete_where_drops_matching_keys():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(("company", 1, "x"), "p1")
+    cache.set(("company", 1, "y"), "p2")
+    cache.set(("company", 2, "x"), "p3")
+    assert cache.delete_where(lambda k: k[1] == 1) == 2
+    assert cache.get(("company", 2, "x")) == "p3"
@@ -0,0 +1,76 @@
+import csv
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def ceo(company_headers):
+    return company_headers("Bulk Co")
+
+
+def test_csv_import_reports_bad_and_duplicate_rows(ceo):
+    p = uuid.uuid4().hex[:6]
+    client.post("/drivers", json={"name": "Already There", "dob": "1970-01-01", "license_number": f"{p}-0"}, headers=ceo)
+    body = "\n".join([
+        "name,dob,license_number",
+        f"Bulk One,1980-01-01,{p}-1",
+        f"Bulk Two,not-a-date,{p}-2",
+        f"Bulk Three,1982-03-03,{p}-1",
+        f"Bulk Four,1983-04-04,{p}-0",
+        f"\"Five, Bulk\",1984-05-05,{p}-5",
+    ])
+    response = client.post("/drivers/import", content=body, headers={**ceo, "Content-Type": "text/csv"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 2
+    assert {(e["line"], e["error"].split(":")[0]) for e in report["errors"]} == {
+        (3, "dob"), (4, "Duplicate license_number in file"), (5, "Driver already exists"),
+    }
+    names = {d["name"] for d in client.get("/drivers/search", params={"license": p}, headers=ceo).json()}
+    assert names == {"Already There", "Bulk One", "Five, Bulk"}
+    assert client.get("/drivers/search", params={"name": "bulk one"}, headers=ceo).json()[0]["name"] == "Bulk One"
+
+
+def test_csv_quoted_field_may_span_lines(ceo):
+    p = uuid.uuid4().hex[:6]
+    body = f'name,dob,license_number\n"Ann\nLee",1980-01-01,{p}-1\nBob Stone,not-a-date,{p}-2\n'
+    # Small chunks so the quoted newline arrives in a different chunk than its closing quote
+    chunks = [body[i:i + 5].encode() for i in range(0, len(body), 5)]
+    response = client.post("/drivers/import", content=iter(chunks), headers={**ceo, "Content-Type": "text/csv"})
+    report = response.json()
+    assert report["inserted"] == 1
+    assert [(e["line"], e["error"].split(":")[0]) for e in report["errors"]] == [(4, "dob")]
+    assert [d["name"] for d in client.get("/drivers/search", params={"license": p}, headers=ceo).json()] == ["Ann\nLee"]
+
+
+def test_csv_error_stops_the_import_with_a_report(ceo):
+    p = uuid.uuid4().hex[:6]
+    too_long = "x" * (csv.field_size_limit() + 1)
+    body = f"name,dob,license_number\nKept Row,1980-01-01,{p}-1\n{too_long},1980-01-01,{p}-2\nLost Row,1980-01-01,{p}-3\n"
+    response = client.post("/drivers/import", content=body, headers={**ceo, "Content-Type": "text/csv"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 1
+    (error,) = report["errors"]
+    assert error["line"] == 3 and error["error"].startswith("Invalid CSV, stopped reading here: field larger than field limit")
+
+
+def test_ndjson_import(ceo):
+    p = uuid.uuid4().hex[:6]
+    lines = [json.dumps({"name": f"Nd Driver {i}", "dob": "1990-01-01", "license_number": f"{p}-{i}"}) for i in range(5)]
+    lines.append("{not json")
+    response = client.post("/drivers/import", content="\n".join(lines), headers={**ceo, "Content-Type": "application/x-ndjson"})
+    assert response.json()["inserted"] == 5
+    assert response.json()["errors"][0]["line"] == 6
+
+
+def test_import_rejects_unknown_media_type(ceo):
+    response = client.post("/drivers/import", content="x", headers={**ceo, "Content-Type": "application/xml"})
+    assert response.status_code == 415
@@ -0,0 +1,66 @@
+import re
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def _queries(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Profile Co")
+    staff_email = f"safety_{suffix}@profile.com"
+    client.post("/invite-user", json={"name": "Safety One", "email": staff_email, "department": "safety"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+    ids = [
+        client.post("/drivers", json={"name": f"Profile Driver {i}", "dob": "1983-05-05", "license_number": f"PR{suffix}{i}"}, headers=ceo).json()["id"]
+        for i in range(3)
+    ]
+    for driver_id, scores in ((ids[0], (5, 4, 3)), (ids[1], (2,))):
+        for score in scores:
+            assert client.post("/ratings", json={"driver_id": driver_id, "score": score}, headers=staff).status_code == 200
+    return ceo, ids
+
+
+def test_profiles_combine_driver_ratings_and_stats(tenant):
+    ceo, ids = tenant
+    response = client.get("/drivers/profile", params={"ids": [ids[1], ids[0], 999999, ids[1], ids[2]], "ratings_limit": 2}, headers=ceo)
+    assert response.status_code == 200
+    profiles = response.json()
+    # Request order, deduplicated; ids the company does not own are left out
+    assert [p["id"] for p in profiles] == [ids[1], ids[0], ids[2]]
+    second, first, unrated = profiles
+    assert first["name"] == "Profile Driver 0" and first["license_number"].startswith("PR")
+    assert [r["score"] for r in first["ratings"]] == [3, 4]  # newest first
+    assert (first["stats"]["count"], first["stats"]["sum"], first["stats"]["mean"]) == (3, 12, 4.0)
+    assert second["ratings_next_cursor"] is None and [r["score"] for r in second["ratings"]] == [2]
+    assert unrated["ratings"] == [] and unrated["stats"]["count"] == 0
+
+    # The cursor continues in the regular ratings listing
+    rest = client.get(f"/drivers/{ids[0]}/ratings", params={"cursor": first["ratings_next_cursor"]}, headers=ceo).json()
+    assert [r["score"] for r in rest] == [5]
+
+
+def test_query_count_does_not_grow_with_ids(tenant):
+    ceo, ids = tenant
+    one = client.get("/drivers/profile", params={"ids": [ids[0]], "ratings_limit": 3}, headers=ceo)
+    three = client.get("/drivers/profile", params={"ids": ids, "ratings_limit": 3}, headers=ceo)
+    assert one.status_code == three.status_code == 200
+    assert _queries(one) == _queries(three)
+
+
+def test_profile_limits(tenant):
+    ceo, ids = tenant
+    too_many = list(range(1, settings.PROFILE_BATCH_MAX + 2))
+    assert client.get("/drivers/profile", params={"ids": too_many}, headers=ceo).status_code == 422
+    assert client.get("/drivers/profile", params={"ids": ids, "ratings_limit": 0}, headers=ceo).status_code == 422
+    assert client.get("/drivers/profile", params={"ids": ids}).status_code in (401, 403)
@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 from app import database, models, utils
+from app.core.security import settings
 
 client = TestClient(app)
 
@@ -66,3 +67,27 @@ def test_staff_login():
     })
     assert response.status_code == 200
     assert "access_token" in response.json()
+
+# Repeat auth is served from the principal cache
+def test_company_principal_is_cached(ops_headers):
+    before = client.get("/ops/principal-cache", headers=ops_headers).json()["hits"]
+    for _ in range(2):
+        response = client.get("/company/me", headers={"Authorization": f"Bearer {ceo_token}"})
+        assert response.status_code == 200
+    assert client.get("/ops/principal-cache", headers=ops_headers).json()["hits"] >= before + 1
+
+# /ops/* needs the ops token, and is off without one
+def test_ops_requires_token(monkeypatch, ops_headers):
+    assert client.get("/ops/db-pool").status_code == 401
+    assert client.get("/ops/db-pool", headers={"Authorization": f"Bearer {ceo_token}"}).status_code == 401
+    monkeypatch.setattr(settings, "OPS_TOKEN", "")
+    assert client.get("/ops/db-pool", headers=ops_headers).status_code == 404
+
+# Single shared pool is instrumented
+def test_db_pool_stats(ops_headers):
+    response = client.get("/ops/db-pool", headers=ops_headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["checkouts"] > 0
+    assert {"checked_out", "overflow", "wait_max_s"} <= stats.keys()
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Export Co")
+    staff_email = f"accountant_{suffix}@export.com"
+    client.post("/invite-user", json={"name": "Accountant One", "email": staff_email, "department": "accountant"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+    ids = []
+    for i in range(5):
+        ids.append(client.post("/drivers", json={"name": f"Export Driver {i}", "dob": "1970-07-07", "license_number": f"EX{suffix}{i}"}, headers=ceo).json()["id"])
+    for score in (2, 4, 5):
+        client.post("/ratings", json={"driver_id": ids[0], "score": score, "comment": "fine, thanks"}, headers=staff)
+    return staff, ids
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+
+def test_ndjson_drivers(tenant):
+    staff, ids = tenant
+    response = client.get("/staff/export/drivers", headers=staff)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in rows] == ids
+    assert set(rows[0]) == {"id", "name", "dob", "license_number", "created_at"}
+    assert rows[0]["dob"] == "1970-07-07"
+
+
+def test_csv_ratings_gzip(tenant):
+    staff, ids = tenant
+    response = client.get("/staff/export/ratings", params={"format": "csv", "gzip": True}, headers=staff)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(r["score"]) for r in rows] == [2, 4, 5]
+    assert {r["department"] for r in rows} == {"accountant"}
+    assert rows[0]["comment"] == "fine, thanks" and int(rows[0]["driver_id"]) == ids[0]
+
+    with client.stream("GET", "/staff/export/ratings", params={"format": "csv", "gzip": True}, headers=staff) as raw:
+        assert gzip.decompress(b"".join(raw.iter_raw())).decode() == response.text
+
+
+def test_created_at_range(tenant):
+    staff, _ = tenant
+    future = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    past = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    assert client.get("/staff/export/drivers", params={"created_from": future}, headers=staff).text == ""
+    assert len(client.get("/staff/export/drivers", params={"created_from": past}, headers=staff).text.splitlines()) == 5
+    empty_csv = client.get("/staff/export/ratings", params={"format": "csv", "created_to": past}, headers=staff)
+    assert empty_csv.text.strip() == "id,driver_id,license_number,user_id,department,score,comment,created_at"
+    assert client.get("/staff/export/drivers", params={"created_from": future, "created_to": past}, headers=staff).status_code == 400
+    assert client.get("/staff/export/drivers", params={"format": "xml"}, headers=staff).status_code == 422
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import hashing
+from app.core.security import settings
+
+
+def test_hash_and_verify_roundtrip():
+    async def roundtrip():
+        hashed = await hashing.hash_password_async("s3cret-pass")
+        return (
+            await hashing.verify_password_async("s3cret-pass", hashed),
+            await hashing.verify_password_async("wrong-pass", hashed),
+        )
+
+    ok, bad = asyncio.run(roundtrip())
+    assert ok is True
+    assert bad is False
+    stats = hashing.stats()
+    assert stats["completed"] >= 3
+    assert stats["in_flight"] == 0
+    assert stats["hash_time_max_s"] > 0
+
+
+def test_full_queue_sheds_with_503(monkeypatch):
+    monkeypatch.setattr(settings, "HASH_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "HASH_QUEUE_DEPTH", 0)
+    hashing.shutdown()
+
+    async def burst():
+        return await asyncio.gather(
+            hashing.hash_password_async("a-password"),
+            hashing.hash_password_async("b-password"),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(burst())
+    finally:
+        hashing.shutdown()
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].status_code == 503
+    assert errors[0].headers["Retry-After"] == str(settings.HASH_RETRY_AFTER_SECONDS)
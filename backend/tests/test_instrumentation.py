@@ -0,0 +1,69 @@
+import logging
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def _timings(response):
+    return {part.split(";")[0].strip(): part for part in response.headers["server-timing"].split(",")}
+
+
+def test_server_timing_header():
+    # Registers by hand: the login response itself is under test
+    suffix = uuid.uuid4().hex[:6]
+    email = f"ceo_{suffix}@metrics.com"
+    client.post("/register", json={"name": "Metrics Co", "email": email, "password": "ceopass123", "address": "5 Histogram Rd"})
+    login = client.post("/login", data={"username": email, "password": "ceopass123"})
+    ceo = {"Authorization": "Bearer " + login.json()["access_token"]}
+    assert {"app", "db", "hash"} <= set(_timings(login))
+    created = client.post("/drivers", json={"name": "Timed Driver", "dob": "1980-01-01", "license_number": f"TM{suffix}"}, headers=ceo)
+    timings = _timings(created)
+    assert "jwt" in timings
+    assert 'desc="' in timings["db"] and not timings["db"].endswith('desc="0 queries"')
+
+
+def test_metrics_exposition_per_route(company_headers):
+    client.get("/healthz")
+    ceo = company_headers("Metrics Co")
+    client.get("/drivers/999999", headers=ceo)
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/drivers/{driver_id}",status="404"}' in body
+    assert 'http_request_queries_bucket{method="GET",route="/healthz",le="0.0"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/healthz"}' in body
+    assert "/metrics" not in body  # the scrape itself is not measured
+
+
+def test_query_budget_warning(monkeypatch, caplog, company_headers):
+    ceo = company_headers("Metrics Co")
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 0)
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+        client.get("/company/staff", headers=ceo)
+    assert any("budget 0" in record.getMessage() for record in caplog.records)
+    assert 'http_request_query_budget_exceeded_total{method="GET",route="/company/staff"}' in client.get("/metrics").text
+
+
+def test_failed_statement_is_timed_and_leaves_nothing_on_the_connection():
+    from sqlalchemy import text
+
+    from app.core import instrumentation
+    from app.db.session import engine
+
+    stats = instrumentation.RequestStats()
+    token = instrumentation._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM no_such_table"))
+            conn.rollback()
+            conn.execute(text("SELECT 1"))
+            assert not any("query" in str(key) for key in conn.info)
+    finally:
+        instrumentation._current.reset(token)
+    assert stats.queries == 2 and stats.db_s > 0
+    assert stats.statements["SELECT * FROM no_such_table"] == 1
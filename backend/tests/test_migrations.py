@@ -0,0 +1,42 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+
+from app.db import migrate
+from app.db.base import Base
+from app.db.session import engine
+
+
+def _index_names(table):
+    with engine.connect() as conn:
+        return {ix["name"] for ix in inspect(conn).get_indexes(table)}
+
+
+def test_migrations_match_models():
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+
+
+def test_composite_index_revision_round_trips():
+    cfg = migrate.alembic_config()
+    command.downgrade(cfg, "0001")
+    try:
+        assert "ix_drivers_company_name" not in _index_names("drivers")
+    finally:
+        migrate.upgrade()
+    assert {"ix_drivers_company_name", "ix_drivers_company_dob"} <= _index_names("drivers")
+    assert "ix_driver_ratings_driver_created" in _index_names("driver_ratings")
+
+
+def test_search_posting_revision_keeps_the_grams():
+    with engine.connect() as conn:
+        before = conn.execute(text("SELECT count(*) FROM driver_name_ngrams")).scalar()
+    command.downgrade(migrate.alembic_config(), "0005")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM driver_name_ngrams")).scalar() == before
+    finally:
+        migrate.upgrade()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM driver_name_ngrams WHERE name_len > 0")).scalar() == before
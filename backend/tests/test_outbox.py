@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app import models, outbox
+from app.core import instrumentation
+from app.core.security import settings
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Enqueue test events without the inline drain, and clean them up afterwards."""
+    monkeypatch.setattr(settings, "OUTBOX_WORKER", "off")
+    monkeypatch.setattr(settings, "OUTBOX_BACKOFF_SECONDS", 0)
+    calls = []
+    topic = f"test.{uuid.uuid4().hex[:6]}"
+
+    def enqueue(**payload):
+        db = SessionLocal()
+        try:
+            outbox.enqueue(db, topic, **payload)
+            db.commit()
+        finally:
+            db.close()
+
+    yield topic, enqueue, calls
+    db = SessionLocal()
+    try:
+        for e in db.execute(select(models.OutboxEvent).where(models.OutboxEvent.topic == topic)).scalars():
+            db.delete(e)
+        db.commit()
+        outbox._handlers.pop(topic, None)
+    finally:
+        db.close()
+
+
+def _pending(topic):
+    db = SessionLocal()
+    try:
+        return list(db.execute(select(models.OutboxEvent).where(models.OutboxEvent.topic == topic)).scalars())
+    finally:
+        db.close()
+
+
+def test_writes_enqueue_in_their_transaction_and_are_handled(monkeypatch, ops_headers, company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Outbox Co")
+    created = client.post("/drivers", json={"name": "Ottilie Boxer", "dob": "1980-01-01", "license_number": f"OB{suffix}"}, headers=ceo)
+    assert created.status_code == 200
+    # The failed duplicate rolls back its event together with the driver
+    assert client.post("/drivers", json={"name": "Dup", "dob": "1980-01-01", "license_number": f"OB{suffix}"}, headers=ceo).status_code == 400
+
+    found = client.get("/drivers/search", params={"name": "ottilie"}, headers=ceo).json()
+    assert [d["id"] for d in found] == [created.json()["id"]]
+    assert client.get("/ops/outbox", headers=ops_headers).json()["due"] == 0
+    assert 'outbox_event_lag_seconds_count{topic="driver.created"}' in instrumentation.render()
+
+
+def test_failures_back_off_then_dead_letter(monkeypatch, queued):
+    topic, enqueue, calls = queued
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+
+    @outbox.handler(topic)
+    def flaky(db, payload):
+        calls.append(payload["n"])
+        if payload["n"] == 1 and calls.count(1) <= 2:  # fails in the batch and on its own
+            raise RuntimeError("downstream unavailable")
+        if payload["n"] == 2:
+            raise RuntimeError("always broken")
+
+    enqueue(n=0)
+    enqueue(n=1)
+    enqueue(n=2)
+    outbox.drain()  # batch fails -> one by one: 0 handled, 1 and 2 rescheduled
+    assert sorted((e.payload["n"], e.attempts) for e in _pending(topic)) == [(1, 1), (2, 1)]
+    outbox.drain()  # 1 succeeds on retry, 2 runs out of attempts
+    (dead,) = _pending(topic)
+    assert (dead.payload["n"], dead.attempts, dead.available_at) == (2, 2, None)
+    assert dead.last_error == "RuntimeError: always broken"
+    assert outbox.drain() == 0  # parked events are not picked up again
+    assert calls.count(0) == 2  # replayed once when the batch was isolated: handlers must be idempotent
+
+
+def test_inprocess_worker_wakes_on_commit(monkeypatch, queued):
+    topic, enqueue, calls = queued
+    outbox.handler(topic)(lambda db, payload: calls.append(payload["n"]))
+    monkeypatch.setattr(settings, "OUTBOX_POLL_SECONDS", 30)
+
+    async def run():
+        monkeypatch.setattr(settings, "OUTBOX_WORKER", "inprocess")
+        outbox.start_worker()
+        try:
+            await asyncio.sleep(0.05)  # first (empty) drain, then it waits for a wake-up
+            await asyncio.to_thread(enqueue, n=7)
+            for _ in range(100):
+                if calls:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await outbox.stop_worker()
+
+    asyncio.run(run())
+    assert calls == [7]
+    assert _pending(topic) == []
@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import settings
+from app.main import app
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Pages Co")
+    staff_email = f"hr_{suffix}@pages.com"
+    client.post("/invite-user", json={"name": "HR One", "email": staff_email, "department": "hr"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+
+    driver_ids = []
+    for i in range(7):
+        r = client.post("/drivers", json={"name": f"Pager Driver {i}", "dob": "1980-02-02", "license_number": f"PG{suffix}{i}"}, headers=ceo)
+        driver_ids.append(r.json()["id"])
+    for score in (1, 2, 3, 4, 5):
+        client.post("/ratings", json={"driver_id": driver_ids[0], "score": score}, headers=staff)
+    return ceo, staff, driver_ids
+
+
+def walk(path, headers, **params):
+    pages, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(path, params=query, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+
+
+def test_search_pages_are_disjoint_and_complete(tenant):
+    ceo, _, driver_ids = tenant
+    pages = walk("/drivers/search", ceo, limit=3)
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [d["id"] for p in pages for d in p] == driver_ids  # ordered by (name, id)
+
+
+def test_ranked_search_pages(tenant):
+    ceo, _, driver_ids = tenant
+    pages = walk("/drivers/search", ceo, name="pager driver", limit=2)
+    assert sorted(d["id"] for p in pages for d in p) == driver_ids
+
+
+def test_staff_driver_listing_pages(tenant):
+    _, staff, driver_ids = tenant
+    pages = walk("/staff/drivers", staff, limit=4)
+    assert [d["id"] for p in pages for d in p] == driver_ids
+
+
+def test_rating_history_pages_newest_first(tenant):
+    ceo, _, driver_ids = tenant
+    pages = walk(f"/drivers/{driver_ids[0]}/ratings", ceo, limit=2)
+    assert [r["score"] for p in pages for r in p] == [5, 4, 3, 2, 1]
+
+
+def test_bad_cursor_and_oversized_page_are_rejected(tenant):
+    ceo, _, _ = tenant
+    assert client.get("/drivers/search", params={"cursor": "not-a-cursor"}, headers=ceo).status_code == 400
+    # Right width, wrong types for (name, id)
+    for values in (["x", {}], [1, 2], ["x", "1"], ["x", True]):
+        assert client.get("/drivers/search", params={"cursor": encode_cursor(values)}, headers=ceo).status_code == 400
+    assert client.get("/drivers/search", params={"cursor": encode_cursor(["x", 1])}, headers=ceo).status_code == 200
+    assert client.get("/drivers/search", params={"limit": settings.PAGE_SIZE_MAX + 1}, headers=ceo).status_code == 422
+
+
+def test_rating_history_ownership_via_join(tenant):
+    ceo, _, driver_ids = tenant
+    assert client.get(f"/drivers/{driver_ids[1]}/ratings", headers=ceo).json() == []
+    assert client.get("/drivers/999999/ratings", headers=ceo).status_code == 404
+    first = client.get(f"/drivers/{driver_ids[0]}/ratings", params={"limit": 1}, headers=ceo).json()[0]
+    assert set(first) == {"id", "driver_id", "user_id", "department", "score", "comment", "created_at"}
+    assert first["department"] == "hr"
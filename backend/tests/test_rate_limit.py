@@ -0,0 +1,151 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import rate_limit
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    backend = rate_limit.MemoryBackend(max_keys=100)
+    monkeypatch.setattr(rate_limit, "_backend", backend)
+    rate_limit.reset()
+    return backend
+
+
+def _tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Limit Co")
+    staff_email = f"hr_{suffix}@limits.com"
+    client.post("/invite-user", json={"name": "HR One", "email": staff_email, "department": "hr"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+    return ceo, staff
+
+
+def test_login_is_limited_per_client_ip(monkeypatch, limits):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "3/60")
+    bad = {"username": "nobody@limits.com", "password": "wrong-password"}
+    assert [client.post("/login", data=bad).status_code for _ in range(3)] == [400, 400, 400]
+    blocked = client.post("/login", data=bad)
+    assert blocked.status_code == 429
+    assert 1 <= int(blocked.headers["retry-after"]) <= 20
+    # Health checks are never limited
+    assert client.get("/healthz").status_code == 200
+    assert rate_limit.stats()["limited_login"] == 1
+
+
+def test_ops_endpoints_are_limited(monkeypatch, limits, ops_headers):
+    monkeypatch.setattr(settings, "RATE_LIMIT_DEFAULT", "2/60")
+    assert [client.get("/ops/db-pool", headers=ops_headers).status_code for _ in range(2)] == [200, 200]
+    assert client.get("/ops/db-pool", headers={"Authorization": "Bearer guess"}).status_code == 429
+
+
+def test_budgets_are_per_company_and_shared_by_its_staff(monkeypatch, limits, company_headers):
+    (ceo_a, staff_a), (ceo_b, _) = _tenant(company_headers), _tenant(company_headers)
+    monkeypatch.setattr(settings, "RATE_LIMIT_SEARCH", "2/60")
+    assert [client.get("/drivers/search?q=x", headers=ceo_a).status_code for _ in range(2)] == [200, 200]
+    assert client.get("/drivers/search?q=x", headers=ceo_a).status_code == 429
+    # Staff tokens carry the company id, so they draw from the same bucket
+    assert client.get("/drivers/search?q=x", headers=staff_a).status_code == 429
+    assert client.get("/drivers/search?q=x", headers=ceo_b).status_code == 200
+    # Other routes have their own budget
+    assert client.get("/company/me", headers=ceo_a).status_code == 200
+
+
+def test_each_request_verifies_its_token_once(monkeypatch, limits, company_headers):
+    from jose import jwt
+
+    ceo, staff = _tenant(company_headers)
+    decode, calls = jwt.decode, []
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: calls.append(args[1]) or decode(*args, **kwargs))
+    assert client.get("/drivers/search", headers=ceo).status_code == 200
+    assert client.get("/staff/drivers", headers=staff).status_code == 200
+    assert calls == [settings.SECRET_KEY, settings.STAFF_SECRET_KEY]
+
+
+def test_signed_token_without_subject_is_not_a_company_key(limits):
+    from jose import jwt
+
+    token = jwt.encode({"exp": 2**31}, settings.SECRET_KEY, algorithm="HS256")
+    scope = {"headers": [(b"authorization", f"Bearer {token}".encode())]}
+    assert rate_limit.company_key(scope) is None
+    assert client.get("/drivers/search", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_concurrency_cap_on_expensive_routes(monkeypatch, limits):
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_BULK", 1)
+    monkeypatch.setattr(settings, "CONCURRENCY_RETRY_AFTER_SECONDS", 7)
+    release = asyncio.Event()
+    slow = FastAPI()
+
+    @slow.post("/drivers/import")
+    async def fake_import():
+        await release.wait()
+        return {"ok": True}
+
+    async def run():
+        transport = httpx.ASGITransport(app=rate_limit.RateLimitMiddleware(slow))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.post("/drivers/import"))
+            await asyncio.sleep(0.05)
+            second = await http.post("/drivers/import")
+            release.set()
+            return await first, second, await http.post("/drivers/import")
+
+    first, second, third = asyncio.run(run())
+    assert first.status_code == 200
+    assert second.status_code == 429 and second.headers["retry-after"] == "7"
+    assert third.status_code == 200  # slot released once the first finished
+    assert rate_limit.stats()["in_flight"] == 0
+
+
+def test_token_bucket_refill_and_budget_parsing(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    bucket = rate_limit.MemoryBackend(max_keys=1)
+    assert [bucket.take("k", 2, 0.5) for _ in range(2)] == [0, 0]
+    assert bucket.take("k", 2, 0.5) == pytest.approx(2.0)
+    clock[0] += 2
+    assert bucket.take("k", 2, 0.5) == 0
+    bucket.take("other", 2, 0.5)  # evicts "k", which starts full again
+    assert bucket.stats()["keys"] == 1
+
+    assert rate_limit.parse_budget("120/60") == (120.0, 2.0)
+    assert rate_limit.parse_budget("off") is None
+
+
+def test_client_ip_honours_trusted_proxy_hops(monkeypatch):
+    scope = {"client": ("10.0.0.5", 1234), "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.9")]}
+    assert rate_limit.client_ip(scope) == "10.0.0.5"
+    monkeypatch.setattr(settings, "RATE_LIMIT_PROXY_HOPS", 1)
+    assert rate_limit.client_ip(scope) == "203.0.113.9"
+
+
+def test_redis_backend_runs_the_bucket_script(monkeypatch, limits):
+    class FakeRedis:
+        """Records EVAL calls; denies once `allowed` calls have gone through."""
+
+        def __init__(self, allowed):
+            self.allowed, self.calls = allowed, []
+
+        def eval(self, script, numkeys, *args):
+            self.calls.append((numkeys, args))
+            return b"0" if len(self.calls) <= self.allowed else b"2.5"
+
+    fake = FakeRedis(allowed=1)
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.RedisBackend(fake, prefix="t"))
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOGIN", "5/10")
+    bad = {"username": "nobody@limits.com", "password": "wrong-password"}
+    assert client.post("/login", data=bad).status_code == 400
+    blocked = client.post("/login", data=bad)
+    assert blocked.status_code == 429 and blocked.headers["retry-after"] == "3"
+    assert fake.calls[0] == (1, ("t:login:ip:testclient", 5.0, 0.5, 1.0))
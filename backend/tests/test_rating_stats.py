@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import rating_stats
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Stats Co")
+    staff = {}
+    for dept in ("safety", "dispatch"):
+        staff_email = f"{dept}_{suffix}@stats.com"
+        client.post("/invite-user", json={"name": f"{dept} one", "email": staff_email, "department": dept}, headers=ceo)
+        token = client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]
+        staff[dept] = {"Authorization": f"Bearer {token}"}
+    ids = [
+        client.post("/drivers", json={"name": f"Stat Driver {i}", "dob": "1979-03-03", "license_number": f"ST{suffix}{i}"}, headers=ceo).json()["id"]
+        for i in range(2)
+    ]
+    for dept, score in (("safety", 5), ("safety", 3), ("dispatch", 1)):
+        assert client.post("/ratings", json={"driver_id": ids[0], "score": score}, headers=staff[dept]).status_code == 200
+    return ceo, ids
+
+
+def test_single_driver_summary(tenant):
+    ceo, ids = tenant
+    stats = client.get(f"/drivers/{ids[0]}/stats", headers=ceo).json()
+    assert (stats["count"], stats["sum"], stats["mean"]) == (3, 9, 3.0)
+    assert stats["departments"]["safety"] == {"count": 2, "sum": 8, "mean": 4.0}
+    assert stats["departments"]["hr"] == {"count": 0, "sum": 0, "mean": None}
+    assert stats["last_rated_at"] is not None
+
+
+def test_batch_summary_includes_unrated_and_skips_foreign(tenant):
+    ceo, ids = tenant
+    stats = client.get("/drivers/stats", params={"ids": [ids[1], ids[0], 999999]}, headers=ceo).json()
+    assert [s["driver_id"] for s in stats] == [ids[1], ids[0]]
+    assert stats[0]["count"] == 0 and stats[0]["mean"] is None
+
+
+def test_rebuild_matches_incremental_totals(tenant):
+    ceo, ids = tenant
+    before = client.get(f"/drivers/{ids[0]}/stats", headers=ceo).json()
+    db = SessionLocal()
+    try:
+        assert rating_stats.rebuild(db) >= 1
+    finally:
+        db.close()
+    assert client.get(f"/drivers/{ids[0]}/stats", headers=ceo).json() == before
+    assert client.get("/drivers/999999/stats", headers=ceo).status_code == 404
+
+
+def test_batch_ratings_report_per_item_and_update_stats_once(tenant, company_headers):
+    ceo, ids = tenant
+    other = company_headers("Other Co")
+    foreign_id = client.post("/drivers", json={"name": "Not Yours", "dob": "1970-01-01", "license_number": f"NY{uuid.uuid4().hex[:8]}"}, headers=other).json()["id"]
+
+    staff_email = f"hr_{uuid.uuid4().hex[:6]}@stats.com"
+    client.post("/invite-user", json={"name": "HR Batch", "email": staff_email, "department": "hr"}, headers=ceo)
+    hr = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+
+    before = client.get(f"/drivers/{ids[1]}/stats", headers=ceo).json()["count"]
+    batch = {"ratings": [
+        {"driver_id": ids[1], "score": 4},
+        {"driver_id": foreign_id, "score": 1},
+        {"driver_id": 999999, "score": 2},
+        {"driver_id": ids[1], "score": 2, "comment": "late twice"},
+    ]}
+    results = client.post("/ratings/batch", json=batch, headers=hr).json()
+    assert [r["status_code"] for r in results] == [200, 403, 404, 200]
+    assert results[3]["rating"]["comment"] == "late twice"
+    stats = client.get(f"/drivers/{ids[1]}/stats", headers=ceo).json()
+    assert stats["count"] == before + 2
+    assert stats["departments"]["hr"]["sum"] == 6
+
+
+def test_reputation_lookup_crosses_companies(tenant, company_headers):
+    ceo, ids = tenant
+    other = company_headers("Hiring Co")
+    rated, unrated = (client.get(f"/drivers/{i}", headers=ceo).json()["license_number"] for i in ids)
+    expected, other_driver = (client.get(f"/drivers/{i}/stats", headers=ceo).json() for i in ids)
+
+    found = client.get("/drivers/lookup", params={"license": rated}, headers=other).json()
+    assert found["license_number"] == rated
+    assert (found["count"], found["mean"], found["departments"]) == (expected["count"], expected["mean"], expected["departments"])
+
+    screened = client.post("/drivers/lookup", json={"licenses": [unrated, "NOPE-1", rated, rated]}, headers=other).json()
+    assert [(r["license_number"], r["count"]) for r in screened] == [(unrated, other_driver["count"]), ("NOPE-1", 0), (rated, expected["count"])]
@@ -0,0 +1,81 @@
+import tempfile
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.core.security import settings
+from app.db import replicas
+from app.db.base import Base
+from app.main import app
+
+client = TestClient(app)
+
+
+def _empty_replica() -> str:
+    """A second SQLite database with the schema but no data: nothing replicates into it."""
+    url = f"sqlite:///{tempfile.mkdtemp(prefix='driver-replica-')}/replica.sqlite3"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def replica():
+    url = _empty_replica()
+    replicas.configure([url])
+    replicas.check_all()
+    yield url
+    replicas.configure([])
+
+
+def _company_with_driver(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Replica Co")
+    license_number = f"RR{suffix}"
+    client.post("/drivers", json={"name": "Rhea Replica", "dob": "1990-02-02", "license_number": license_number}, headers=ceo)
+    return ceo, license_number
+
+
+def _search(ceo, license_number):
+    return client.get("/drivers/search", params={"license": license_number}, headers=ceo).json()
+
+
+def test_reads_stick_to_primary_after_a_write_then_use_the_replica(replica, ops_headers, company_headers):
+    ceo, license_number = _company_with_driver(company_headers)
+    assert len(_search(ceo, license_number)) == 1  # read-your-writes: primary
+    replicas._marks.clear()  # the sticky window has passed
+    assert _search(ceo, license_number) == []  # served by the (empty) replica
+    reads = client.get("/ops/replicas", headers=ops_headers).json()["reads"]
+    assert reads["sticky"] >= 1 and reads["replica"] >= 1
+
+
+def test_lagging_or_unreachable_replicas_fall_back_to_primary(monkeypatch, replica, company_headers):
+    ceo, license_number = _company_with_driver(company_headers)
+    replicas._marks.clear()
+    monkeypatch.setattr(settings, "REPLICA_MAX_LAG_SECONDS", -1)  # every replica counts as lagging
+    replicas.check_all()
+    assert len(_search(ceo, license_number)) == 1
+    monkeypatch.undo()
+
+    replicas.configure(["sqlite:////nonexistent-dir/replica.sqlite3"])
+    replicas.check_all()
+    (state,) = replicas.stats()["replicas"]
+    assert state["healthy"] is False and "OperationalError" in state["error"]
+    assert len(_search(ceo, license_number)) == 1
+    assert replicas.stats()["reads"]["fallback"] >= 1
+
+
+def test_round_robin_skips_unhealthy_replicas():
+    replicas.configure([_empty_replica(), _empty_replica(), "sqlite:////nonexistent-dir/replica.sqlite3"])
+    try:
+        replicas.check_all()
+        healthy = [r for r in replicas.get_replicas() if r.healthy]
+        assert len(healthy) == 2
+        picks = [replicas.pick(None) for _ in range(6)]
+        assert set(picks) == set(healthy)
+        assert all(a is not b for a, b in zip(picks, picks[1:]))
+    finally:
+        replicas.configure([])
@@ -0,0 +1,108 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import response_cache
+from app.main import app
+from app.pagination import NEXT_CURSOR_HEADER
+
+client = TestClient(app)
+
+
+class FakeRedis:
+    """Just enough of the redis-py client for RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Cache Co")
+    staff_email = f"safety_{suffix}@cache.com"
+    client.post("/invite-user", json={"name": "Safety One", "email": staff_email, "department": "safety"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+    driver = client.post("/drivers", json={"name": "Cached Driver", "dob": "1985-05-05", "license_number": f"RC{suffix}"}, headers=ceo).json()
+    return ceo, staff, driver["id"], suffix
+
+
+def test_etag_and_not_modified(tenant):
+    ceo, _, driver_id, _ = tenant
+    first = client.get(f"/drivers/{driver_id}", headers=ceo)
+    assert first.status_code == 200 and first.json()["id"] == driver_id
+    etag = first.headers["etag"]
+    again = client.get(f"/drivers/{driver_id}", headers={**ceo, "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert client.get("/drivers/999999", headers=ceo).status_code == 404
+
+
+def test_writes_invalidate_tenant_entries(tenant):
+    ceo, staff, driver_id, suffix = tenant
+    before = client.get("/staff/drivers", headers=staff)
+    assert [d["id"] for d in before.json()] == [driver_id]
+    ratings = client.get(f"/drivers/{driver_id}/ratings", headers=ceo)
+    assert ratings.json() == []
+
+    client.post("/drivers", json={"name": "Another Driver", "dob": "1990-01-01", "license_number": f"RD{suffix}"}, headers=ceo)
+    after = client.get("/staff/drivers", headers={**staff, "If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and len(after.json()) == 2
+
+    client.post("/ratings", json={"driver_id": driver_id, "score": 5}, headers=staff)
+    assert [r["score"] for r in client.get(f"/drivers/{driver_id}/ratings", headers=ceo).json()] == [5]
+
+    assert len(client.get("/company/staff", headers=ceo).json()) == 1
+    client.post("/invite-user", json={"name": "HR One", "email": f"hr_{suffix}@cache.com", "department": "hr"}, headers=ceo)
+    assert len(client.get("/company/staff", headers=ceo).json()) == 2
+
+
+def test_cursor_header_is_cached(tenant):
+    _, staff, _, _ = tenant
+    first = client.get("/staff/drivers", params={"limit": 1}, headers=staff)
+    cached = client.get("/staff/drivers", params={"limit": 1}, headers=staff)
+    assert cached.headers[NEXT_CURSOR_HEADER] == first.headers[NEXT_CURSOR_HEADER]
+    assert cached.json() == first.json()
+
+
+def test_hit_rate_is_reported(tenant, ops_headers):
+    ceo, _, driver_id, _ = tenant
+    client.get(f"/drivers/{driver_id}", headers=ceo)
+    client.get(f"/drivers/{driver_id}", headers=ceo)
+    stats = client.get("/ops/response-cache", headers=ops_headers).json()
+    assert stats["backend"] == "MemoryBackend"
+    assert stats["hits"] >= 1 and 0 < stats["hit_rate"] <= 1
+
+
+def test_redis_backend_with_stand_in(tenant):
+    ceo, _, driver_id, _ = tenant
+    fake = FakeRedis()
+    response_cache.set_backend(response_cache.RedisBackend(fake, ttl=30))
+    try:
+        first = client.get(f"/drivers/{driver_id}", headers=ceo)
+        assert any(key.startswith("resp:") for key in fake.data)
+        assert client.get(f"/drivers/{driver_id}", headers=ceo).json() == first.json()
+        response_cache.invalidate_company(first.json()["created_by_company_id"])
+        assert any(key.startswith("resp:gen:") for key in fake.data)
+    finally:
+        response_cache.set_backend(response_cache._build_backend())
+
+
+def test_memory_generations_are_bounded_and_never_reused():
+    backend = response_cache.MemoryBackend(maxsize=2, ttl=30)
+    first = backend.generation(1)
+    backend.bump(1)
+    assert backend.generation(1) == first + 1
+    for company_id in (2, 3):
+        backend.generation(company_id)  # pushes company 1 out
+    assert backend._generations.stats()["size"] == 2
+    assert backend.generation(1) > first + 1
@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import search
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_query_grams_match_word_prefixes():
+    assert search.query_grams("Jo") <= search.name_grams("John Smith")
+    assert search.normalize("  José   O'Neil ") == "jose o neil"
+
+
+@pytest.fixture(scope="module")
+def tenant(company_headers):
+    headers = company_headers("Search Co")
+    prefix = uuid.uuid4().hex[:6].upper()
+    for i, name in enumerate(["Jonathan Miles", "Jon Miles", "Maria Jonas", "Peter Parker"]):
+        r = client.post("/drivers", json={"name": name, "dob": "1985-05-05", "license_number": f"{prefix}-{i}"}, headers=headers)
+        assert r.status_code == 200
+    return headers, prefix
+
+
+def test_search_ranks_closest_names_first(tenant):
+    ceo_headers, _ = tenant
+    names = [d["name"] for d in client.get("/drivers/search", params={"name": "jon miles"}, headers=ceo_headers).json()]
+    assert names[:2] == ["Jon Miles", "Jonathan Miles"]
+    assert "Peter Parker" not in names
+
+
+def test_search_tolerates_typos(tenant):
+    ceo_headers, _ = tenant
+    names = [d["name"] for d in client.get("/drivers/search", params={"name": "parkr"}, headers=ceo_headers).json()]
+    assert names == ["Peter Parker"]
+
+
+def test_search_by_license_prefix(tenant):
+    ceo_headers, prefix = tenant
+    found = client.get("/drivers/search", params={"license": prefix}, headers=ceo_headers).json()
+    assert len(found) == 4
+    assert client.get("/drivers/search", params={"license": prefix + "-3"}, headers=ceo_headers).json()[0]["name"] == "Peter Parker"
+
+
+def test_full_match_pages_follow_the_ranked_order(tenant, monkeypatch):
+    ceo_headers, _ = tenant
+
+    def pages():
+        names, cursor = [], None
+        while True:
+            params = {"name": "jon", "limit": 1, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/drivers/search", params=params, headers=ceo_headers)
+            names += [d["name"] for d in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return names
+
+    early = pages()
+    monkeypatch.setattr(search, "_full_match_page", lambda *args: None)
+    assert early == pages() == ["Jon Miles", "Maria Jonas", "Jonathan Miles"]
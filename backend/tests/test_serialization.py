@@ -0,0 +1,64 @@
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from fastapi.testclient import TestClient
+
+from app import models, response_cache, schemas, serialization
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_trusted_rows_encode_like_the_validated_path(monkeypatch):
+    rows = [
+        {"id": 1, "driver_id": 2, "user_id": 3, "department": models.DepartmentEnum.safety,
+         "score": 4, "comment": None, "created_at": datetime(2025, 3, 4, 5, 6, 7, 890)},
+        {"id": 5, "driver_id": 2, "user_id": 3, "department": models.DepartmentEnum.hr,
+         "score": 1, "comment": "late", "created_at": datetime(2025, 3, 4, 5, 6, 7)},
+    ]
+    schema = List[schemas.DriverRatingResponse]
+    validated = serialization.dump(schema, rows)
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    assert serialization.dump(schema, rows, trusted=True) == validated
+
+    drivers = [{"id": 1, "name": "A B", "dob": date(1980, 1, 2), "license_number": "X1",
+                "created_by_company_id": 7, "created_at": None}]
+    assert json.loads(serialization.dump(List[schemas.DriverResponse], drivers, trusted=True)) == json.loads(
+        serialization.dump(List[schemas.DriverResponse], drivers)
+    )
+
+
+def test_aware_datetimes_encode_like_the_validated_path(monkeypatch):
+    # Postgres returns timestamptz columns as aware datetimes
+    rows = [
+        {"id": 1, "driver_id": 2, "user_id": 3, "department": models.DepartmentEnum.safety,
+         "score": 4, "comment": None, "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+        {"id": 2, "driver_id": 2, "user_id": 3, "department": models.DepartmentEnum.safety,
+         "score": 4, "comment": None, "created_at": datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))},
+    ]
+    schema = List[schemas.DriverRatingResponse]
+    validated = serialization.dump(schema, rows)
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    assert serialization.dump(schema, rows, trusted=True) == validated
+    assert b'"2024-01-01T00:00:00Z"' in validated
+
+
+def test_list_endpoints_match_in_fast_mode(monkeypatch, company_headers):
+    suffix = uuid.uuid4().hex[:6]
+    ceo = company_headers("Fast Co")
+    staff_email = f"dispatch_{suffix}@fastjson.com"
+    client.post("/invite-user", json={"name": "Dispatch One", "email": staff_email, "department": "dispatch"}, headers=ceo)
+    staff = {"Authorization": "Bearer " + client.post("/staff-login", data={"username": staff_email, "password": "changeme123"}).json()["access_token"]}
+    driver_id = client.post("/drivers", json={"name": "Fast Driver", "dob": "1979-09-09", "license_number": f"FJ{suffix}"}, headers=ceo).json()["id"]
+    client.post("/ratings", json={"driver_id": driver_id, "score": 3, "comment": "ok"}, headers=staff)
+
+    paths = [("/staff/drivers", staff), (f"/drivers/{driver_id}/ratings", ceo), ("/company/staff", ceo)]
+    response_cache.clear()
+    slow = [client.get(path, headers=headers).content for path, headers in paths]
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    response_cache.clear()
+    fast = [client.get(path, headers=headers).content for path, headers in paths]
+    assert fast == slow
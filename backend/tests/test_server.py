@@ -0,0 +1,41 @@
+from app import server
+from app.core import instrumentation
+from app.core.security import settings
+from app.db import session
+
+
+def test_worker_count_follows_cpu_quota_and_memory(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(settings, "SERVER_WORKER_MEMORY_MB", 256)
+    gib = 1024 ** 3
+    assert server.worker_count(4, 8 * gib) == 4
+    assert server.worker_count(0.5, 8 * gib) == 1
+    assert server.worker_count(8, 1 * gib) == 4  # memory caps it
+    assert server.worker_count(8, 100 * 1024 ** 2) == 1
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 3)
+    assert server.worker_count(8, 1 * gib) == 3
+
+
+def test_cpu_limit_reads_cgroup_quota(monkeypatch):
+    files = {"/sys/fs/cgroup/cpu.max": "150000 100000"}
+    monkeypatch.setattr(server, "_read", files.get)
+    assert server.cpu_limit() == 1.5
+    files["/sys/fs/cgroup/cpu.max"] = "max 100000"
+    assert server.cpu_limit() >= 1
+
+
+def test_post_fork_drops_inherited_connections(monkeypatch):
+    monkeypatch.setenv(instrumentation.FORKED_AT_ENV, "0")  # restored after; post_fork overwrites it
+    with session.engine.connect():
+        pass
+    assert session.engine.pool.checkedin() >= 1
+    server.post_fork(None, None)
+    assert session.engine.pool.checkedin() == 0
+
+
+def test_startup_phases_are_exported():
+    instrumentation.record_startup("import", 0.5)
+    assert instrumentation.mark_ready() >= 0
+    text = instrumentation.render()
+    assert 'app_startup_seconds{phase="import"} 0.5' in text
+    assert 'app_startup_seconds{phase="cold_start"}' in text
@@ -0,0 +1,24 @@
+from app.core import startup
+
+# Fresh interpreter -> `import app.main` -> startup handlers -> first /healthz.
+# Roughly 1.1s on a dev laptop; generous enough for a shared CI runner.
+READY_BUDGET_SECONDS = 2.5
+
+
+def test_healthz_is_servable_within_budget_after_import():
+    result = startup.profile()
+    assert result["status"] == 200
+    assert result["deferred_loaded"] == []
+    assert result["ready_s"] < READY_BUDGET_SECONDS, startup.report(result, top=10)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   app.utils\n"
+        "import time:      3000 |       3120 | app.main\n"
+    )
+    assert startup.parse_importtime(stderr) == [
+        startup.ImportRecord("app.utils", 120, 120),
+        startup.ImportRecord("app.main", 3000, 3120),
+    ]
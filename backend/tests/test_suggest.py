@@ -0,0 +1,103 @@
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import suggest
+from app.core.security import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_index_matches_word_and_license_prefixes():
+    index = suggest.TenantIndex([(1, "Jonathan Miles", "AB-100"), (2, "Maria Jonas", "AB-200"), (3, "Jon Miles", "CD-1")])
+    assert [d["id"] for d in index.match("jon", 10)] == [3, 1, 2]
+    assert [d["id"] for d in index.match("mi jo", 10)] == [3, 1]
+    assert [d["id"] for d in index.match("ab2", 10)] == [2]
+    assert index.match("  -- ", 10) == []
+    index.add(4, "Jo Park", "EF-1")
+    assert index.match("jo", 1) == [{"id": 4, "name": "Jo Park", "license_number": "EF-1"}]
+
+
+def test_driver_committed_while_the_index_builds_is_kept():
+    late = SimpleNamespace(id=2, name="Late Lane", license_number="LL-2", created_by_company_id=-1)
+
+    class Session:
+        def execute(self, stmt):
+            # Another request commits a driver after this read ran
+            suggest.add_driver(late)
+            return SimpleNamespace(all=lambda: [(1, "Early Lane", "EL-1")])
+
+    suggest.clear()
+    suggest.suggest(Session(), -1, "lane", 10)
+    assert [d["name"] for d in suggest.suggest(None, -1, "lane", 10)] == ["Late Lane", "Early Lane"]
+    suggest.clear()
+
+
+def test_concurrent_cold_misses_build_the_index_once(monkeypatch):
+    reading, release, reads = threading.Event(), threading.Event(), []
+
+    class Session:
+        def execute(self, stmt):
+            reads.append(stmt)
+            reading.set()
+            release.wait(5)
+            return SimpleNamespace(all=lambda: [(1, "Early Lane", "EL-1")])
+
+    searched = SimpleNamespace(id=1, name="Early Lane", license_number="EL-1")
+    monkeypatch.setattr(suggest.search, "search_drivers", lambda *args, **kwargs: ([searched], None))
+    suggest.clear()
+    results = []
+    builder = threading.Thread(target=lambda: results.append(suggest.suggest(Session(), -1, "lane", 10)))
+    builder.start()
+    assert reading.wait(5)
+    try:
+        # Arrives while the first request is still reading: answered by search, no second read
+        assert [d["name"] for d in suggest.suggest(Session(), -1, "lane", 10)] == ["Early Lane"]
+    finally:
+        release.set()
+        builder.join(5)
+    assert len(reads) == 1
+    assert [d["name"] for d in results[0]] == ["Early Lane"]
+    suggest.clear()
+
+
+@pytest.fixture(scope="module")
+def tenants(company_headers):
+    prefix = uuid.uuid4().hex[:6].upper()
+    first, second = company_headers("Suggest A"), company_headers("Suggest B")
+    client.post("/drivers", json={"name": "Quinton Vale", "dob": "1980-01-01", "license_number": f"{prefix}-1"}, headers=first)
+    client.post("/drivers", json={"name": "Quincy Vale", "dob": "1980-01-01", "license_number": f"{prefix}-2"}, headers=second)
+    return first, second, prefix
+
+
+def test_suggest_is_tenant_scoped_and_sees_new_drivers(tenants):
+    first, second, prefix = tenants
+    names = lambda headers: [d["name"] for d in client.get("/drivers/suggest", params={"q": "quin"}, headers=headers).json()]
+    assert names(first) == ["Quinton Vale"]
+    assert names(second) == ["Quincy Vale"]
+
+    # The first tenant's index is loaded now; create_driver must update it in place
+    builds = suggest.stats()["builds"]
+    client.post("/drivers", json={"name": "Quinn Ash", "dob": "1990-01-01", "license_number": f"{prefix}-3"}, headers=first)
+    assert names(first) == ["Quinn Ash", "Quinton Vale"]
+    assert suggest.stats()["builds"] == builds
+
+
+def test_suggest_evicts_least_recently_used_tenant(tenants, monkeypatch):
+    first, second, _ = tenants
+    suggest.clear()
+    client.get("/drivers/suggest", params={"q": "quin"}, headers=first)
+    monkeypatch.setattr(settings, "SUGGEST_MAX_DRIVERS", suggest.stats()["drivers"])
+    client.get("/drivers/suggest", params={"q": "quin"}, headers=second)
+    assert suggest.stats()["tenants"] == 1 and suggest.stats()["evictions"] >= 1
+
+    # A tenant over the whole budget is answered by the regular search
+    monkeypatch.setattr(settings, "SUGGEST_MAX_DRIVERS", 0)
+    suggest.clear()
+    found = client.get("/drivers/suggest", params={"q": "quinton"}, headers=first).json()
+    assert found[0]["name"] == "Quinton Vale"
+    assert suggest.stats()["fallbacks"] >= 1
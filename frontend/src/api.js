@@ -28,8 +28,22 @@ export const createDriver = (token, payload) =>
 export const searchDrivers = (token, name) =>
   api.get(`/drivers/search?name=${encodeURIComponent(name)}`, { headers: { Authorization: `Bearer ${token}` } });
 
+export const suggestDrivers = (token, q, signal) =>
+  api.get(`/drivers/suggest?q=${encodeURIComponent(q)}`, { headers: { Authorization: `Bearer ${token}` }, signal });
+
+export const getDriver = (token, id) =>
+  api.get(`/drivers/${id}`, { headers: { Authorization: `Bearer ${token}` } });
+
 export const rateDriver = (token, payload) =>
   api.post("/ratings", payload, { headers: { Authorization: `Bearer ${token}` } });
 
 export const getDriverRatings = (token, id) =>
   api.get(`/drivers/${id}/ratings`, { headers: { Authorization: `Bearer ${token}` } });
+
+// Driver fields, newest ratings and stats for one or many drivers in one call
+export const getDriverProfiles = (token, ids, ratingsLimit = 10) =>
+  api.get("/drivers/profile", {
+    params: { ids, ratings_limit: ratingsLimit },
+    paramsSerializer: { indexes: null }, // ids=1&ids=2
+    headers: { Authorization: `Bearer ${token}` },
+  });
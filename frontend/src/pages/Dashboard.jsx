@@ -1,11 +1,14 @@
 import { useEffect, useState } from "react";
 import NavBar from "../components/NavBar.jsx";
 import {
-  getCeoToken, getStaffToken, searchDrivers, getDriverRatings, rateDriver
+  getCeoToken, getStaffToken, searchDrivers, suggestDrivers, getDriver, getDriverProfiles, rateDriver
 } from "../api";
 
+const SUGGEST_DEBOUNCE_MS = 150;
+
 export default function Dashboard() {
   const [query, setQuery] = useState("");
+  const [suggestions, setSuggestions] = useState([]);
   const [driver, setDriver] = useState(null);
   const [ratings, setRatings] = useState([]);
   const [score, setScore] = useState(5);
@@ -17,8 +20,38 @@ export default function Dashboard() {
 
   useEffect(() => { setMsg(""); }, [driver]);
 
+  // Typeahead: debounce keystrokes and abort the previous request so a slow
+  // response for "jo" can't overwrite the one for "joh"
+  useEffect(() => {
+    const q = query.trim();
+    if (!q || !ceoToken || q === driver?.name) { setSuggestions([]); return; }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const { data } = await suggestDrivers(ceoToken, q, controller.signal);
+        setSuggestions(data);
+      } catch {
+        if (!controller.signal.aborted) setSuggestions([]);
+      }
+    }, SUGGEST_DEBOUNCE_MS);
+    return () => { clearTimeout(timer); controller.abort(); };
+  }, [query, ceoToken, driver]);
+
+  const pickSuggestion = async (s) => {
+    setSuggestions([]);
+    setQuery(s.name);
+    setRatings([]);
+    try {
+      const { data } = await getDriver(ceoToken, s.id);
+      setDriver(data);
+    } catch {
+      setMsg("Failed to load driver.");
+    }
+  };
+
   const doSearch = async () => {
     setMsg("");
+    setSuggestions([]);
     try {
       const { data } = await searchDrivers(ceoToken, query);
       setDriver(data?.[0] || null);
@@ -31,8 +64,8 @@ export default function Dashboard() {
   const pullInfo = async () => {
     if (!driver) return;
     try {
-      const { data } = await getDriverRatings(ceoToken, driver.id);
-      setRatings(Array.isArray(data) ? data : [data]); // API returns list
+      const { data } = await getDriverProfiles(ceoToken, [driver.id]);
+      setRatings(data?.[0]?.ratings || []);
     } catch {
       setMsg("Failed to load ratings.");
     }
@@ -66,6 +99,18 @@ export default function Dashboard() {
             />
             <button className="px-4 py-2 rounded bg-gray-900 text-white" onClick={doSearch}>Search</button>
           </div>
+          {suggestions.length > 0 && (
+            <ul className="mt-1 border rounded divide-y text-sm">
+              {suggestions.map(s => (
+                <li key={s.id}>
+                  <button className="w-full text-left px-3 py-2 hover:bg-gray-50 flex justify-between" onClick={() => pickSuggestion(s)}>
+                    <span>{s.name}</span>
+                    <span className="text-gray-500">{s.license_number}</span>
+                  </button>
+                </li>
+              ))}
+            </ul>
+          )}
           {msg && <div className="mt-3 text-sm text-gray-600">{msg}</div>}
         </div>
 